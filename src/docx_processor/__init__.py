@@ -5,17 +5,46 @@ Copyright (c) 2024 Sean Smith
 Licensed under the MIT License. See LICENSE file for details.
 """
 
+import importlib
+from typing import TYPE_CHECKING
+
 from .config import AppConfig
 from .logger import DocxLogger, ContextLoggerAdapter
-from .processors import DocxIndexer
-from .processors.batch import BatchProcessor
-from .processors.document import DocumentProcessor
+from .processors.match import MatchRecord
 from .version import __version__
 
+if TYPE_CHECKING:
+    from .processors.batch import BatchProcessor
+    from .processors.document import DocumentProcessor
+    from .processors.docx_indexer import DocxIndexer
+    from .api import ProcessResult, process_bytes
+
 __author__ = "Sean Smith"
 __copyright__ = "Copyright (c) 2024 Sean Smith"
 __license__ = "MIT"
 
+# Processors pull in python-docx and lxml, so they are only imported on first use
+_LAZY_IMPORTS = {
+    "BatchProcessor": ".processors.batch",
+    "DocumentProcessor": ".processors.document",
+    "DocxIndexer": ".processors.docx_indexer",
+    "process_bytes": ".api",
+    "ProcessResult": ".api",
+}
+
+
+def __getattr__(name):
+    if name not in _LAZY_IMPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_LAZY_IMPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + list(_LAZY_IMPORTS))
+
+
 __all__ = [
     "DocumentProcessor",
     "BatchProcessor",
@@ -23,5 +52,8 @@ __all__ = [
     "DocxLogger",
     "ContextLoggerAdapter",
     "DocxIndexer",
+    "MatchRecord",
+    "process_bytes",
+    "ProcessResult",
     "__version__",
 ]
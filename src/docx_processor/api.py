@@ -0,0 +1,81 @@
+"""
+In-memory processing API: documents go in and come out as bytes, without touching the file system.
+
+    from docx_processor import process_bytes
+
+    result = process_bytes(upload, config, name="upload.docx")
+    if result.ok and result.output is not None:
+        send(result.output)
+"""
+
+import logging
+from dataclasses import dataclass, field, replace
+from io import BytesIO
+from pathlib import Path
+from typing import List, Optional
+
+from .config import AppConfig
+from .logger import ContextLoggerAdapter, create_task_logger
+from .processors.document import DocumentProcessor
+from .processors.match import MatchRecord
+from .processors.rules import RuleSet
+
+_logger = logging.getLogger(__name__)
+_logger.addHandler(logging.NullHandler())
+
+
+@dataclass
+class ProcessResult:
+    """Outcome of processing one in-memory document."""
+
+    output: Optional[bytes]
+    matches: List[MatchRecord] = field(default_factory=list)
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def process_bytes(
+    data,
+    config: AppConfig,
+    name: str = "document.docx",
+    find_only: Optional[bool] = None,
+    logger=None,
+    rules: Optional[RuleSet] = None,
+) -> ProcessResult:
+    """Process a document held in memory.
+
+    ``data`` is a bytes-like object or a binary stream. ``output`` holds the transformed document, or None in
+    find-only mode or when processing failed. ``name`` labels the document in match records and log entries,
+    ``find_only`` overrides the configured mode, and passing ``rules`` reuses rules compiled for earlier calls.
+    Log entries go to ``logger`` when given, otherwise to the ``docx_processor.api`` logger.
+    """
+    if find_only is not None and find_only != config.runtime.find_only:
+        config = replace(config, runtime=replace(config.runtime, find_only=find_only))
+
+    if isinstance(data, BytesIO):
+        source = data
+    elif hasattr(data, "read"):
+        source = BytesIO(data.read())
+    else:
+        source = BytesIO(data)
+    source.seek(0)
+
+    path = Path(name)
+    if logger is not None:
+        task_logger = create_task_logger(logger, path)
+    else:
+        task_logger = ContextLoggerAdapter(
+            _logger, {"document_name": path.name, "document_full_path": name, "location": "", "match": "False"}
+        )
+
+    output = None if config.runtime.find_only else BytesIO()
+    processor = DocumentProcessor(config, task_logger, rules)
+    matches = processor.process_document(path, output, source)
+    return ProcessResult(
+        output=output.getvalue() if output is not None and processor.error is None else None,
+        matches=matches,
+        error=processor.error,
+    )
@@ -2,28 +2,81 @@
 Command-line interface for docx-processor.
 """
 
-import asyncio
+from dataclasses import replace
 from logging import Logger
 from pathlib import Path
+from typing import Optional, Tuple
 
 import click
 
 from .config import AppConfig, RuntimeConfig, TransformConfig
+from .config.constants import (
+    DEFAULT_DISCOVERY_WORKERS,
+    DEFAULT_LOG_LEVEL,
+    DEFAULT_MEMORY_PROFILE_TOP,
+    DEFAULT_READ_AHEAD_BYTES,
+    DEFAULT_WRITE_BUFFER_BYTES,
+    ORDERS,
+    ORDER_LARGEST_FIRST,
+    OUTPUTS,
+    OUTPUT_FULL,
+    SCAN_MODES,
+    SCAN_PARAGRAPH,
+)
 from .logger import setup_logger
-from .processors import BatchProcessor
 from .version import __version__
 
+# Processing modules import python-docx and lxml, so commands import them on demand to keep
+# short invocations such as --version and validate fast.
+
+
+class WorkerCount(click.ParamType):
+    """A positive worker count, or ``auto`` to size the pool from available CPUs and memory."""
+
+    name = "integer|auto"
+
+    def convert(self, value, param, ctx):
+        if isinstance(value, int):
+            return value
+        if str(value).lower() == "auto":
+            from .utils.system import auto_worker_count
+
+            return auto_worker_count()
+        try:
+            workers = int(value)
+        except ValueError:
+            self.fail(f"{value!r} is not a valid integer or 'auto'", param, ctx)
+        if workers < 1:
+            self.fail(f"{value} is smaller than the minimum valid value 1", param, ctx)
+        return workers
+
+
+def process_documents(config: AppConfig, *more_configs: AppConfig, catalog_path: Optional[Path] = None) -> int:
+    """Process documents based on configuration, applying any further configs in the same pass.
+    With ``catalog_path`` matches are found from the catalog instead of the documents."""
+    import asyncio
+
+    from .processors.batch import BatchProcessor
+    from .processors.multi import MultiConfigProcessor
 
-def process_documents(config: AppConfig) -> int:
-    """Process documents based on configuration."""
     try:
-        logger: Logger = setup_logger(config)
+        if more_configs:
+            loggers = [setup_logger(c, namespace=c.runtime.log_file.stem) for c in (config, *more_configs)]
+        else:
+            loggers = [setup_logger(config)]
     except Exception as e:
         print(f"Failed to initialize logger: {e}")  # Fallback error reporting
         return 1
+    logger: Logger = loggers[0]
+
+    if catalog_path is not None:
+        return _process_catalog([config, *more_configs], loggers, catalog_path)
 
     try:
-        processor = BatchProcessor(config=config, logger=logger)
+        if more_configs:
+            processor = MultiConfigProcessor([config, *more_configs], loggers)
+        else:
+            processor = BatchProcessor(config=config, logger=logger)
 
         if config.runtime.sync_mode:
             processor.process_all_docx()
@@ -31,6 +84,12 @@ def process_documents(config: AppConfig) -> int:
 
             asyncio.run(processor.process_all_docx_async())
 
+        if processor.abandoned:
+            logger.error(
+                f"Processing finished with {processor.abandoned} documents abandoned after exceeding "
+                f"the document budget, see the quarantine list"
+            )
+            return 1
         logger.info("Processing completed successfully")
         return 0
 
@@ -39,6 +98,23 @@ def process_documents(config: AppConfig) -> int:
         return 1
 
 
+def _process_catalog(configs, loggers, catalog_path: Path) -> int:
+    from .processors.catalog import CatalogBatchProcessor
+    from .storage.catalog import Catalog
+
+    catalog = Catalog(catalog_path)
+    try:
+        for config, logger in zip(configs, loggers):
+            CatalogBatchProcessor(config=config, logger=logger).process_catalog(catalog)
+            logger.info("Processing completed successfully")
+        return 0
+    except Exception as e:
+        loggers[0].error(f"Processing failed: {e}")
+        return 1
+    finally:
+        catalog.close()
+
+
 @click.group()
 @click.version_option(version=__version__, prog_name="docx-processor")
 @click.option(
@@ -46,7 +122,8 @@ def process_documents(config: AppConfig) -> int:
     "--config",
     type=click.Path(exists=True, path_type=Path),
     required=True,
-    help="Path to transforms configuration file (YAML)",
+    multiple=True,
+    help="Path to transforms configuration file (YAML), repeat to apply several configs in one pass",
 )
 @click.option(
     "--source-dir",
@@ -66,36 +143,178 @@ def process_documents(config: AppConfig) -> int:
 )
 @click.option(
     "--workers",
-    type=click.IntRange(min=1),
+    type=WorkerCount(),
     default=4,
-    help="Number of worker threads for async processing",
+    help="Number of worker threads for async processing, or 'auto' to size from available CPUs and memory",
+    show_default=True,
+)
+@click.option(
+    "--order",
+    type=click.Choice(ORDERS, case_sensitive=False),
+    default=ORDER_LARGEST_FIRST,
+    help="Dispatch order: largest estimated cost first within a window of documents, or as discovered",
+    show_default=True,
+)
+@click.option(
+    "--scan-mode",
+    type=click.Choice(SCAN_MODES, case_sensitive=False),
+    default=SCAN_PARAGRAPH,
+    help="Run text rules over each paragraph separately, or once over the joined text of each document",
+    show_default=True,
+)
+@click.option(
+    "--include",
+    multiple=True,
+    help="Glob of documents to process, a name or a path relative to the source directory; repeatable",
+)
+@click.option(
+    "--exclude",
+    multiple=True,
+    help="Glob of directories and documents to skip, a name or a relative path; excluded directories are not walked",
+)
+@click.option(
+    "--max-depth",
+    type=click.IntRange(min=0),
+    help="Directory levels below the source directory to walk (0 for its own documents only)",
+)
+@click.option(
+    "--discovery-workers",
+    type=click.IntRange(min=1),
+    default=DEFAULT_DISCOVERY_WORKERS,
+    help="Directories listed in parallel while discovering documents",
+    show_default=True,
+)
+@click.option(
+    "--document-timeout",
+    type=click.FloatRange(min=0, min_open=True),
+    help="Wall-clock budget in seconds for each document, overrunning documents are quarantined",
+)
+@click.option(
+    "--rule-timeout",
+    type=click.FloatRange(min=0, min_open=True),
+    help="Evaluation budget in seconds for each rule within a document, overrunning rules are skipped",
+)
+@click.option(
+    "--read-ahead",
+    type=click.IntRange(min=0),
+    default=0,
+    help="Number of upcoming documents to read into memory ahead of the workers (0 disables read-ahead)",
+    show_default=True,
+)
+@click.option(
+    "--read-ahead-mb",
+    type=click.IntRange(min=1),
+    default=DEFAULT_READ_AHEAD_BYTES // (1024 * 1024),
+    help="Maximum megabytes of document data held by read-ahead",
+    show_default=True,
+)
+@click.option(
+    "--mmap/--no-mmap",
+    "mmap_input",
+    default=False,
+    help="Read documents through a memory map so compressed package data is not copied into memory",
+    show_default=True,
+)
+@click.option(
+    "--lazy-media/--eager-media",
+    default=False,
+    help="Leave images, video and embedded objects unread and stream them from the source when saving",
+    show_default=True,
+)
+@click.option(
+    "--write-behind/--write-inline",
+    default=True,
+    help="Hand modified documents to a writer thread that saves them atomically, or save them in the worker",
+    show_default=True,
+)
+@click.option(
+    "--write-buffer-mb",
+    type=click.IntRange(min=1),
+    default=DEFAULT_WRITE_BUFFER_BYTES // (1024 * 1024),
+    help="Maximum megabytes of modified documents waiting for the writer",
+    show_default=True,
+)
+@click.option(
+    "--output",
+    type=click.Choice(OUTPUTS, case_sensitive=False),
+    default=OUTPUT_FULL,
+    help="Write each modified document in full, or a delta of the parts that changed for apply-delta",
+    show_default=True,
+)
+@click.option(
+    "--memory-profile/--no-memory-profile",
+    default=False,
+    help="Trace memory per document and stage, processing one document at a time, and report the heaviest",
+    show_default=True,
+)
+@click.option(
+    "--memory-profile-top",
+    type=click.IntRange(min=1),
+    default=DEFAULT_MEMORY_PROFILE_TOP,
+    help="Heaviest documents whose top allocation sites the memory profile reports",
     show_default=True,
 )
 @click.option("--sync/--async", "sync_mode", default=False, help="Use synchronous processing instead of async")
 @click.option(
     "--find-only/--modify", default=True, help="Only find and log matches without modifying them", show_default=True
 )
+@click.option(
+    "--triage/--full-scan",
+    default=False,
+    help="Stop scanning each document at its first match and report one row per document",
+    show_default=True,
+)
 @click.option("--verbose", "-v", count=True, help="Increase verbosity (can be used multiple times)")
+@click.option(
+    "--match-store",
+    type=click.Path(dir_okay=False, path_type=Path),
+    help="Also record matches in this SQLite database for later queries",
+)
+@click.option(
+    "--dedup/--no-dedup",
+    default=False,
+    help="Process byte-identical documents once and reuse the results for every copy",
+    show_default=True,
+)
 @click.pass_context
 def cli(
     ctx: click.Context,
-    config: Path,
+    config: Tuple[Path, ...],
     source_dir: Path,
     dest_dir: Path,
     log_file: Path,
     log_level: str,
     workers: int,
+    order: str,
+    scan_mode: str,
+    include: Tuple[str, ...],
+    exclude: Tuple[str, ...],
+    max_depth: Optional[int],
+    discovery_workers: int,
+    document_timeout: float,
+    rule_timeout: float,
+    read_ahead: int,
+    read_ahead_mb: int,
+    mmap_input: bool,
+    lazy_media: bool,
+    write_behind: bool,
+    write_buffer_mb: int,
+    output: str,
+    memory_profile: bool,
+    memory_profile_top: int,
     sync_mode: bool,
     find_only: bool,
+    triage: bool,
     verbose: int,
+    match_store: Path,
+    dedup: bool,
 ):
     """DocX Processor - Process Word documents with configured transformations."""
     ctx.ensure_object(dict)
+    if triage and not find_only:
+        raise click.UsageError("--triage only finds matches and cannot be combined with --modify")
 
     try:
-        # Load transform config from YAML
-        transform_config = TransformConfig.from_yaml(config)
-
         # Create runtime config from CLI options
         runtime_config = RuntimeConfig(
             source_dir=source_dir,
@@ -103,59 +322,341 @@ def cli(
             log_file=log_file,
             log_level=log_level,
             workers=workers,
+            order=order,
+            scan_mode=scan_mode,
+            include=include,
+            exclude=exclude,
+            max_depth=max_depth,
+            discovery_workers=discovery_workers,
+            document_timeout=document_timeout,
+            rule_timeout=rule_timeout,
+            read_ahead=read_ahead,
+            read_ahead_bytes=read_ahead_mb * 1024 * 1024,
+            mmap_input=mmap_input,
+            lazy_media=lazy_media,
+            write_behind=write_behind,
+            write_buffer_bytes=write_buffer_mb * 1024 * 1024,
+            output=output,
+            memory_profile=memory_profile,
+            memory_profile_top=memory_profile_top,
             sync_mode=sync_mode,
             find_only=find_only,
+            triage=triage,
             verbose=verbose,
+            match_store=match_store,
+            dedup=dedup,
         )
 
-        # Create combined config
-        app_config = AppConfig(transform=transform_config, runtime=runtime_config)
+        # Create combined configs, loading transform configs from YAML
+        if len(config) == 1:
+            configs = [AppConfig(transform=TransformConfig.from_yaml(config[0]), runtime=runtime_config)]
+        else:
+            configs = [
+                AppConfig(transform=TransformConfig.from_yaml(path), runtime=_config_runtime(runtime_config, path))
+                for path in config
+            ]
+            names = [path.stem for path in config]
+            if len(set(names)) < len(names):
+                raise ValueError(f"Config file names must be unique, they name each config's outputs: {names}")
 
-        ctx.obj["config"] = app_config
+        ctx.obj["config"] = configs[0]
+        ctx.obj["configs"] = configs
+        ctx.obj["config_path"] = config[0]
+        ctx.obj["config_paths"] = list(config)
 
     except Exception as e:
         raise click.ClickException(str(e))
 
 
+def _config_runtime(runtime: RuntimeConfig, config_path: Path) -> RuntimeConfig:
+    """Runtime options for one of several configs, with its destination, log and match store named after it."""
+    name = config_path.stem
+    log_file = runtime.log_file
+    match_store = runtime.match_store
+    return replace(
+        runtime,
+        destination_dir=runtime.destination_dir / name,
+        log_file=log_file.with_name(f"{log_file.stem}_{name}{log_file.suffix}"),
+        match_store=match_store.with_name(f"{match_store.stem}_{name}{match_store.suffix}") if match_store else None,
+    )
+
+
+def _single_config(ctx: click.Context) -> AppConfig:
+    if len(ctx.obj["configs"]) > 1:
+        raise click.UsageError(f"'{ctx.info_name}' accepts a single --config")
+    return ctx.obj["config"]
+
+
 @cli.command()
+@click.option(
+    "--from-catalog",
+    "catalog_path",
+    type=click.Path(exists=True, dir_okay=False, path_type=Path),
+    help="Find matches in a catalog built by the catalog command instead of opening the documents",
+)
 @click.pass_context
-def run(ctx: click.Context):
+def run(ctx: click.Context, catalog_path: Optional[Path]):
     """Process documents according to configuration."""
-    config = ctx.obj["config"]
-    process_documents(config)
+    configs = ctx.obj["configs"]
+    if catalog_path is not None and not all(config.runtime.find_only for config in configs):
+        raise click.UsageError("--from-catalog only finds matches and cannot be combined with --modify")
+    if catalog_path is not None and configs[0].runtime.triage:
+        raise click.UsageError("--from-catalog cannot be combined with --triage")
+    ctx.exit(process_documents(*configs, catalog_path=catalog_path))
 
 
 @cli.command()
+@click.argument("catalog_path", type=click.Path(dir_okay=False, path_type=Path))
 @click.pass_context
-def validate(ctx: click.Context):
-    from config.constants import DEFAULT_LOG_LEVEL
+def catalog(ctx: click.Context, catalog_path: Path):
+    """Extract the URLs, styles and paragraph text of every document into a catalog for run --from-catalog.
+
+    Only documents added or changed since the catalog was last updated are opened."""
+    from .processors.catalog import CatalogBatchProcessor
+    from .storage.catalog import Catalog
+
+    config = _single_config(ctx)
+    try:
+        logger: Logger = setup_logger(config)
+    except Exception as e:
+        raise click.ClickException(f"Failed to initialize logger: {e}")
+
+    store = Catalog(catalog_path)
+    try:
+        updated, unchanged, removed = CatalogBatchProcessor(config=config, logger=logger).update_catalog(store)
+    finally:
+        store.close()
+    click.echo(f"Catalog {catalog_path}: {updated} documents updated, {unchanged} unchanged, {removed} removed")
+
+
+@cli.command()
+@click.option("--socket", "socket_path", type=click.Path(path_type=Path), help="Accept jobs on a Unix domain socket")
+@click.option("--host", default="127.0.0.1", show_default=True, help="Loopback address for the HTTP job API")
+@click.option("--port", type=click.IntRange(min=0), default=8765, show_default=True, help="Port for the HTTP job API")
+@click.option(
+    "--allow-remote",
+    is_flag=True,
+    help="Serve HTTP on a non-loopback --host; jobs can then read and write any file the server user can",
+)
+@click.option(
+    "--token-file",
+    "token_path",
+    type=click.Path(dir_okay=False, path_type=Path),
+    help="File the HTTP job token is written to, readable by the server user only [default: <log-file>_serve.token]",
+)
+@click.pass_context
+def serve(ctx: click.Context, socket_path: Path, host: str, port: int, allow_remote: bool, token_path: Optional[Path]):
+    """Keep workers and rules warm and process documents submitted as jobs."""
+    from .server import DocumentService, serve as serve_jobs
+
+    config = _single_config(ctx)
+    try:
+        logger: Logger = setup_logger(config)
+    except Exception as e:
+        raise click.ClickException(f"Failed to initialize logger: {e}")
+
+    if token_path is None:
+        log_file = config.runtime.log_file
+        token_path = log_file.with_name(f"{log_file.stem}_serve.token")
+    service = DocumentService(config, ctx.obj["config_path"], logger)
+    try:
+        serve_jobs(
+            service, socket_path=socket_path, host=host, port=port, allow_remote=allow_remote, token_path=token_path
+        )
+    except (OSError, RuntimeError) as e:
+        raise click.ClickException(str(e))
+
+
+@cli.command()
+@click.option(
+    "--debounce",
+    type=click.FloatRange(min=0),
+    default=2.0,
+    show_default=True,
+    help="Seconds a document must stay unchanged before it is queued",
+)
+@click.option(
+    "--poll-interval",
+    type=click.FloatRange(min=0.1),
+    default=5.0,
+    show_default=True,
+    help="Seconds between scans when polling",
+)
+@click.option("--poll", "force_poll", is_flag=True, help="Poll the source directory even if inotify is available")
+@click.pass_context
+def watch(ctx: click.Context, debounce: float, poll_interval: float, force_poll: bool):
+    """Watch the source directory and process documents as they are created or modified."""
+    from .processors.batch import BatchProcessor
+    from .processors.watch import DocumentWatcher
+
+    config = _single_config(ctx)
+    try:
+        logger: Logger = setup_logger(config)
+    except Exception as e:
+        raise click.ClickException(f"Failed to initialize logger: {e}")
+
+    processor = BatchProcessor(config=config, logger=logger)
+    watcher = DocumentWatcher(processor, debounce=debounce, poll_interval=poll_interval, use_inotify=not force_poll)
+    watcher.run()
+
+
+@cli.command("apply-delta")
+@click.argument("output_dir", type=click.Path(file_okay=False, path_type=Path))
+@click.pass_context
+def apply_delta(ctx: click.Context, output_dir: Path):
+    """Rebuild full documents into OUTPUT_DIR from the deltas of a --output delta run in the destination directory
+    and the originals in the source directory.
+
+    Each original must be byte-identical to the document the delta was made from."""
+    from .processors.delta import apply_deltas
+
+    config = _single_config(ctx)
+    try:
+        logger: Logger = setup_logger(config)
+    except Exception as e:
+        raise click.ClickException(f"Failed to initialize logger: {e}")
+
+    runtime = config.runtime
+    rebuilt, failed = apply_deltas(runtime.source_dir, runtime.destination_dir, output_dir, logger)
+    click.echo(f"Rebuilt {rebuilt} documents in {output_dir}")
+    if failed:
+        raise click.ClickException(f"{failed} deltas could not be applied, see {runtime.log_file}")
+
+
+def _format_bytes(value: float) -> str:
+    for unit in ("B", "KB", "MB", "GB"):
+        if value < 1024 or unit == "GB":
+            return f"{value:,.0f} {unit}" if unit == "B" else f"{value:,.1f} {unit}"
+        value /= 1024
+
+
+def _format_estimate(estimate, fmt=lambda value: f"{value:,.0f}") -> str:
+    return f"{fmt(estimate.total)} (95% CI {fmt(estimate.low)} - {fmt(estimate.high)})"
+
 
+@cli.command()
+@click.option(
+    "--sample",
+    "sample_size",
+    type=click.IntRange(min=1),
+    default=50,
+    show_default=True,
+    help="Number of documents to process, spread over folder and size strata",
+)
+@click.option("--seed", type=int, help="Random seed, to draw the same sample again")
+@click.option("--json", "as_json", is_flag=True, help="Print the plan as JSON")
+@click.pass_context
+def plan(ctx: click.Context, sample_size: int, seed: int, as_json: bool):
+    """Estimate run time, matches and resources from a sample of the source directory."""
+    import json
+
+    from .processors.planner import RunPlanner
+
+    config = _single_config(ctx)
+    try:
+        logger: Logger = setup_logger(config)
+    except Exception as e:
+        raise click.ClickException(f"Failed to initialize logger: {e}")
+
+    result = RunPlanner(config, logger, sample_size=sample_size, seed=seed).plan()
+    if as_json:
+        click.echo(json.dumps(result.to_dict(), indent=2))
+        return
+
+    def seconds(value):
+        return f"{value:,.1f} s"
+
+    click.echo(
+        f"Run plan for {config.runtime.source_dir}: {result.documents} documents, "
+        f"{_format_bytes(result.total_bytes)}, sampled {len(result.samples)} in {result.strata} strata"
+    )
+    click.echo(f"  Processing time (one worker): {_format_estimate(result.runtime_seconds, seconds)}")
+    click.echo(f"  Documents with matches: {_format_estimate(result.matching_documents)}")
+    click.echo(f"  Matches: {_format_estimate(result.matches)}")
+    for rule, estimate in result.rule_matches.items():
+        click.echo(f"    {rule}: {_format_estimate(estimate)}")
+    if result.output_bytes is not None:
+        click.echo(f"  Output size: {_format_estimate(result.output_bytes, _format_bytes)}")
+    click.echo(f"  Failed documents: {_format_estimate(result.failures)}")
+    if result.worker_memory_bytes is not None:
+        click.echo(f"  Peak memory per worker: {_format_bytes(result.worker_memory_bytes)}")
+    click.echo("  Estimated wall time, assuming throughput scales with workers:")
+    for workers, wall in result.wall_seconds.items():
+        click.echo(f"    {workers} worker{'s' if workers > 1 else ''}: {seconds(wall)}")
+    click.echo(f"  Recommended workers: {result.recommended_workers}")
+
+
+@cli.command()
+@click.pass_context
+def validate(ctx: click.Context):
     """Validate configuration without processing documents.
     This command performs a dry-run validation of the configuration,
     checking that all paths exist and patterns are valid.
     """
 
     config = ctx.obj["config"]
+    configs = ctx.obj["configs"]
     click.echo("Configuration validation:")
     click.echo(f"  Version: {__version__}")
     click.echo(f"  Source directory: {config.runtime.source_dir}")
-    click.echo(f"  Destination directory: {config.runtime.destination_dir}")
-    click.echo(f"  Log file: {config.runtime.log_file}")
+    if len(configs) == 1:
+        click.echo(f"  Destination directory: {config.runtime.destination_dir}")
+        click.echo(f"  Log file: {config.runtime.log_file}")
     click.echo(f"  Log level (Default): {config.runtime.log_level} (default: {DEFAULT_LOG_LEVEL})")
     if config.runtime.verbose:
         click.echo(f"  Log level (run): {config.runtime.verbose}")
     click.echo(f"  Processing mode: {'sync' if config.runtime.sync_mode else 'async'}")
     click.echo(f"  Workers: {config.runtime.workers}")
-    click.echo(f"  Operation: {'find-only' if config.runtime.find_only else 'modify'}")
-    click.echo("\nURL patterns:")
-    for url in config.transform.url_transforms:
-        click.echo(f"from: {url.from_pattern} → to: {url.to_pattern}")
-    click.echo("\nStyle patterns:")
-    for style in config.transform.style_transforms:
-        click.echo(f"from: {style.from_pattern} → to: {style.to_pattern}")
-    click.echo("\nText patterns:")
-    for text in config.transform.text_transforms:
-        click.echo(f"from: {text.from_pattern} → to: {text.to_pattern}")
+    click.echo(f"  Order: {config.runtime.order}")
+    click.echo(f"  Text scan: {config.runtime.scan_mode}")
+    if config.runtime.include:
+        click.echo(f"  Include: {', '.join(config.runtime.include)}")
+    if config.runtime.exclude:
+        click.echo(f"  Exclude: {', '.join(config.runtime.exclude)}")
+    if config.runtime.max_depth is not None:
+        click.echo(f"  Maximum depth: {config.runtime.max_depth}")
+    if config.runtime.read_ahead:
+        click.echo(
+            f"  Read-ahead: {config.runtime.read_ahead} documents, "
+            f"{config.runtime.read_ahead_bytes // (1024 * 1024)} MB"
+        )
+    if config.runtime.mmap_input:
+        click.echo("  Input: memory-mapped")
+    if config.runtime.lazy_media:
+        click.echo("  Media parts: lazy")
+    if config.runtime.document_timeout:
+        click.echo(f"  Document timeout: {config.runtime.document_timeout:g}s")
+    if config.runtime.rule_timeout:
+        click.echo(f"  Rule timeout: {config.runtime.rule_timeout:g}s")
+    if config.runtime.memory_profile:
+        click.echo(f"  Memory profile: top {config.runtime.memory_profile_top} documents")
+    operation = "triage" if config.runtime.triage else "find-only" if config.runtime.find_only else "modify"
+    click.echo(f"  Operation: {operation}")
+    if not config.runtime.find_only:
+        write_mode = "inline"
+        if config.runtime.write_behind:
+            write_mode = f"write-behind, {config.runtime.write_buffer_bytes // (1024 * 1024)} MB buffer"
+        click.echo(f"  Output writes: {write_mode}")
+        click.echo(f"  Output: {config.runtime.output}")
+    click.echo(f"  Deduplication: {'on' if config.runtime.dedup else 'off'}")
+    if len(configs) == 1 and config.runtime.match_store:
+        click.echo(f"  Match store: {config.runtime.match_store}")
+    for path, app_config in zip(ctx.obj["config_paths"], configs):
+        if len(configs) > 1:
+            click.echo(f"\nConfig {path}:")
+            click.echo(f"  Destination directory: {app_config.runtime.destination_dir}")
+            click.echo(f"  Log file: {app_config.runtime.log_file}")
+            if app_config.runtime.match_store:
+                click.echo(f"  Match store: {app_config.runtime.match_store}")
+        click.echo("\nURL patterns:")
+        for url in app_config.transform.url_transforms:
+            click.echo(f"from: {url.from_pattern} → to: {url.to_pattern}")
+        click.echo("\nStyle patterns:")
+        for style in app_config.transform.style_transforms:
+            click.echo(f"from: {style.from_pattern} → to: {style.to_pattern}")
+        click.echo("\nText patterns:")
+        for text in app_config.transform.text_transforms:
+            click.echo(f"from: {text.from_pattern} → to: {text.to_pattern}")
 
     click.echo("\nConfiguration is valid! ✓")
 
@@ -1,9 +1,19 @@
 from dataclasses import dataclass
 from pathlib import Path
-from typing import List
+from typing import List, Optional, Tuple
 
 import yaml
 
+from .constants import (
+    DEFAULT_DISCOVERY_WORKERS,
+    DEFAULT_MEMORY_PROFILE_TOP,
+    DEFAULT_READ_AHEAD_BYTES,
+    DEFAULT_WRITE_BUFFER_BYTES,
+    ORDER_LARGEST_FIRST,
+    OUTPUT_FULL,
+    SCAN_PARAGRAPH,
+)
+
 
 @dataclass
 class RegexTransform:
@@ -47,6 +57,26 @@ class RuntimeConfig:
     sync_mode: bool
     find_only: bool
     verbose: int
+    match_store: Optional[Path] = None
+    dedup: bool = False
+    order: str = ORDER_LARGEST_FIRST
+    document_timeout: Optional[float] = None
+    rule_timeout: Optional[float] = None
+    read_ahead: int = 0
+    read_ahead_bytes: int = DEFAULT_READ_AHEAD_BYTES
+    mmap_input: bool = False
+    lazy_media: bool = False
+    write_behind: bool = True
+    write_buffer_bytes: int = DEFAULT_WRITE_BUFFER_BYTES
+    scan_mode: str = SCAN_PARAGRAPH
+    include: Tuple[str, ...] = ()
+    exclude: Tuple[str, ...] = ()
+    max_depth: Optional[int] = None
+    discovery_workers: int = DEFAULT_DISCOVERY_WORKERS
+    memory_profile: bool = False
+    memory_profile_top: int = DEFAULT_MEMORY_PROFILE_TOP
+    triage: bool = False
+    output: str = OUTPUT_FULL
 
 
 @dataclass
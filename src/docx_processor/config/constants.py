@@ -8,6 +8,47 @@ from pathlib import Path
 # Default configuration values
 DEFAULT_CONFIG_FILE = Path("config.yml")
 DEFAULT_WORKERS = 4
+WORKER_MEMORY_BYTES = 512 * 1024 * 1024  # Memory budget per worker when sizing the pool automatically
+
+# Directory listings in flight while discovering documents, listings on network shares are latency bound
+DEFAULT_DISCOVERY_WORKERS = 16
+
+# Upper bound on document bytes held in memory by the read-ahead stage
+DEFAULT_READ_AHEAD_BYTES = 256 * 1024 * 1024
+# Upper bound on serialised output waiting for the write-behind stage
+DEFAULT_WRITE_BUFFER_BYTES = 256 * 1024 * 1024
+
+# Distinct styles parts whose transformed result is kept, a corpus is usually built from a few dozen templates
+STYLE_CACHE_SIZE = 128
+# Distinct URLs whose rewrite result is kept per process, shared by every worker and rule set
+URL_CACHE_SIZE = 65536
+
+# Match records and completion events waiting for a slow iter_matches consumer before workers pause
+DEFAULT_MATCH_QUEUE_SIZE = 1000
+
+# Extra seconds the batch waits past the document budget before abandoning a stuck worker
+TIMEOUT_GRACE_SECONDS = 5.0
+
+# Heaviest documents whose allocation sites a memory profile reports, and the sites reported for each
+DEFAULT_MEMORY_PROFILE_TOP = 5
+MEMORY_PROFILE_SITES = 10
+
+# Scheduling orders
+ORDER_LARGEST_FIRST = "largest-first"
+ORDER_DISCOVERY = "discovery"
+ORDERS = [ORDER_LARGEST_FIRST, ORDER_DISCOVERY]
+# Documents largest-first ordering holds back, so work starts before the source directory is fully walked
+ORDER_WINDOW = 64
+
+# Text scan modes: each rule runs over every paragraph separately, or once over the joined text of the document
+SCAN_PARAGRAPH = "paragraph"
+SCAN_DOCUMENT = "document"
+SCAN_MODES = [SCAN_PARAGRAPH, SCAN_DOCUMENT]
+
+# Output modes: a full copy of each processed document, or only the parts processing changed
+OUTPUT_FULL = "full"
+OUTPUT_DELTA = "delta"
+OUTPUTS = [OUTPUT_FULL, OUTPUT_DELTA]
 
 # Logging levels
 LOG_LEVEL_DEBUG = "DEBUG"
@@ -26,4 +67,30 @@ LOG_LEVEL_MAP = {
 
 LOG_LEVELS = [LOG_LEVEL_DEBUG, LOG_LEVEL_INFO, LOG_LEVEL_WARNING, LOG_LEVEL_ERROR]
 
-__all__ = ["DEFAULT_CONFIG_FILE", "DEFAULT_WORKERS", "DEFAULT_LOG_LEVEL", "LOG_LEVELS", "LOG_LEVEL_MAP"]
+__all__ = [
+    "DEFAULT_CONFIG_FILE",
+    "DEFAULT_WORKERS",
+    "WORKER_MEMORY_BYTES",
+    "TIMEOUT_GRACE_SECONDS",
+    "DEFAULT_MEMORY_PROFILE_TOP",
+    "MEMORY_PROFILE_SITES",
+    "DEFAULT_DISCOVERY_WORKERS",
+    "DEFAULT_READ_AHEAD_BYTES",
+    "DEFAULT_WRITE_BUFFER_BYTES",
+    "STYLE_CACHE_SIZE",
+    "URL_CACHE_SIZE",
+    "DEFAULT_MATCH_QUEUE_SIZE",
+    "DEFAULT_LOG_LEVEL",
+    "LOG_LEVELS",
+    "LOG_LEVEL_MAP",
+    "ORDERS",
+    "ORDER_LARGEST_FIRST",
+    "ORDER_DISCOVERY",
+    "ORDER_WINDOW",
+    "SCAN_MODES",
+    "SCAN_PARAGRAPH",
+    "SCAN_DOCUMENT",
+    "OUTPUTS",
+    "OUTPUT_FULL",
+    "OUTPUT_DELTA",
+]
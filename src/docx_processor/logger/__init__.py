@@ -7,8 +7,8 @@ from .custom_formatter import CustomFormatter
 from .docx import DocxLogger
 
 
-def setup_logger(config):
-    """Create and configure a logger instance."""
+def setup_logger(config, namespace=None):
+    """Create and configure a logger instance, separate from other loggers when given a ``namespace``."""
     from docx_processor.config.constants import LOG_LEVEL_MAP
     import logging
 
@@ -19,7 +19,9 @@ def setup_logger(config):
         adjusted_level = max(logging.DEBUG, base_level - (config.runtime.verbose * 10))
         config.runtime.log_level = logging.getLevelName(adjusted_level)
 
-    logger = DocxLogger(log_file=config.runtime.log_file, level=LOG_LEVEL_MAP[config.runtime.log_level])
+    logger = DocxLogger(
+        log_file=config.runtime.log_file, level=LOG_LEVEL_MAP[config.runtime.log_level], namespace=namespace
+    )
 
     return ContextLoggerAdapter(
         logger,
@@ -35,4 +37,19 @@ def setup_logger(config):
     )
 
 
-__all__ = ["DocxLogger", "setup_logger", "ContextLoggerAdapter", "CustomFormatter"]
+def create_task_logger(logger, input_path):
+    """Create a logger with isolated context for a single document so concurrent tasks do not share state."""
+    return ContextLoggerAdapter(
+        logger.logger,  # Get underlying logger
+        {
+            "document_name": input_path.name,
+            "document_full_path": str(input_path),
+            "section": "",
+            "module": "",
+            "location": "No Heading",
+            "match": "False",
+        },
+    )
+
+
+__all__ = ["DocxLogger", "setup_logger", "create_task_logger", "ContextLoggerAdapter", "CustomFormatter"]
@@ -9,8 +9,10 @@ from .custom_formatter import CustomFormatter
 class DocxLogger:
     CSV_HEADERS = "Timestamp,Level,Path,Document,Section,Module,Location,Table#|Row#,Task,Match,Message\n"
 
-    def __init__(self, log_file: Optional[Path] = None, level: int = logging.DEBUG):
-        self._logger = logging.getLogger(__name__)
+    def __init__(self, log_file: Optional[Path] = None, level: int = logging.DEBUG, namespace: Optional[str] = None):
+        # Loggers in their own namespace keep their records out of the shared log
+        self._logger = logging.getLogger(f"{__name__}.{namespace}" if namespace else __name__)
+        self.logger.propagate = not namespace
         self.logger.setLevel(level)
         # Remove any existing handlers
         for handler in self.logger.handlers[:]:
@@ -27,9 +29,9 @@ class DocxLogger:
             # Change extension to .csv
             log_file = log_file.with_suffix(".csv")
 
-        # Write headers if file doesn't exist or is empty
-        if not log_file.exists() or log_file.stat().st_size == 0:
-            log_file.write_text(self.CSV_HEADERS, encoding="utf-8")
+            # Write headers if file doesn't exist or is empty
+            if not log_file.exists() or log_file.stat().st_size == 0:
+                log_file.write_text(self.CSV_HEADERS, encoding="utf-8")
 
             file_handler = logging.FileHandler(log_file, mode="a", encoding="utf-8")
             file_handler.setFormatter(
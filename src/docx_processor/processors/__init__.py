@@ -2,8 +2,48 @@
 Core processing components for DOCX files.
 """
 
-from .batch import BatchProcessor
-from .document import DocumentProcessor
-from .docx_indexer import DocxIndexer
+import importlib
+from typing import TYPE_CHECKING
 
-__all__ = ["DocumentProcessor", "BatchProcessor", "DocxIndexer"]
+from .match import DocumentCompleted, MatchRecord
+from .rules import RuleSet
+
+if TYPE_CHECKING:
+    from .batch import BatchProcessor
+    from .catalog import CatalogBatchProcessor
+    from .document import DocumentProcessor
+    from .docx_indexer import DocxIndexer
+    from .multi import MultiConfigProcessor
+
+# Processors pull in python-docx and lxml, so they are only imported on first use
+_LAZY_IMPORTS = {
+    "BatchProcessor": ".batch",
+    "CatalogBatchProcessor": ".catalog",
+    "DocumentProcessor": ".document",
+    "DocxIndexer": ".docx_indexer",
+    "MultiConfigProcessor": ".multi",
+}
+
+
+def __getattr__(name):
+    if name not in _LAZY_IMPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_LAZY_IMPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + list(_LAZY_IMPORTS))
+
+
+__all__ = [
+    "DocumentProcessor",
+    "BatchProcessor",
+    "MultiConfigProcessor",
+    "CatalogBatchProcessor",
+    "DocxIndexer",
+    "DocumentCompleted",
+    "MatchRecord",
+    "RuleSet",
+]
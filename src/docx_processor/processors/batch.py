@@ -1,110 +1,551 @@
 # src/docx_processor/processors/batch.py
 import asyncio
+import csv
+import hashlib
+import shutil
 import time
-from concurrent.futures import ThreadPoolExecutor
+from collections import Counter, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as WorkerTimeout
+from contextlib import nullcontext, suppress
+from dataclasses import replace
+from io import BytesIO
 from pathlib import Path
+from typing import AsyncIterator, Deque, Dict, Iterable, Iterator, List, Optional, Tuple, Union
 
-from docx_processor.logger import ContextLoggerAdapter
+from docx_processor.config.constants import (
+    DEFAULT_MATCH_QUEUE_SIZE,
+    ORDER_LARGEST_FIRST,
+    ORDER_WINDOW,
+    OUTPUT_DELTA,
+    TIMEOUT_GRACE_SECONDS,
+)
+from docx_processor.logger import create_task_logger
+from docx_processor.storage import MatchStore
+from .delta import delta_path, make_delta
+from .discovery import PathFilter, discover_documents
 from .document import DocumentProcessor
+from .match import DocumentCompleted, MatchRecord
+from .memory import MemoryProfiler
+from .prefetch import ReadAhead
+from .rules import RuleSet
+from .scheduler import largest_first
+from .triage import TriageProcessor, TriageReport
+from .writer import OutputWriter
+
+ABANDONED_REASON = "worker abandoned after exceeding the document budget"
+
+
+class DocumentEvents(list):
+    """DocumentCompleted events of a document and its copies, with the writes that still decide their outcome."""
+
+    def __init__(self):
+        super().__init__()
+        self.writes: List[Tuple[DocumentCompleted, Future]] = []
+
+    def written(self) -> bool:
+        return all(write.done() for _, write in self.writes)
+
+    def resolve(self) -> Tuple[List[DocumentCompleted], bool]:
+        """The final events once every write is done, waiting for them, and whether all of them succeeded."""
+        failed = {}
+        for event, write in self.writes:
+            error = write.exception()
+            if error is not None:
+                failed[id(event)] = replace(event, error=f"Failed to write output: {error}")
+        # An abandoned worker may still append to the list, its events were already replaced
+        return [failed.get(id(event), event) for event in list(self)], not failed
+
+
+def _content_hash(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+async def _iterate_in_thread(iterable) -> AsyncIterator:
+    """Iterate over a blocking iterable without blocking the event loop, fetching each item in a thread."""
+    iterator = iter(iterable)
+    if isinstance(iterable, (list, tuple)):
+        for item in iterator:
+            yield item
+        return
+    loop = asyncio.get_event_loop()
+    done = object()
+    while True:
+        item = await loop.run_in_executor(None, next, iterator, done)
+        if item is done:
+            return
+        yield item
 
 
 class BatchProcessor:
     def __init__(self, config, logger):
         self.config = config
         self.logger = logger
-        self.workers = config.runtime.workers
-        self.find_only = config.runtime.find_only
+        # Memory profiling measures one document at a time, and the worker slots enforce it
+        self.workers = 1 if config.runtime.memory_profile else config.runtime.workers
+        # Triage never modifies documents, whatever --find-only says
+        self.find_only = config.runtime.find_only or config.runtime.triage
+        self.delta = config.runtime.output == OUTPUT_DELTA and not self.find_only
+        self.dedup = config.runtime.dedup
+        self.rules = RuleSet(config.transform)
         self.processed_count = 0
         self.start_time = None
+        self.match_store = None
+        self.quarantined: List[Tuple[Path, str]] = []
+        self.abandoned = 0
+        self._executor = None
+        self._read_ahead = None
+        self._writer = None
+        self._memory: Optional[MemoryProfiler] = None
+        self._triage: Optional[TriageReport] = None
 
     def process_all_docx(self) -> None:
         """Process all documents in the source directory synchronously."""
+        self.process_paths(self._get_document_paths())
+
+    def process_paths(self, paths) -> None:
+        """Process the given documents synchronously."""
+        for _ in self._run_paths(paths):
+            pass
+
+    def iter_matches_sync(self, paths=None) -> Iterator[Union[MatchRecord, DocumentCompleted]]:
+        """Process documents synchronously, yielding each document's matches and then its DocumentCompleted
+        event as soon as it finishes. Processing only advances as the consumer iterates.
+        Defaults to every document in the source directory."""
+        for completed in self._run_paths(self._get_document_paths() if paths is None else paths):
+            yield from completed.matches
+            yield completed
+
+    def _run_paths(self, paths) -> Iterator[DocumentCompleted]:
         self.start_time = time.time()
         self.processed_count = 0
+        groups = self._open_stages(self._ordered(self._group_paths(paths)))
+        if self.config.runtime.document_timeout:
+            # The watchdog needs documents on a worker thread, which still processes them one at a time
+            self._executor = ThreadPoolExecutor(max_workers=1)
 
-        for input_path in self._get_document_paths():
-            processor = DocumentProcessor(self.config, self.logger)
-            relative_path = input_path.relative_to(self.config.runtime.source_dir)
-            output_path = self._get_output_path(relative_path)
-            processor.process_document(input_path, output_path)
-            self.processed_count += 1
+        # Documents whose outputs the writer has not put in place yet, in processing order
+        pending: Deque[Tuple[DocumentEvents, int]] = deque()
+        try:
+            for input_path, copies in groups:
+                relative_path = input_path.relative_to(self.config.runtime.source_dir)
+                output_path = self._get_output_path(relative_path)
+                completed = DocumentEvents()
+                if self._executor is not None:
+                    result = self._process_single_document_watched(input_path, output_path, copies, completed)
+                else:
+                    result = self._process_single_document(input_path, output_path, self.logger, copies, completed)
+                pending.append((completed, 1 + len(copies) if result else 0))
+                while pending and pending[0][0].written():
+                    yield from self._complete_written(*pending.popleft())
+            while pending:
+                yield from self._complete_written(*pending.popleft())
+        finally:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+                self._executor = None
+            self._close_stages()
 
         total_time = time.time() - self.start_time
         self.logger.info(f"Processing complete. Documents processed: {self.processed_count}")
         self.logger.info(f"Total processing time: {total_time:.2f} seconds")
+        self._log_cache_stats()
+
+    def _complete_written(self, completed: DocumentEvents, count: int) -> List[DocumentCompleted]:
+        """Count a document and its copies as processed once their outputs are written, and return their events."""
+        events, written = completed.resolve()
+        if written:
+            self.processed_count += count
+        return events
+
+    def _process_single_document_watched(
+        self, input_path: Path, output_path: Path, copies=(), completed: Optional[DocumentEvents] = None
+    ) -> bool:
+        """Process a single document on the worker thread, abandoning it once it overruns its budget."""
+        future = self._executor.submit(
+            self._process_single_document, input_path, output_path, self.logger, copies, completed
+        )
+        try:
+            return future.result(self.config.runtime.document_timeout + TIMEOUT_GRACE_SECONDS)
+        except WorkerTimeout:
+            self._abandon(input_path, create_task_logger(self.logger, input_path), copies)
+            self._complete_failed(completed, (input_path, *copies), "Timed out, worker abandoned")
+            return False
 
     async def process_all_docx_async(self) -> None:
         """Process all documents in the source directory asynchronously."""
+        await self.process_paths_async(self._get_document_paths())
+
+    async def iter_matches(
+        self, paths=None, queue_size: int = DEFAULT_MATCH_QUEUE_SIZE
+    ) -> AsyncIterator[Union[MatchRecord, DocumentCompleted]]:
+        """Process documents asynchronously, yielding each document's matches and then its DocumentCompleted
+        event as soon as it finishes. At most ``queue_size`` items wait for the consumer; when the queue is
+        full, workers hold on to their results and no further documents start.
+        Defaults to every document in the source directory."""
+        paths = self._get_document_paths() if paths is None else paths
+        queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        finished = object()
+
+        async def publish(completed: DocumentCompleted) -> None:
+            for match in completed.matches:
+                await queue.put(match)
+            await queue.put(completed)
+
+        async def produce() -> None:
+            try:
+                await self.process_paths_async(paths, on_complete=publish)
+            except asyncio.CancelledError:
+                # Only the consumer cancels, and it no longer reads the queue
+                raise
+            except Exception:
+                await queue.put(finished)
+                raise
+            await queue.put(finished)
+
+        producer = asyncio.ensure_future(produce())
+        try:
+            while True:
+                item = await queue.get()
+                if item is finished:
+                    break
+                yield item
+            await producer
+        finally:
+            if not producer.done():
+                # The consumer stopped early, so stop starting documents and release the stages
+                producer.cancel()
+                with suppress(asyncio.CancelledError):
+                    await producer
+
+    async def process_paths_async(self, paths, on_complete=None) -> None:
+        """Process the given documents asynchronously.
+
+        ``on_complete`` is awaited with each DocumentCompleted event once the document's outputs are written, so a
+        slow callback holds back the start of further documents. A document hands its worker slot on as soon as the
+        writer has its outputs, and at most ``workers`` documents wait on the writer."""
         self.start_time = time.time()
         self.processed_count = 0
 
-        paths = list(self._get_document_paths())
         # Create semaphore to limit concurrent tasks
         semaphore = asyncio.Semaphore(self.workers)
+        publishing = asyncio.Semaphore(self.workers)
 
-        async def process_with_semaphore(input_path, output_path):
+        async def publish(completed: DocumentEvents, result: bool) -> bool:
+            events, written = completed.resolve()
+            if on_complete is not None:
+                for event in events:
+                    await on_complete(event)
+            return result and written
+
+        async def process_with_semaphore(input_path, output_path, copies):
             async with semaphore:
-                return await self._process_single_document_async(input_path, output_path)
+                completed = DocumentEvents()
+                result = await self._process_single_document_async(input_path, output_path, copies, completed)
+                if not completed.writes:
+                    return await publish(completed, result)
+                # Taken before the worker slot is released, so documents waiting to publish hold back new ones
+                await publishing.acquire()
+            try:
+                await asyncio.gather(
+                    *(asyncio.wrap_future(write) for _, write in completed.writes), return_exceptions=True
+                )
+                return await publish(completed, result)
+            finally:
+                publishing.release()
 
+        groups = self._open_stages(self._ordered(self._group_paths(paths)))
+        self._executor = ThreadPoolExecutor(max_workers=self.workers)
+        started = []
         tasks = []
-        for input_path in paths:
-            relative_path = input_path.relative_to(self.config.runtime.source_dir)
-            output_path = self._get_output_path(relative_path)
-            task = process_with_semaphore(input_path, output_path)
-            tasks.append(task)
+        try:
+            # Documents start while the source directory is still being walked
+            async for input_path, copies in _iterate_in_thread(groups):
+                relative_path = input_path.relative_to(self.config.runtime.source_dir)
+                output_path = self._get_output_path(relative_path)
+                started.append((input_path, copies))
+                tasks.append(asyncio.ensure_future(process_with_semaphore(input_path, output_path, copies)))
 
-        # Process all tasks concurrently
-        completed = await asyncio.gather(*tasks, return_exceptions=True)
-        self.processed_count = sum(1 for result in completed if result is True)
+            # Process all tasks concurrently
+            completed = await asyncio.gather(*tasks, return_exceptions=True)
+        finally:
+            for task in tasks:
+                task.cancel()
+            self._executor.shutdown(wait=False)
+            self._executor = None
+            self._close_stages()
+        self.processed_count = sum(1 + len(copies) for (_, copies), result in zip(started, completed) if result is True)
 
         total_time = time.time() - self.start_time
         self.logger.info(f"Processing complete. Documents processed: {self.processed_count}")
         self.logger.info(f"Total processing time: {total_time:.2f} seconds")
+        self._log_cache_stats()
         self.logger.info(f"Average time per document: {total_time / max(1, self.processed_count):.2f} seconds")
 
-    async def _process_single_document_async(self, input_path: Path, output_path: Path) -> bool:
+    async def _process_single_document_async(
+        self, input_path: Path, output_path: Path, copies=(), completed: Optional[DocumentEvents] = None
+    ) -> bool:
         """Process a single document asynchronously."""
         # Create task-specific logger with isolated context so that Async does not hose up logs
-        task_logger = ContextLoggerAdapter(
-            self.logger.logger,  # Get underlying logger
-            {
-                "document_name": input_path.name,
-                "document_full_path": str(input_path),
-                "section": "",
-                "module": "",
-                "location": "No Heading",
-                "match": "False",
-            },
-        )
+        task_logger = create_task_logger(self.logger, input_path)
         try:
-            # Run CPU-intensive document processing in a thread pool
+            # Run CPU-intensive document processing in the shared thread pool
             loop = asyncio.get_event_loop()
-            with ThreadPoolExecutor() as pool:
-                result = await loop.run_in_executor(
-                    pool, self._process_single_document, input_path, output_path, task_logger
-                )
-            return result
+            future = loop.run_in_executor(
+                self._executor,
+                self._process_single_document,
+                input_path,
+                output_path,
+                task_logger,
+                copies,
+                completed,
+            )
+            timeout = self.config.runtime.document_timeout
+            if not timeout:
+                return await future
+            # Budget checks and regex timeouts inside the worker normally stop the document in time, the
+            # watchdog catches a worker stuck anywhere else, such as parsing or saving a huge part.
+            return await asyncio.wait_for(future, timeout + TIMEOUT_GRACE_SECONDS)
+        except asyncio.TimeoutError:
+            self._abandon(input_path, task_logger, copies)
+            self._complete_failed(completed, (input_path, *copies), "Timed out, worker abandoned")
+            return False
         except Exception as e:
             task_logger.logger.error(f"Failed to process {input_path}: {e}")
+            self._complete_failed(completed, (input_path, *copies), str(e))
             return False
 
-    def _process_single_document(self, input_path: Path, output_path: Path, task_logger) -> bool:
+    def _process_single_document(
+        self, input_path: Path, output_path: Path, task_logger, copies=(), completed: Optional[DocumentEvents] = None
+    ) -> bool:
+        """Process a document and its copies, appending a DocumentCompleted event for each to ``completed``."""
+        try:
+            data = self._read_ahead.take(input_path) if self._read_ahead else None
+            source = BytesIO(data) if data is not None else None
+            return self._run_document(input_path, output_path, task_logger, copies, completed, source=source)
+        finally:
+            if self._read_ahead:
+                self._read_ahead.release(input_path)
+
+    def _run_document(
+        self, input_path: Path, output_path: Path, task_logger, copies, completed, source=None, loader=None
+    ) -> bool:
+        """Apply the rules to a document read from ``source`` or supplied by ``loader``, and save the results."""
         try:
             # Create a new processor instance for each document to avoid state sharing
-            processor = DocumentProcessor(self.config, task_logger)
-            processor.process_document(input_path, output_path)
+            processor_class = TriageProcessor if self.config.runtime.triage else DocumentProcessor
+            processor = processor_class(self.config, task_logger, self.rules)
+            # With write-behind the worker only serialises the document, the writer saves it. A delta is made from
+            # the serialised document, so it is always serialised in memory
+            output = BytesIO() if self._writer or self.delta else output_path
+            with self._memory.document(input_path) if self._memory else nullcontext() as memory:
+                processor.memory = memory
+                matches = processor.process_document(input_path, output, source, loader)
+            self._record_matches(matches)
+            serialised = output.getvalue() if output is not output_path and processor.error is None else None
+            if serialised is not None and self.delta:
+                serialised = make_delta(source or input_path, serialised)
+                output_path = delta_path(output_path)
+                if not self._writer:
+                    output_path.write_bytes(serialised)
+            writes: Dict[Path, Future] = {}
+            if serialised is not None and self._writer:
+                writes[input_path] = self._writer.submit(output_path, serialised)
+            if processor.quarantine_reason:
+                self._quarantine(input_path, processor.quarantine_reason)
+            if self._triage:
+                self._triage.add(input_path, processor)
+            results = [(input_path, matches)]
+            for copy_path in copies:
+                results.append((copy_path, self._complete_copy(copy_path, output_path, processor, serialised, writes)))
+
+            if completed is not None:
+                for path, path_matches in results:
+                    event = DocumentCompleted(str(path), path_matches, processor.error, processor.quarantine_reason)
+                    completed.append(event)
+                    # The worker moves on, the event completes once the writer has put the output in place
+                    if path in writes:
+                        completed.writes.append((event, writes[path]))
             return True
         except Exception as e:
             self.logger.error(f"Failed to process {input_path}: {e}")
+            self._complete_failed(completed, (input_path, *copies), str(e))
             return False
 
-    def _get_document_paths(self):
-        """Get all valid document paths."""
-        return [
-            input_path
-            for input_path in self.config.runtime.source_dir.rglob("*.docx")
-            if not input_path.name.startswith("~$")  # Skip temporary Word files
-        ]
+    @staticmethod
+    def _complete_failed(completed: Optional[list], paths, error: str) -> None:
+        """Add failure events for documents that did not get a DocumentCompleted event of their own."""
+        if completed is None:
+            return
+        reported = {event.document for event in completed}
+        completed.extend(DocumentCompleted(str(path), [], error) for path in paths if str(path) not in reported)
+
+    def _complete_copy(
+        self, copy_path: Path, output_path: Path, processor: DocumentProcessor, serialised=None, writes=None
+    ) -> List[MatchRecord]:
+        """Give a byte-identical copy the output and matches of the document that was processed. Outputs handed to
+        the writer are added to ``writes``."""
+        copy_output = self._get_output_path(copy_path.relative_to(self.config.runtime.source_dir))
+        if self.delta:
+            # Byte-identical originals share their delta, the manifest names no source path
+            copy_output = delta_path(copy_output)
+        if serialised is not None and self._writer:
+            writes[copy_path] = self._writer.submit(copy_output, serialised)
+        elif not self.find_only and processor.error is None:
+            shutil.copyfile(output_path, copy_output)
+
+        copy_processor = DocumentProcessor(self.config, create_task_logger(self.logger, copy_path), self.rules)
+        matches = copy_processor.replay_matches(copy_path, processor.matches, processor.error)
+        self._record_matches(matches)
+        if processor.quarantine_reason:
+            self._quarantine(copy_path, processor.quarantine_reason)
+        if self._triage:
+            self._triage.add(copy_path, processor)
+        return matches
+
+    def _abandon(self, input_path: Path, task_logger, copies) -> None:
+        """Give up on a document whose worker is stuck past its budget and replace the worker pool."""
+        self.abandoned += 1
+        if self._read_ahead:
+            self._read_ahead.release(input_path)
+        task_logger.extra["task"] = "TIMEOUT"
+        task_logger.error(f"Failed to process {input_path} with error: Timed out, worker abandoned")
+        for path in (input_path, *copies):
+            self._quarantine(path, ABANDONED_REASON)
+
+        # The stuck thread stops at its next budget check, later documents get a fresh pool meanwhile
+        stuck_executor, self._executor = self._executor, ThreadPoolExecutor(max_workers=self.workers)
+        stuck_executor.shutdown(wait=False)
+
+    def _log_cache_stats(self) -> None:
+        caches = (("Style cache", self.rules.style_cache, "templates"), ("URL cache", self.rules.url_cache, "URLs"))
+        for name, cache, entries in caches:
+            if cache.hits or cache.misses:
+                self.logger.info(
+                    f"{name}: {cache.hits} hits, {cache.misses} misses ({cache.hit_rate:.0%}), "
+                    f"{len(cache)} {entries} held"
+                )
+
+    def _quarantine(self, input_path: Path, reason: str) -> None:
+        self.quarantined.append((input_path, reason))
+
+    def _write_quarantine(self) -> None:
+        """Append quarantined documents to a CSV file next to the log file."""
+        if not self.quarantined:
+            return
+        log_file = self.config.runtime.log_file
+        quarantine_file = log_file.with_name(f"{log_file.stem}_quarantine.csv")
+        write_header = not quarantine_file.exists()
+        with open(quarantine_file, "a", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            if write_header:
+                writer.writerow(["Path", "Reason"])
+            writer.writerows((str(path), reason) for path, reason in self.quarantined)
+        self.logger.warning(f"{len(self.quarantined)} documents quarantined, see {quarantine_file}")
+
+    def _group_paths(self, paths) -> Iterable[Tuple[Path, List[Path]]]:
+        """Pair each document to process with the byte-identical copies that can reuse its results. Without dedup
+        the pairs are generated as ``paths`` yields documents; with it every document is hashed first and a list is
+        returned."""
+        if not self.dedup:
+            return ((path, []) for path in paths)
+
+        paths = list(paths)
+
+        # Only documents sharing a size can be identical, so only those need hashing
+        sizes = {path: path.stat().st_size for path in paths}
+        size_counts = Counter(sizes.values())
+
+        groups = {}
+        for path in paths:
+            key = _content_hash(path) if size_counts[sizes[path]] > 1 else path
+            groups.setdefault(key, []).append(path)
+
+        copies = len(paths) - len(groups)
+        self.logger.info(f"Deduplication: {len(paths)} documents, {len(groups)} distinct, {copies} copies reused")
+        return [(group[0], group[1:]) for group in groups.values()]
+
+    def _ordered(self, groups: Iterable[Tuple[Path, List[Path]]]) -> Iterable[Tuple[Path, List[Path]]]:
+        if self.config.runtime.order == ORDER_LARGEST_FIRST:
+            # Start the most expensive documents first so one large file cannot set the tail time, looking ahead
+            # only a window of documents so processing still starts while the source directory is walked
+            return largest_first(groups, ORDER_WINDOW)
+        return groups
+
+    def _open_stages(self, groups):
+        """Start the per-run stages that surround document processing and return the groups to process."""
+        runtime = self.config.runtime
+        if runtime.read_ahead:
+            # Read-ahead follows the processing order, so it needs every document up front
+            groups = list(groups)
+            self._read_ahead = ReadAhead([path for path, _ in groups], runtime.read_ahead, runtime.read_ahead_bytes)
+        self._open_outputs()
+        return groups
+
+    def _close_stages(self) -> None:
+        if self._read_ahead:
+            self._read_ahead.close()
+            self._read_ahead = None
+        self._close_outputs()
+
+    def _open_outputs(self) -> None:
+        """Start the stages that record this run's results."""
+        self.quarantined = []
+        self._open_match_store()
+        runtime = self.config.runtime
+        if runtime.write_behind and not self.find_only:
+            self._writer = OutputWriter(self.logger, runtime.write_buffer_bytes)
+        if runtime.triage:
+            log_file = runtime.log_file
+            self._triage = TriageReport(log_file.with_name(f"{log_file.stem}_triage.csv"))
+        if runtime.memory_profile:
+            log_file = runtime.log_file
+            report_file = log_file.with_name(f"{log_file.stem}_memory.csv")
+            self._memory = MemoryProfiler(self.logger, report_file, runtime.memory_profile_top)
+
+    def _close_outputs(self) -> None:
+        if self._writer:
+            # Everything handed over must be on disk before the run reports completion
+            self._writer.close()
+            self._writer = None
+        if self._memory:
+            self._memory.close()
+            self._memory = None
+        if self._triage:
+            self._triage.close()
+            self.logger.info(
+                f"Triage: {self._triage.matched} of {self._triage.documents} documents matched, "
+                f"see {self._triage.path}"
+            )
+            self._triage = None
+        self._close_match_store()
+        self._write_quarantine()
+
+    def _open_match_store(self) -> None:
+        """Open the optional match store and register this run in it."""
+        if self.config.runtime.match_store:
+            self.match_store = MatchStore(self.config.runtime.match_store)
+            self.match_store.start_run(self.config.runtime.source_dir, self.rules.fingerprint, self.find_only)
+
+    def _close_match_store(self) -> None:
+        if self.match_store is not None:
+            self.match_store.close()
+            self.match_store = None
+
+    def _record_matches(self, matches) -> None:
+        if self.match_store is not None and matches:
+            self.match_store.add(matches)
+
+    def _get_document_paths(self) -> Iterator[Path]:
+        """Documents of the source directory selected by the include, exclude and depth options, as they are found."""
+        runtime = self.config.runtime
+        return discover_documents(
+            runtime.source_dir, PathFilter.from_runtime(runtime), runtime.discovery_workers, self.logger
+        )
 
     def _get_output_path(self, relative_path: Path) -> Path:
         """Get output path and ensure directory exists."""
@@ -0,0 +1,53 @@
+import time
+from collections import defaultdict
+from typing import Optional
+
+
+class DocumentTimeout(Exception):
+    """Raised when a document overruns its wall-clock processing budget."""
+
+
+class TimeBudget:
+    """
+    Wall-clock budget for one document plus a cumulative evaluation budget for each rule within it.
+    Checks run between regex evaluations, and each evaluation is given what is left of both budgets as its
+    timeout so a single runaway evaluation is stopped as well.
+    """
+
+    def __init__(self, document_timeout: Optional[float] = None, rule_timeout: Optional[float] = None):
+        self.document_timeout = document_timeout
+        self.deadline = time.monotonic() + document_timeout if document_timeout else None
+        self.rule_timeout = rule_timeout
+        self.rule_time = defaultdict(float)
+        self.exhausted_rules = set()
+
+    def check(self) -> None:
+        if self.deadline is not None and time.monotonic() > self.deadline:
+            raise DocumentTimeout(f"exceeded the {self.document_timeout:g}s document budget")
+
+    def allows(self, rule: str) -> bool:
+        return rule not in self.exhausted_rules
+
+    def remaining(self, rule: str) -> Optional[float]:
+        """Seconds an evaluation of ``rule`` may take before it overruns a budget, or None without a limit."""
+        limits = []
+        if self.deadline is not None:
+            limits.append(self.deadline - time.monotonic())
+        if self.rule_timeout is not None:
+            limits.append(self.rule_timeout - self.rule_time[rule])
+        return max(min(limits), 0.0) if limits else None
+
+    def overrun(self, rule: str, limit: float) -> None:
+        """Account for an evaluation of ``rule`` stopped at the ``limit`` it was given by ``remaining``: the rule is
+        exhausted when its own budget was the tighter one, otherwise the document is out of time."""
+        if self.rule_timeout is not None and limit >= self.rule_timeout - self.rule_time[rule]:
+            self.exhausted_rules.add(rule)
+            return
+        raise DocumentTimeout(f"exceeded the {self.document_timeout:g}s document budget")
+
+    def charge(self, rule: str, elapsed: float) -> bool:
+        """Add evaluation time to a rule; returns False once the rule has used up its budget."""
+        self.rule_time[rule] += elapsed
+        if self.rule_timeout is not None and self.rule_time[rule] > self.rule_timeout:
+            self.exhausted_rules.add(rule)
+        return rule not in self.exhausted_rules
@@ -0,0 +1,248 @@
+"""
+Corpus catalog: the URLs, style names and paragraph texts that transform rules are evaluated against, extracted
+once per document so find-only runs can answer new rules without reopening the documents.
+"""
+
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import replace
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from docx_processor.config import RegexTransform, TransformConfig
+from docx_processor.logger import create_task_logger
+from docx_processor.storage.catalog import Catalog, CatalogEntry, CatalogFact
+from .batch import BatchProcessor
+from .budget import DocumentTimeout
+from .document import DocumentProcessor
+from .match import MatchRecord
+
+URL_MODULES = ("rel_hyperlinks", "para_hyperlinks", "field_hyperlinks")
+STYLE_MODULE = "transform_styles"
+TEXT_MODULE = "transform_text"
+
+
+class CatalogExtractor(DocumentProcessor):
+    """
+    Runs the transforms over a document with rules that match every URL, style and paragraph, recording what they
+    visit with the context a match there is logged with. URLs are "rewritten" to themselves, so the transforms see
+    the document as a find-only run does.
+    """
+
+    def __init__(self, config, logger):
+        catch_all = TransformConfig(
+            url_transforms=[RegexTransform(from_pattern="", to_pattern="")],
+            text_transforms=[RegexTransform(from_pattern="^", to_pattern="")],
+            style_transforms=[RegexTransform(from_pattern="", to_pattern="")],
+            drop_matches=[],
+        )
+        super().__init__(replace(config, transform=catch_all, runtime=replace(config.runtime, find_only=True)), logger)
+        self.facts: List[CatalogFact] = []
+        self._visit = ""
+        self._visited = 0
+
+    def extract(self, input_path: Path, source=None) -> List[CatalogFact]:
+        """The document's facts in the order the transforms visit them, up to the error if processing fails."""
+        self.facts = []
+        self.process_document(input_path, None, source)
+        return self.facts
+
+    def _rewrite_url(self, url: str) -> Tuple[Tuple[str, str], ...]:
+        return (("", url),)
+
+    def _rel_hyperlinks(self, element, doc_index) -> None:
+        # Headers of linked sections share a part, so a part's relationships can be visited more than once
+        self._visit, self._visited = f"{element.part.partname}#rels", 0
+        super()._rel_hyperlinks(element, doc_index)
+
+    def _para_hyperlinks(self, element, doc_index) -> None:
+        self._visit, self._visited = f"{element.part.partname}#runs", 0
+        super()._para_hyperlinks(element, doc_index)
+
+    def _field_hyperlinks(self, part, doc, doc_index) -> None:
+        self._visit, self._visited = f"{part.partname}#fields", 0
+        super()._field_hyperlinks(part, doc, doc_index)
+
+    def transform_styles(self, doc) -> None:
+        self.logger.extra.update({"section": "Whole Document", "module": STYLE_MODULE})
+        self.facts.extend(self._fact(style.name) for style in doc.styles)
+
+    def _log_match(self, message: str, rule: str, original: str, replacement: str = "") -> None:
+        ref = ""
+        if self.logger.extra.get("module") in URL_MODULES:
+            ref = f"{self._visit}:{self._visited}"
+            self._visited += 1
+        self.facts.append(self._fact(original, ref))
+
+    def _fact(self, value: Optional[str], ref: str = "") -> CatalogFact:
+        ctx = self.logger.extra
+        # A task logger starts without a task or table row, which is logged as unknown rather than empty
+        return CatalogFact(
+            section=ctx.get("section", ""),
+            module=ctx.get("module", ""),
+            task=ctx.get("task"),
+            location=ctx.get("location", ""),
+            table_row=ctx.get("table_row"),
+            value=value,
+            ref=ref,
+        )
+
+
+class CatalogProcessor(DocumentProcessor):
+    """Evaluates the configured rules against a document's catalog facts, logging matches as a find-only run does."""
+
+    def replay_facts(
+        self, input_path: Path, facts: List[CatalogFact], error: Optional[str] = None
+    ) -> List[MatchRecord]:
+        self._start_document(input_path)
+        transform = self.config.transform
+        # Current value of each URL, as rules rewrite it on one visit the next visit sees the rewritten URL
+        urls: Dict[str, str] = {}
+        styles: List[CatalogFact] = []
+        try:
+            for fact in facts:
+                if styles and fact.module != STYLE_MODULE:
+                    self._replay_styles(styles)
+                    styles = []
+                if fact.module in URL_MODULES and transform.url_transforms:
+                    self._replay_url(fact, urls)
+                elif fact.module == STYLE_MODULE and transform.style_transforms:
+                    styles.append(fact)
+                elif fact.module == TEXT_MODULE and transform.text_transforms:
+                    self._replay_text(fact)
+            if styles:
+                self._replay_styles(styles)
+        except DocumentTimeout as e:
+            self.error = f"Timed out, {e}"
+            self.quarantine_reason = self.error
+            self.logger.extra["task"] = "TIMEOUT"
+            self.logger.error(f"Failed to process {input_path} with error: {self.error}")
+            return self.matches
+
+        if error:
+            # The document could not be cataloged, it is reported as failing like it did then
+            self.error = error
+            self.logger.extra["task"] = "ERROR"
+            self.logger.error(f"Failed to process {input_path} with error: {error}")
+        return self.matches
+
+    def _enter(self, fact: CatalogFact, matched: bool = False) -> None:
+        """Restore the context of a fact; location and table row only change when something matches there."""
+        context = {"section": fact.section, "module": fact.module, "task": fact.task}
+        if matched:
+            context.update({"location": fact.location, "table_row": fact.table_row})
+        for key, value in context.items():
+            if value is None:
+                # Not set yet where the fact was extracted
+                self.logger.extra.pop(key, None)
+            else:
+                self.logger.extra[key] = value
+
+    def _replay_url(self, fact: CatalogFact, urls: Dict[str, str]) -> None:
+        url = urls.get(fact.ref, fact.value)
+        rewrites = self._rewrite_url(url)
+        self._enter(fact, matched=bool(rewrites))
+        in_table = fact.module == "rel_hyperlinks" and fact.location == "Table"
+        for rule, new_url in rewrites:
+            self._log_match(f"{'TABLE: ' if in_table else ''}{url} -> {new_url}", rule, url, new_url)
+            url = new_url
+        urls[fact.ref] = url
+
+    def _replay_styles(self, styles: List[CatalogFact]) -> None:
+        self._enter(styles[0])
+        renames = []
+        names: Dict[Optional[str], int] = {}
+        for fact in styles:
+            names[fact.value] = names.get(fact.value, 0) + 1
+        for transform in self.config.transform.style_transforms:
+            matched = names.pop(transform.from_pattern, 0)
+            renames += [(transform.from_pattern, transform.to_pattern)] * matched
+            names[transform.to_pattern] = names.get(transform.to_pattern, 0) + matched
+        for from_name, to_name in renames:
+            self._log_match(
+                f"Table Style {from_name} Found.. Converting, /{from_name} → {to_name}", from_name, from_name, to_name
+            )
+
+    def _replay_text(self, fact: CatalogFact) -> None:
+        self._enter(fact)
+        para_text = fact.value
+        if self._should_drop_match(para_text):
+            return
+        for pattern, regex in self.rules.text_patterns:
+            matches = len(self._run_rule(pattern, pattern.findall, para_text) or ())
+            if matches > 0:
+                self._enter(fact, matched=True)
+                self._log_text_match(matches, regex, para_text)
+                return
+
+
+class CatalogBatchProcessor(BatchProcessor):
+    """Keeps a catalog of the source directory up to date and answers find-only runs from it."""
+
+    def update_catalog(self, catalog: Catalog) -> Tuple[int, int, int]:
+        """Catalog new and changed documents and forget removed ones, returning how many were updated, left
+        unchanged and removed."""
+        scan_mode = self.config.runtime.scan_mode
+        entries = self._entries(catalog)
+        paths = list(self._get_document_paths())
+        stale = []
+        for path in paths:
+            stat = path.stat()
+            entry = entries.pop(path, None)
+            if entry is None or not entry.is_current(stat, scan_mode):
+                stale.append((path, stat))
+        catalog.remove(entries)
+
+        start = time.time()
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            for path, stat, facts, error in executor.map(lambda item: self._extract(*item), stale):
+                catalog.put(path, stat, scan_mode, facts, error)
+        self.logger.info(f"Catalog updated: {len(stale)} documents extracted in {time.time() - start:.2f} seconds")
+        return len(stale), len(paths) - len(stale), len(entries)
+
+    def _extract(self, path: Path, stat: os.stat_result):
+        extractor = CatalogExtractor(self.config, create_task_logger(self.logger, path))
+        facts = extractor.extract(path)
+        return path, stat, facts, extractor.error
+
+    def process_catalog(self, catalog: Catalog) -> None:
+        """Find matches in every cataloged document of the source directory without opening the documents."""
+        self.start_time = time.time()
+        self.processed_count = 0
+        entries = self._entries(catalog)
+        self._warn_if_stale(entries)
+
+        self._open_outputs()
+        try:
+            for path, entry in sorted(entries.items()):
+                processor = CatalogProcessor(self.config, create_task_logger(self.logger, path), self.rules)
+                self._record_matches(processor.replay_facts(path, catalog.facts(entry), entry.error))
+                if processor.quarantine_reason:
+                    self._quarantine(path, processor.quarantine_reason)
+                self.processed_count += 1
+        finally:
+            self._close_outputs()
+
+        total_time = time.time() - self.start_time
+        self.logger.info(f"Processing complete. Documents processed: {self.processed_count}")
+        self.logger.info(f"Total processing time: {total_time:.2f} seconds")
+        self._log_cache_stats()
+
+    def _warn_if_stale(self, entries: Dict[Path, CatalogEntry]) -> None:
+        paths = set(self._get_document_paths())
+        scan_mode = self.config.runtime.scan_mode
+        changed = sum(
+            1 for path in paths if path not in entries or not entries[path].is_current(path.stat(), scan_mode)
+        )
+        changed += len(entries.keys() - paths)
+        if changed:
+            self.logger.warning(
+                f"{changed} documents changed since the catalog was built or were cataloged in another scan mode, "
+                "run the catalog command to refresh it"
+            )
+
+    def _entries(self, catalog: Catalog) -> Dict[Path, CatalogEntry]:
+        """Cataloged documents of the source directory, keyed by path."""
+        source_dir = self.config.runtime.source_dir
+        return {entry.path: entry for entry in catalog.entries() if source_dir in entry.path.parents}
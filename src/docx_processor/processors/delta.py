@@ -0,0 +1,152 @@
+"""
+Delta output: instead of a full copy of each processed document, a small archive holding only the package members
+that processing changed, with a manifest to rebuild the full document from the original.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import uuid
+from io import BytesIO
+from pathlib import Path
+from typing import BinaryIO, Dict, Tuple, Union
+from zipfile import ZIP64_LIMIT, ZIP_DEFLATED, ZipFile, ZipInfo
+
+from lxml import etree
+
+DELTA_SUFFIX = ".delta"
+DELTA_FORMAT = 1
+MANIFEST_NAME = "manifest.json"
+# Changed members are stored under this prefix so no member name can clash with the manifest
+PARTS_PREFIX = "parts/"
+
+_CHUNK_SIZE = 1024 * 1024
+# python-docx drops ignorable whitespace when it parses a part, so it is dropped from both sides of a comparison
+_PARSER = etree.XMLParser(remove_blank_text=True, resolve_entities=False, huge_tree=True)
+
+Original = Union[Path, BinaryIO]
+
+
+class DeltaMismatch(ValueError):
+    """Raised when a delta is applied to a document other than the original it was made from."""
+
+
+def delta_path(output_path: Path) -> Path:
+    return output_path.with_name(output_path.name + DELTA_SUFFIX)
+
+
+def _digest(original: Original) -> Tuple[str, int]:
+    """SHA-256 and size of the original document."""
+    digest = hashlib.sha256()
+    size = 0
+    stream = open(original, "rb") if isinstance(original, Path) else original
+    try:
+        stream.seek(0)
+        for chunk in iter(lambda: stream.read(_CHUNK_SIZE), b""):
+            digest.update(chunk)
+            size += len(chunk)
+    finally:
+        if stream is not original:
+            stream.close()
+    return digest.hexdigest(), size
+
+
+def _same_xml(before: bytes, after: bytes) -> bool:
+    """Whether two serialisations of a part hold the same XML, python-docx writing its own declaration."""
+    try:
+        return etree.tostring(etree.fromstring(before, _PARSER), method="c14n") == etree.tostring(
+            etree.fromstring(after, _PARSER), method="c14n"
+        )
+    except etree.XMLSyntaxError:
+        return False
+
+
+def make_delta(original: Original, document: bytes) -> bytes:
+    """Delta of a processed document, serialised as ``document``, against the original it was read from.
+
+    A member is unchanged when its CRC and size match the original's, or for XML members when both parse to the
+    same canonical XML, so parts python-docx only serialised again are not shipped.
+    """
+    source_sha256, source_size = _digest(original)
+    changed: Dict[str, bytes] = {}
+    with ZipFile(original) as source, ZipFile(BytesIO(document)) as output:
+        originals = {info.filename: info for info in source.infolist()}
+        members = [info.filename for info in output.infolist()]
+        for info in output.infolist():
+            before = originals.get(info.filename)
+            if before is not None and (before.CRC, before.file_size) == (info.CRC, info.file_size):
+                continue
+            data = output.read(info.filename)
+            is_xml = info.filename.endswith((".xml", ".rels"))
+            if before is not None and is_xml and _same_xml(source.read(info.filename), data):
+                continue
+            changed[info.filename] = data
+
+    manifest = {
+        "format": DELTA_FORMAT,
+        "source_sha256": source_sha256,
+        "source_size": source_size,
+        "members": members,
+        "changed": {name: hashlib.sha256(data).hexdigest() for name, data in changed.items()},
+    }
+    buffer = BytesIO()
+    with ZipFile(buffer, "w", compression=ZIP_DEFLATED) as delta:
+        delta.writestr(MANIFEST_NAME, json.dumps(manifest, indent=1))
+        for name, data in changed.items():
+            delta.writestr(PARTS_PREFIX + name, data)
+    return buffer.getvalue()
+
+
+def apply_delta(original: Path, delta: Path, target: BinaryIO) -> int:
+    """Rebuild the processed document from its original and delta into ``target``, returning how many members came
+    from the delta. Unchanged members are streamed from the original in bounded chunks."""
+    with ZipFile(delta) as patch:
+        manifest = json.loads(patch.read(MANIFEST_NAME))
+        if manifest.get("format") != DELTA_FORMAT:
+            raise DeltaMismatch(f"Unsupported delta format {manifest.get('format')!r}")
+        if _digest(original) != (manifest["source_sha256"], manifest["source_size"]):
+            raise DeltaMismatch(f"{original} is not the document the delta was made from")
+
+        with ZipFile(original) as source, ZipFile(target, "w", compression=ZIP_DEFLATED) as output:
+            for name in manifest["members"]:
+                if name in manifest["changed"]:
+                    data = patch.read(PARTS_PREFIX + name)
+                    if hashlib.sha256(data).hexdigest() != manifest["changed"][name]:
+                        raise DeltaMismatch(f"Member {name} of {delta} is corrupt")
+                    output.writestr(name, data)
+                    continue
+                before = source.getinfo(name)
+                info = ZipInfo(name, date_time=before.date_time)
+                info.compress_type = before.compress_type
+                info.external_attr = before.external_attr
+                with source.open(before) as src, output.open(
+                    info, "w", force_zip64=before.file_size > ZIP64_LIMIT
+                ) as dst:
+                    shutil.copyfileobj(src, dst, _CHUNK_SIZE)
+    return len(manifest["changed"])
+
+
+def apply_deltas(source_dir: Path, delta_dir: Path, output_dir: Path, logger) -> Tuple[int, int]:
+    """Rebuild every document with a delta below ``delta_dir`` from its original below ``source_dir``, writing the
+    full documents below ``output_dir``. Returns how many were rebuilt and how many failed."""
+    rebuilt = failed = 0
+    for path in sorted(delta_dir.rglob(f"*.docx{DELTA_SUFFIX}")):
+        relative = path.relative_to(delta_dir)
+        relative = relative.with_name(relative.name[: -len(DELTA_SUFFIX)])
+        target = output_dir / relative
+        target.parent.mkdir(parents=True, exist_ok=True)
+        # Written beside the target and renamed, so a failed rebuild never leaves a partial document
+        temp_path = target.with_name(f".{target.name}.{uuid.uuid4().hex[:8]}.tmp")
+        try:
+            with open(temp_path, "xb") as f:
+                changed = apply_delta(source_dir / relative, path, f)
+            os.replace(temp_path, target)
+            rebuilt += 1
+            logger.debug(f"Rebuilt {target} with {changed} changed members")
+        except Exception as e:
+            failed += 1
+            logger.error(f"Failed to apply delta {path}: {e}")
+            if temp_path.exists():
+                temp_path.unlink()
+    return rebuilt, failed
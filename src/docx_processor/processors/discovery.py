@@ -0,0 +1,152 @@
+"""
+Document discovery: walks the source directory with ``os.scandir``, scanning directories in parallel, and yields
+documents as they are found so processing can start before the walk ends.
+"""
+
+import os
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from fnmatch import fnmatchcase
+from pathlib import Path
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+from docx_processor.config.constants import DEFAULT_DISCOVERY_WORKERS
+
+Parts = Tuple[str, ...]
+
+
+def is_document_path(path: Path) -> bool:
+    """Check whether a path is a Word document to process, skipping temporary Word files."""
+    return path.suffix == ".docx" and not path.name.startswith("~$")
+
+
+def _split(pattern: str) -> Parts:
+    return tuple(part for part in pattern.replace("\\", "/").strip("/").split("/") if part not in ("", "."))
+
+
+def _matches(parts: Parts, pattern: Parts) -> bool:
+    """Whether a relative path matches a pattern segment by segment, "**" matching any number of segments."""
+    if not pattern:
+        return not parts
+    if pattern[0] == "**":
+        return any(_matches(parts[i:], pattern[1:]) for i in range(len(parts) + 1))
+    return bool(parts) and fnmatchcase(parts[0], pattern[0]) and _matches(parts[1:], pattern[1:])
+
+
+def _may_contain_match(parts: Parts, pattern: Parts) -> bool:
+    """Whether some path below the directory ``parts`` could match the pattern."""
+    if not parts:
+        return True
+    if not pattern:
+        return False
+    if pattern[0] == "**":
+        return True
+    return fnmatchcase(parts[0], pattern[0]) and _may_contain_match(parts[1:], pattern[1:])
+
+
+class PathFilter:
+    """
+    Include and exclude glob patterns and a depth limit, applied to paths relative to the source directory.
+
+    A pattern without a "/" matches a single name: an excluded name prunes every directory and document called
+    that, an included one selects documents by file name. A pattern with a "/" matches the whole relative path,
+    with "**" matching any number of directories, and directories no include pattern can reach are not walked.
+    ``max_depth`` is how many directory levels below the source directory are walked, 0 for its own documents.
+    """
+
+    def __init__(self, include: Sequence[str] = (), exclude: Sequence[str] = (), max_depth: Optional[int] = None):
+        self.include = tuple(include)
+        self.exclude = tuple(exclude)
+        self.max_depth = max_depth
+        self._include = [_split(pattern) for pattern in include]
+        self._exclude = [_split(pattern) for pattern in exclude]
+        self._prunes_by_include = bool(self._include) and all(len(pattern) > 1 for pattern in self._include)
+
+    @classmethod
+    def from_runtime(cls, runtime) -> "PathFilter":
+        return cls(runtime.include, runtime.exclude, runtime.max_depth)
+
+    def _excluded(self, parts: Parts) -> bool:
+        return any(
+            fnmatchcase(parts[-1], pattern[0]) if len(pattern) == 1 else _matches(parts, pattern)
+            for pattern in self._exclude
+        )
+
+    def walks(self, parts: Parts) -> bool:
+        """Whether to walk the directory at ``parts``, its parent being walked."""
+        if self.max_depth is not None and len(parts) > self.max_depth:
+            return False
+        if self._excluded(parts):
+            return False
+        return not self._prunes_by_include or any(_may_contain_match(parts, pattern) for pattern in self._include)
+
+    def selects(self, parts: Parts) -> bool:
+        """Whether to process the document at ``parts``, its directory being walked."""
+        if self._excluded(parts):
+            return False
+        return not self._include or any(
+            fnmatchcase(parts[-1], pattern[0]) if len(pattern) == 1 else _matches(parts, pattern)
+            for pattern in self._include
+        )
+
+    def accepts(self, parts: Parts) -> bool:
+        """Whether a walk would reach and process the document at ``parts``."""
+        return all(self.walks(parts[:depth]) for depth in range(1, len(parts))) and self.selects(parts)
+
+
+def _scan(
+    directory: Path, parts: Parts
+) -> Tuple[List[Tuple[Path, Parts]], List[Tuple[Path, Parts]], Optional[OSError]]:
+    """List one directory, returning its subdirectories, its documents and the error if it cannot be read."""
+    directories, documents = [], []
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                try:
+                    # Directory links are not followed, they can form loops on shares
+                    if entry.is_dir(follow_symlinks=False):
+                        directories.append((Path(entry.path), parts + (entry.name,)))
+                    elif is_document_path(Path(entry.name)) and entry.is_file():
+                        documents.append((Path(entry.path), parts + (entry.name,)))
+                except OSError:
+                    continue
+    except OSError as e:
+        return directories, documents, e
+    directories.sort()
+    documents.sort()
+    return directories, documents, None
+
+
+def discover_documents(
+    source_dir: Path,
+    path_filter: Optional[PathFilter] = None,
+    workers: int = DEFAULT_DISCOVERY_WORKERS,
+    logger=None,
+) -> Iterator[Path]:
+    """Yield the documents below ``source_dir`` as they are found.
+
+    Directories are listed by a pool of ``workers`` threads, so the latency of each listing on a network share is
+    overlapped with the others. Documents come in no fixed order between directories, and in name order within one.
+    Directories that cannot be read are logged and skipped.
+    """
+    path_filter = path_filter or PathFilter()
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="discovery")
+    pending = {executor.submit(_scan, source_dir, ())}
+    try:
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                directories, documents, error = future.result()
+                if error is not None and logger is not None:
+                    logger.warning(f"Unable to list {error.filename}: {error.strerror}")
+                # Deeper listings start before the consumer gets this directory's documents
+                pending.update(
+                    executor.submit(_scan, path, parts) for path, parts in directories if path_filter.walks(parts)
+                )
+                for path, parts in documents:
+                    if path_filter.selects(parts):
+                        yield path
+    finally:
+        # The consumer may stop early, listings not yet started are dropped
+        for future in pending:
+            future.cancel()
+        executor.shutdown(wait=False)
@@ -1,25 +1,134 @@
+import copy
+import hashlib
 import re
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
 from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Pattern, Tuple
 
 import unicodedata
 from docx import Document
 from docx.opc.constants import RELATIONSHIP_TYPE as RT
+from docx.opc.part import XmlPart
+from docx.text.paragraph import Paragraph
+from lxml import etree
 
+from docx_processor.config import RegexTransform
+from docx_processor.config.constants import SCAN_DOCUMENT
+from docx_processor.utils.url import PARAGRAPH, TEXT_PARTS, FieldHyperlink, field_hyperlinks
+
+from .budget import DocumentTimeout, TimeBudget
 from .docx_indexer import DocxIndexer
+from .match import MatchRecord
+from .memory import DocumentMemory
+from .package import close_document, open_document
+from .rules import RuleSet
+from .tables import iter_table_paragraphs
+
+# Rule syntax whose matches depend on where the text starts and ends: anchors and lookarounds. Rules using it are
+# evaluated per paragraph in document scan mode, erring towards per paragraph for a literal "$" or "[^"
+BOUNDARY_SENSITIVE = re.compile(r"\$|\^|\\[AZ]|\(\?<?[=!]")
+
+
+def _part_element(part):
+    """Root element of a part's XML, parsed from its blob if python-docx keeps it as bytes."""
+    return part.element if isinstance(part, XmlPart) else etree.fromstring(part.blob)
 
 
 class DocumentProcessor:
-    def __init__(self, config, logger):
+    def __init__(self, config, logger, rules: Optional[RuleSet] = None):
         self.config = config
         self.logger = logger
-        self.url_patterns = [
-            (re.compile(transform.from_pattern, re.IGNORECASE), transform.to_pattern)
-            for transform in self.config.transform.url_transforms
-        ]
+        self.rules = rules if rules is not None else RuleSet(config.transform)
+        self.url_patterns = self.rules.url_patterns
         self.logger.extra.update(
             {"location": "", "section": "", "document_name": "", "document_full_path": "", "module": __name__}
         )
         self.current_heading = None
+        self.document_path = ""
+        self.matches: List[MatchRecord] = []
+        self.error: Optional[str] = None
+        self.budget: Optional[TimeBudget] = None
+        self.quarantine_reason: Optional[str] = None
+        # Set by the batch when the run is memory profiled
+        self.memory: Optional[DocumentMemory] = None
+
+    def _log_match(self, message: str, rule: str, original: str, replacement: str = "") -> None:
+        """Log a match against the current context and keep a structured record of it."""
+        ctx = self.logger.extra
+        ctx["match"] = "True"
+        self.logger.info(message)
+        ctx["match"] = "False"
+        self.matches.append(
+            MatchRecord(
+                document=self.document_path,
+                section=ctx.get("section", ""),
+                module=ctx.get("module", ""),
+                location=ctx.get("location", ""),
+                table_row=ctx.get("table_row", ""),
+                task=ctx.get("task", ""),
+                rule=rule,
+                original=original,
+                replacement=replacement,
+                message=message,
+            )
+        )
+
+    def _run_rule(self, pattern, evaluate, text):
+        """Evaluate a compiled rule against text, enforcing the document and per-rule time budgets.
+
+        ``evaluate`` is a method of the compiled rule, or a callable taking the same keyword arguments.
+        """
+        budget = self.budget
+        if budget is None:
+            return evaluate(text, concurrent=True)
+
+        budget.check()
+        if not budget.allows(pattern.pattern):
+            return None
+        limit = budget.remaining(pattern.pattern)
+        start = time.perf_counter()
+        try:
+            result = evaluate(text, concurrent=True, timeout=limit)
+        except TimeoutError:
+            budget.overrun(pattern.pattern, limit)
+            result = None
+        if not budget.charge(pattern.pattern, time.perf_counter() - start):
+            self.quarantine_reason = f"rule '{pattern.pattern}' exceeded the {budget.rule_timeout:g}s rule budget"
+            task = self.logger.extra.get("task", "")
+            self.logger.extra["task"] = "TIMEOUT"
+            self.logger.warning(f"Rule {pattern.pattern} timed out, skipping it for the rest of the document")
+            self.logger.extra["task"] = task
+        return result
+
+    def _rewrite_url(self, url: str) -> Tuple[Tuple[str, str], ...]:
+        """Return (rule, rewritten URL) for each URL rule matching ``url``, in rule order.
+
+        Results are shared across documents and workers, so repeated URLs skip the regex work. A result
+        computed while a rule was skipped for exceeding its budget is incomplete and is not cached.
+        """
+        key = (url, self.rules.fingerprint)
+        cached = self.rules.url_cache.get(key)
+        if cached is not None:
+            return cached
+
+        complete = True
+        rewrites = []
+        for pattern, replacement in self.url_patterns:
+            if self.budget is not None and not self.budget.allows(pattern.pattern):
+                complete = False
+                continue
+            rewritten = self._run_rule(pattern, lambda text, **limits: pattern.subn(replacement, text, **limits), url)
+            if self.budget is not None and not self.budget.allows(pattern.pattern):
+                complete = False
+            if rewritten and rewritten[1]:
+                rewrites.append((pattern.pattern, rewritten[0]))
+        rewrites = tuple(rewrites)
+        if complete:
+            self.rules.url_cache.put(key, rewrites)
+        return rewrites
 
     def _is_in_table(self, paragraph):
         """Check if the paragraph is inside a table cell."""
@@ -45,24 +154,19 @@ class DocumentProcessor:
             for rel_id, rel in element.part.rels.items():
                 if rel.reltype == RT.HYPERLINK:
                     original_url = rel.target_ref
-                    for pattern, replacement in self.url_patterns:
-                        if pattern.search(original_url):
-                            para = doc_index.find_paragraph_by_rId(rel_id)
-                            self.logger.debug(f"Paragraph:: {para.text}")
-                            if para and self._is_in_table(para):
-                                self.logger.extra["location"] = "Table"
-                                self.logger.extra["match"] = "True"
-                                new_url = pattern.sub(replacement, original_url)
-                                self.logger.info(f"TABLE: {rel.target_ref} -> {new_url}")
-                            else:
-                                closest_heading = doc_index.find_closest_heading_above(para)
-                                self.logger.extra["location"] = closest_heading if closest_heading else ""
-                                self.logger.extra["match"] = "True"
-                                new_url = pattern.sub(replacement, original_url)
-                                self.logger.info(f"{rel.target_ref} -> {new_url}")
-
-                            self.logger.extra["match"] = "False"
-                            rel._target = new_url
+                    for rule, new_url in self._rewrite_url(original_url):
+                        para = doc_index.find_paragraph_by_rId(rel_id)
+                        self.logger.debug(f"Paragraph:: {para.text if para else None}")
+                        if para and self._is_in_table(para):
+                            self.logger.extra["location"] = "Table"
+                            message = f"TABLE: {rel.target_ref} -> {new_url}"
+                        else:
+                            closest_heading = doc_index.find_closest_heading_above(para)
+                            self.logger.extra["location"] = closest_heading if closest_heading else ""
+                            message = f"{rel.target_ref} -> {new_url}"
+
+                        self._log_match(message, rule, rel.target_ref, new_url)
+                        rel._target = new_url
 
     def _para_hyperlinks(self, element: Document, doc_index) -> None:
         self.logger.extra.update({"module": "para_hyperlinks", "task": "para_URLs"})
@@ -70,21 +174,43 @@ class DocumentProcessor:
             for hyperlink in para.hyperlinks:
                 for runs in hyperlink.runs:
                     original_url = runs.text
-                    for pattern, replacement in self.url_patterns:
-                        if pattern.search(original_url):
-                            new_url = pattern.sub(replacement, original_url)
-                            closest_heading = doc_index.find_closest_heading_above(para)
-                            self.logger.extra["location"] = closest_heading if closest_heading else ""
-                            self.logger.extra["match"] = "True"
-                            self.logger.info(f"{runs.text} -> {new_url}")
-                            self.logger.extra["match"] = "False"
-                            runs.text = new_url
-                        # Does Not Modify url
+                    for rule, new_url in self._rewrite_url(original_url):
+                        closest_heading = doc_index.find_closest_heading_above(para)
+                        self.logger.extra["location"] = closest_heading if closest_heading else ""
+                        self._log_match(f"{runs.text} -> {new_url}", rule, runs.text, new_url)
+                        runs.text = new_url
+
+    def _field_hyperlinks(self, part, doc: Document, doc_index) -> None:
+        """Process hyperlinks held in HYPERLINK field codes, which have no relationship."""
+        self.logger.extra.update(
+            {"section": TEXT_PARTS[part.content_type], "module": "field_hyperlinks", "task": "field_URLs"}
+        )
+        root = _part_element(part)
+        changed = False
+        for link in field_hyperlinks(etree.iterwalk(root, events=("start", "end")), str(part.partname)):
+            for rule, new_url in self._rewrite_url(link.url):
+                self.logger.extra["location"] = self._field_location(link, doc, doc_index) if part is doc.part else ""
+                self._log_match(f"{link.url} -> {new_url}", rule, link.url, new_url)
+                link.rewrite(new_url)
+                changed = True
+        if changed and not isinstance(part, XmlPart):
+            # Parts python-docx does not parse, such as footnotes, are serialised again
+            part._blob = etree.tostring(root, encoding="UTF-8", xml_declaration=True, standalone=True)
+
+    def _field_location(self, link: FieldHyperlink, doc: Document, doc_index) -> str:
+        element = next(link.elements[0].iterancestors(PARAGRAPH), None)
+        if element is None:
+            return ""
+        para = Paragraph(element, doc._body)
+        if self._is_in_table(para):
+            return "Table"
+        closest_heading = doc_index.find_closest_heading_above(para)
+        return closest_heading if closest_heading else ""
 
     def transform_urls(self, doc: Document, doc_index) -> None:
         """
         Modify URLs in the document.
-        There are 2 types or URL's Relationship and Paragraph
+        There are 3 types or URL's Relationship, Paragraph and Field code
         There are 3 Broad locations Headers(multiple), Footers(multiple) and Body
         """
         # Process body text
@@ -101,6 +227,11 @@ class DocumentProcessor:
             self.logger.extra["section"] = "Footer"
             self._rel_hyperlinks(section.footer, doc_index)  # Type A
 
+        # Field codes, Type C, have no relationship so every part holding text is searched for them
+        for part in doc.part.package.iter_parts():
+            if part.content_type in TEXT_PARTS:
+                self._field_hyperlinks(part, doc, doc_index)
+
     def transform_styles(self, doc: Document) -> None:
         """Change style names according to configuration."""
         self.logger.extra.update(
@@ -110,16 +241,42 @@ class DocumentProcessor:
             }
         )
 
+        # Documents built from the same template share a byte-identical styles part, so the rename
+        # result is cached by its content and reused
+        styles_element = doc.styles.element
+        key = hashlib.sha1(etree.tostring(styles_element)).hexdigest()
+        cached = self.rules.style_cache.get(key)
+        if cached is None:
+            renames = self._rename_styles(doc.styles)
+            self.rules.style_cache.put(key, (copy.deepcopy(styles_element) if renames else None, renames))
+        else:
+            transformed, renames = cached
+            if renames:
+                styles_element[:] = copy.deepcopy(transformed)[:]
+
+        for from_name, to_name in renames:
+            self._log_match(
+                f"Table Style {from_name} Found.. Converting, /{from_name} → {to_name}",
+                from_name,
+                from_name,
+                to_name,
+            )
+
+    def _rename_styles(self, styles) -> List[Tuple[str, str]]:
+        """Apply the style rules in order and return a (from, to) pair for each style renamed."""
+        index = defaultdict(list)
+        for style in styles:
+            index[style.name].append(style)
+
+        renames = []
         for transform in self.config.transform.style_transforms:
-            for style in doc.styles:
-                if style.name == transform.from_pattern:
-                    style.name = transform.to_pattern
-                    self.logger.extra["match"] = "True"
-                    self.logger.info(
-                        f"Table Style {transform.from_pattern} Found.. Converting, /"
-                        f"{transform.from_pattern} → {transform.new_pattern}"
-                    )
-                    self.logger.extra["match"] = "False"
+            matched = index.pop(transform.from_pattern, [])
+            for style in matched:
+                style.name = transform.to_pattern
+                renames.append((transform.from_pattern, transform.to_pattern))
+            # Later rules see the new names, as they would renaming one style at a time
+            index[transform.to_pattern].extend(matched)
+        return renames
 
     def _should_drop_match(self, text):
         """Check if text matches any drop patterns."""
@@ -133,6 +290,26 @@ class DocumentProcessor:
                 return True
         return False
 
+    def _text_paragraphs(self, element: Document) -> Iterator[Tuple[Paragraph, str]]:
+        """Paragraphs that text rules apply to, body first and then table cells, nested tables included, with their
+        table row."""
+        for para in element.paragraphs:
+            yield para, ""
+
+        for para, table_cell in iter_table_paragraphs(element):
+            self.logger.debug(f"In Tables {table_cell.table_row} column {table_cell.column}: {para.text}")
+            yield para, table_cell.table_row
+
+    def _log_text_match(self, matches: int, regex: RegexTransform, para_text: str) -> None:
+        trunc_para_text = (para_text[:47] + "...") if len(para_text) > 50 else para_text
+        self._log_match(
+            f"Match: {matches} {'matches' if matches > 1 else 'match'} "
+            f"for {regex.from_pattern}' at paragraph: '{trunc_para_text}'",
+            regex.from_pattern,
+            para_text,
+        )
+        self.logger.extra["table_row"] = ""
+
     def transform_text(self, element: Document, doc_index, transforms):
         """Transform text in document according to configured patterns."""
         self.logger.extra.update(
@@ -142,13 +319,16 @@ class DocumentProcessor:
             }
         )
 
-        processed_cells = set()  # Track processed cells by their internal ID
+        patterns = (
+            self.rules.text_patterns
+            if transforms is self.config.transform.text_transforms
+            else RuleSet.compile_text(transforms)
+        )
+        if self.config.runtime.scan_mode == SCAN_DOCUMENT:
+            self._scan_document_text(element, doc_index, patterns)
+            return None
 
         def process_paragraph(para, cell=None):
-            # Skip if this paragraph is in a cell we've already processed
-            #        if cell and cell._tc in processed_cells:
-            #            return False
-
             para_text = "".join(run.text for run in para.runs)
             self.logger.debug(f"Paragraph Text: {para.text}")
 
@@ -156,90 +336,244 @@ class DocumentProcessor:
                 return False
 
             found_match = False
-            for regex in transforms:
-                matches = len(re.findall(regex.from_pattern, para_text))
+            for pattern, regex in patterns:
+                matches = len(self._run_rule(pattern, pattern.findall, para_text) or ())
                 if matches > 0:
                     if not found_match:
-                        trunc_para_text = (para_text[:47] + "...") if len(para_text) > 50 else para_text
-
                         if para and self._is_in_table(para):
                             self.logger.extra["location"] = "Table"
                         else:
                             closest_heading = doc_index.find_closest_heading_above(para)
                             self.logger.extra["location"] = closest_heading if closest_heading else ""
-                        self.logger.extra["match"] = "True"
-                        self.logger.info(
-                            f"Match: {matches} {'matches' if matches > 1 else 'match'} "
-                            f"for {regex.from_pattern}' at paragraph: '{trunc_para_text}'"
-                        )
-                        self.logger.extra["match"] = "False"
-                        self.logger.extra["table_row"] = ""
+                        self._log_text_match(matches, regex, para_text)
                         found_match = True
 
             return found_match
 
-        # Process paragraphs in document body
-        for para in element.paragraphs:
+        # Process paragraphs in the document body, then in tables
+        for para, table_row in self._text_paragraphs(element):
+            self.logger.extra["table_row"] = table_row
             process_paragraph(para)
 
-        # Process paragraphs in tables
-        table_no = 0
-        for table in element.tables:
-            table_no += 1
-            row_no = 0
-            for row in table.rows:
-                row_no += 1
-                for cell in row.cells:
-                    self.logger.extra["table_row"] = f"{table_no}|{row_no}"
-                    # Mark this cell as processed
-                    if cell._tc not in processed_cells:
-                        processed_cells.add(cell._tc)
-                        for para in cell.paragraphs:
-                            self.logger.debug(f"In Tables {cell._tc} {para.text} {cell.text}")
-                            process_paragraph(para, cell)
-
         self.logger.extra["table_row"] = ""
         return None
 
         # TODO: Add Text Transformation
 
-    def process_document(self, input_path: Path, output_path: Path) -> None:
-        """Process a single document."""
+    def _scan_document_text(self, element: Document, doc_index, patterns) -> None:
+        """Run each rule once over the text of every paragraph joined into one buffer.
+
+        Hits map back to their paragraph by bisecting the paragraph start offsets, and body paragraphs to their
+        heading by bisecting the heading positions. A hit that runs across a paragraph boundary could not have
+        matched in paragraph mode, so the paragraphs it touches are evaluated again on their own.
+        """
+        heading_labels = {
+            heading._element: f"H{level} {heading.text}" for heading, level in doc_index.heading_paragraphs
+        }
+        table_rows: List[str] = []
+        texts: List[str] = []
+        heading_positions: List[int] = []
+        headings: List[str] = []
+        starts = array("q")
+        offset = 0
+        for para, table_row in self._text_paragraphs(element):
+            if not table_row and para._element in heading_labels:
+                heading_positions.append(len(texts))
+                headings.append(heading_labels[para._element])
+            text = "".join(run.text for run in para.runs)
+            table_rows.append(table_row)
+            texts.append(text)
+            starts.append(offset)
+            offset += len(text) + 1
+        if not texts:
+            return
+        buffer = "\n".join(texts)
+
+        # The first rule to match a paragraph is the one logged for it, as in paragraph mode
+        first_match: Dict[int, Tuple[int, RegexTransform]] = {}
+        for pattern, regex in patterns:
+            if BOUNDARY_SENSITIVE.search(pattern.pattern):
+                # Anchors and lookarounds would see the neighbouring paragraphs in the buffer
+                counts = {
+                    index: len(self._run_rule(pattern, pattern.findall, text) or ()) for index, text in enumerate(texts)
+                }
+            else:
+                counts = self._count_buffer_matches(pattern, buffer, starts, texts)
+            for index, matches in counts.items():
+                if matches and index not in first_match:
+                    first_match[index] = (matches, regex)
+
+        for index in sorted(first_match):
+            para_text = texts[index]
+            if self._should_drop_match(para_text):
+                continue
+            table_row = table_rows[index]
+            if table_row:
+                self.logger.extra["location"] = "Table"
+            else:
+                heading = bisect_left(heading_positions, index) - 1
+                self.logger.extra["location"] = headings[heading] if heading >= 0 else ""
+            self.logger.extra["table_row"] = table_row
+            matches, regex = first_match[index]
+            self._log_text_match(matches, regex, para_text)
+
+    def _count_buffer_matches(self, pattern: Pattern, buffer: str, starts: array, texts: List[str]) -> Dict[int, int]:
+        """Matches of one rule per paragraph, from a single scan of the joined paragraph texts."""
+        counts: Dict[int, int] = defaultdict(int)
+        spans = self._run_rule(
+            pattern, lambda text, **limits: [m.span() for m in pattern.finditer(text, **limits)], buffer
+        )
+        crossed = set()
+        for begin, end in spans or ():
+            index = bisect_right(starts, begin) - 1
+            if end <= starts[index] + len(texts[index]):
+                counts[index] += 1
+            else:
+                last = bisect_right(starts, end - 1) - 1
+                crossed.update(range(index, last + 1))
+        for index in crossed:
+            counts[index] = len(self._run_rule(pattern, pattern.findall, texts[index]) or ())
+        return counts
+
+    def _start_document(self, input_path: Path) -> None:
         self.logger.extra.update({"document_name": input_path.name, "document_full_path": str(input_path.parent)})
+        self.document_path = str(input_path)
+        self.matches = []
+        self.error = None
+        self.quarantine_reason = None
+        runtime = self.config.runtime
+        has_budget = runtime.document_timeout or runtime.rule_timeout
+        self.budget = TimeBudget(runtime.document_timeout, runtime.rule_timeout) if has_budget else None
+
+    def replay_matches(
+        self, input_path: Path, matches: List[MatchRecord], error: Optional[str] = None
+    ) -> List[MatchRecord]:
+        """Log matches found in an identical document as if they had been found in ``input_path``."""
+        self._start_document(input_path)
+        for record in matches:
+            self.logger.extra.update(
+                {
+                    "section": record.section,
+                    "module": record.module,
+                    "location": record.location,
+                    "table_row": record.table_row,
+                    "task": record.task,
+                }
+            )
+            self._log_match(record.message, record.rule, record.original, record.replacement)
+
+        if error:
+            self.error = error
+            self.logger.extra["task"] = "ERROR"
+            self.logger.error(f"Failed to process {input_path} with error: {error}")
+        return self.matches
 
-        try:
-            doc = Document(str(input_path))
-            self.logger.extra.update({"section": "NA", "module": "process_document"})
+    def process_document(self, input_path: Path, output_path, source=None, loader=None) -> List[MatchRecord]:
+        """Process a single document and return the matches found.
+
+        ``source`` optionally supplies the document as a binary stream so ``input_path`` is only used as a label,
+        and ``output_path`` may be a writable binary stream instead of a path. ``loader`` optionally supplies an
+        already open document and its index as a ``(document, index)`` pair; the caller then closes the document.
+        """
+        self._start_document(input_path)
+        runtime = self.config.runtime
 
-            doc_index = DocxIndexer(doc, self.logger)
+        doc = None
+        owned = loader is None
+        try:
+            if owned:
+                doc = open_document(input_path, source, runtime.mmap_input, runtime.lazy_media)
+                self._end_stage("load")
+                self.logger.extra.update({"section": "NA", "module": "process_document"})
+                doc_index = self._index_document(doc)
+                self._end_stage("index")
+            else:
+                doc, doc_index = loader()
+                self._end_stage("load")
+            self._check_budget()
             self.logger.debug("-- Index Document --")
             self.logger.debug("-- Start Processing --")
 
-            # Check for non standard Hyperlinks and Log
-            # self.logger.debug("Starting Non-Rel-URL Identification")
-            # non_rel_hyperlinks(self.logger, input_path)
-            # TODO Several of these have to itterate Paragraphs so makes sense to do them in one block
-            if self.config.transform.url_transforms:
-                self.logger.extra["task"] = "hyperlinks"
-                self.logger.debug("Starting URL Identification")
-                self.transform_urls(doc, doc_index)
-
-            if self.config.transform.style_transforms:
-                self.logger.extra["task"] = "Styles"
-                self.logger.debug("Starting Style Identification")
-                self.transform_styles(doc)
-
-            if self.config.transform.text_transforms:
-                self.logger.extra["task"] = "Text"
-                self.logger.debug("Starting Text Identification")
-                self.transform_text(doc, doc_index, self.config.transform.text_transforms)
+            self._apply_transforms(doc, doc_index)
+            self._end_stage("transforms")
 
             # Save The Document
+            self._check_budget()
             if not self.config.runtime.find_only:
-                doc.save(str(output_path))
+                doc.save(output_path if hasattr(output_path, "write") else str(output_path))
+                self._end_stage("save")
                 self.logger.extra.update({"section": "NA", "task": "Finish", "module": "process_document"})
                 self.logger.debug(f"Document saved: {output_path}")
 
+        except DocumentTimeout as e:
+            self.error = f"Timed out, {e}"
+            self.quarantine_reason = self.error
+            self.logger.extra["task"] = "TIMEOUT"
+            self.logger.error(f"Failed to process {input_path} with error: {self.error}")
+
         except Exception as e:
+            self.error = str(e).split(":")[0]
             self.logger.extra["task"] = "ERROR"
-            self.logger.error(f"Failed to process {input_path} with error: {str(e).split(':')[0]}")
+            self.logger.error(f"Failed to process {input_path} with error: {self.error}")
+
+        finally:
+            if owned and doc is not None:
+                close_document(doc)
+
+        return self.matches
+
+    def _index_document(self, doc: Document) -> DocxIndexer:
+        return DocxIndexer(doc, self.logger)
+
+    def _apply_transforms(self, doc: Document, doc_index) -> None:
+        # TODO Several of these have to itterate Paragraphs so makes sense to do them in one block
+        if self.config.transform.url_transforms:
+            self.logger.extra["task"] = "hyperlinks"
+            self.logger.debug("Starting URL Identification")
+            self.transform_urls(doc, doc_index)
+
+        if self.config.transform.style_transforms:
+            self.logger.extra["task"] = "Styles"
+            self.logger.debug("Starting Style Identification")
+            self.transform_styles(doc)
+
+        if self.config.transform.text_transforms:
+            self.logger.extra["task"] = "Text"
+            self.logger.debug("Starting Text Identification")
+            self.transform_text(doc, doc_index, self.config.transform.text_transforms)
+
+    def would_modify(self, doc: Document) -> bool:
+        """Whether the URL or style rules would change the document, checked without changing it."""
+        transform = self.config.transform
+        if transform.style_transforms:
+            names = {style.name for style in doc.styles}
+            if any(rule.from_pattern in names for rule in transform.style_transforms):
+                return True
+        if not transform.url_transforms:
+            return False
+
+        # Every part is checked, erring towards a copy for hyperlinks in parts the URL rules do not visit
+        for part in doc.part.package.iter_parts():
+            for rel in part.rels.values():
+                if rel.reltype == RT.HYPERLINK and self._rewrite_url(rel.target_ref):
+                    return True
+            if part.content_type in TEXT_PARTS:
+                events = etree.iterwalk(_part_element(part), events=("start", "end"))
+                if any(self._rewrite_url(link.url) for link in field_hyperlinks(events)):
+                    return True
+        # Linked headers are skipped, reading them would add a header definition to the document
+        containers = [doc] + [s.header for s in doc.sections if not s.header.is_linked_to_previous]
+        for container in containers:
+            for para in container.paragraphs:
+                for hyperlink in para.hyperlinks:
+                    if any(self._rewrite_url(run.text) for run in hyperlink.runs):
+                        return True
+        return False
+
+    def _check_budget(self) -> None:
+        if self.budget is not None:
+            self.budget.check()
+
+    def _end_stage(self, stage: str) -> None:
+        if self.memory is not None:
+            self.memory.stage(stage)
@@ -1,8 +1,11 @@
+import copy
 from typing import Dict, List, Optional, Tuple
 
 from docx import Document
 from docx.text.paragraph import Paragraph
 
+from .tables import iter_table_paragraphs
+
 
 class DocxIndexer:
     def __init__(self, doc: Document, logger):
@@ -10,6 +13,7 @@ class DocxIndexer:
         self.rId_to_paragraph: Dict[str, Paragraph] = {}
         self.paragraph_index: Dict[Paragraph, int] = {}
         self.heading_paragraphs: List[Tuple[Paragraph, int]] = []
+        self._fallback_ids: Dict[object, str] = {}
         self._build_index()
         self.logging = logger
 
@@ -34,8 +38,14 @@ class DocxIndexer:
         if w_id:
             return w_id
 
-        # Last resort: use combination of properties
-        return f"{para.text}|{para.style.name if para.style else ''}|{id(para._element)}"
+        # Last resort: use combination of properties, fixed when first seen so that rules changing the paragraph's
+        # text or style do not lose it
+        element = para._element
+        fallback = self._fallback_ids.get(element)
+        if fallback is None:
+            fallback = f"{para.text}|{para.style.name if para.style else ''}|{id(element)}"
+            self._fallback_ids[element] = fallback
+        return fallback
 
     # TODO Simplify this method (flake8)
     def _build_index(self):  # noqa: C901
@@ -55,22 +65,37 @@ class DocxIndexer:
                     rId_value = element.get(f'{{{element.nsmap["r"]}}}id')
                     if rId_value:
                         self.rId_to_paragraph[rId_value] = para
-        # Index paragraphs in tables
+        # Index paragraphs in tables, nested ones included
         if hasattr(self.doc, "tables"):
-            for table in self.doc.tables:
-                for row in table.rows:
-                    for cell in row.cells:
-                        for para in cell.paragraphs:
-                            # Add table paragraphs to the index
-                            para_id = self._get_paragraph_id(para)
-                            # Use a high index to ensure they come after regular paragraphs
-                            self.paragraph_index[para_id] = len(self.doc.paragraphs) + len(self.paragraph_index)
-
-                            for element in para._element.iter():
-                                if element.tag.endswith("hyperlink"):
-                                    rId_value = element.get(f'{{{element.nsmap["r"]}}}id')
-                                    if rId_value:
-                                        self.rId_to_paragraph[rId_value] = para
+            for para, _ in iter_table_paragraphs(self.doc):
+                para_id = self._get_paragraph_id(para)
+                # Use a high index to ensure they come after regular paragraphs
+                self.paragraph_index[para_id] = len(self.doc.paragraphs) + len(self.paragraph_index)
+
+                for element in para._element.iter():
+                    if element.tag.endswith("hyperlink"):
+                        rId_value = element.get(f'{{{element.nsmap["r"]}}}id')
+                        if rId_value:
+                            self.rId_to_paragraph[rId_value] = para
+
+    def for_copy(self, doc: Document) -> "DocxIndexer":
+        """
+        Index for an unchanged deep copy of the indexed document, mapping the entries to the copy's paragraphs
+        instead of rebuilding them.
+        """
+        elements = dict(zip(self.doc.element.iter(), doc.element.iter()))
+
+        def mapped(para: Paragraph) -> Paragraph:
+            return Paragraph(elements[para._element], para._parent)
+
+        index = copy.copy(self)
+        index.doc = doc
+        index._fallback_ids = {
+            elements[element]: key for element, key in self._fallback_ids.items() if element in elements
+        }
+        index.rId_to_paragraph = {rId: mapped(para) for rId, para in self.rId_to_paragraph.items()}
+        index.heading_paragraphs = [(mapped(para), level) for para, level in self.heading_paragraphs]
+        return index
 
     def find_paragraph_by_rId(self, rId: str) -> Optional[Paragraph]:
         """
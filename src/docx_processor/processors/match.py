@@ -0,0 +1,43 @@
+from dataclasses import asdict, dataclass, field
+from typing import Dict, List, Optional
+
+
+@dataclass
+class MatchRecord:
+    """Structured record of a single match found while processing a document."""
+
+    document: str
+    section: str
+    module: str
+    location: str
+    table_row: str
+    task: str
+    rule: str
+    original: str
+    replacement: str
+    message: str
+
+    def to_dict(self) -> Dict[str, str]:
+        return asdict(self)
+
+
+@dataclass
+class DocumentCompleted:
+    """Event marking that a document has finished processing, with every match found in it."""
+
+    document: str
+    matches: List[MatchRecord] = field(default_factory=list)
+    error: Optional[str] = None
+    quarantine_reason: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    def to_dict(self) -> dict:
+        return {
+            "document": self.document,
+            "matches": len(self.matches),
+            "error": self.error,
+            "quarantine_reason": self.quarantine_reason,
+        }
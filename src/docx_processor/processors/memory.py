@@ -0,0 +1,149 @@
+"""
+Memory profiling: the traced allocation peak of each stage of processing a document, the peak resident set size
+while it was processed, and the call sites holding the most memory in the heaviest documents.
+"""
+
+import csv
+import gc
+import heapq
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from docx_processor.config.constants import DEFAULT_MEMORY_PROFILE_TOP, MEMORY_PROFILE_SITES
+from docx_processor.utils.system import current_rss, reset_peak_rss, rss_high_water_mark
+
+STAGES = ("load", "index", "transforms", "save")
+
+_IGNORED_SITES = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+
+def _reset_traced_peak() -> None:
+    # Python 3.8 cannot reset the peak, its stage peaks then include the earlier stages of the document
+    if hasattr(tracemalloc, "reset_peak"):
+        tracemalloc.reset_peak()
+
+
+def _kb(value: int) -> str:
+    return f"{value / 1024:,.0f} KB"
+
+
+@dataclass
+class DocumentMemory:
+    """
+    Memory used while processing one document. Stage peaks are traced allocations above what was in use when the
+    document started, the peak RSS is that of the whole process. ``sites`` are the call sites holding the most
+    memory when the transforms finish, with the document and its index loaded, as (site, bytes, blocks).
+
+    lxml keeps document trees in memory allocated by libxml2, which is not traced, so the traced peaks show the
+    Python objects built over the trees and the peak RSS shows the trees as well.
+    """
+
+    path: Path
+    stages: Dict[str, int] = field(default_factory=dict)
+    peak_rss: Optional[int] = None
+    sites: List[Tuple[str, int, int]] = field(default_factory=list)
+    # Documents lighter than this cannot be among the heaviest, so their sites are not collected
+    sites_threshold: int = field(default=0, repr=False)
+    _baseline: int = field(default=0, repr=False)
+    _rss_reset: bool = field(default=False, repr=False)
+
+    @property
+    def peak(self) -> int:
+        return max(self.stages.values(), default=0)
+
+    def begin(self) -> None:
+        # Garbage left by earlier documents would otherwise be freed during this one and offset its peaks
+        gc.collect()
+        _reset_traced_peak()
+        self._baseline = tracemalloc.get_traced_memory()[0]
+        self._rss_reset = reset_peak_rss()
+        self.peak_rss = current_rss()
+
+    def stage(self, name: str) -> None:
+        """Record the peak of the stage that just ended and start the next one."""
+        self.stages[name] = max(0, tracemalloc.get_traced_memory()[1] - self._baseline)
+        _reset_traced_peak()
+        if not self._rss_reset:
+            # Without a resettable peak, sampling at each stage end is the best available bound
+            self.peak_rss = max(filter(None, (self.peak_rss, current_rss())), default=None)
+        if name == "transforms" and self.peak >= self.sites_threshold:
+            self._collect_sites()
+
+    def finish(self) -> None:
+        if self._rss_reset:
+            self.peak_rss = rss_high_water_mark()
+
+    def _collect_sites(self) -> None:
+        snapshot = tracemalloc.take_snapshot().filter_traces(_IGNORED_SITES)
+        self.sites = [
+            (str(stat.traceback), stat.size, stat.count)
+            for stat in snapshot.statistics("lineno")[:MEMORY_PROFILE_SITES]
+        ]
+
+
+class MemoryProfiler:
+    """
+    Traces allocations for the length of a run and records a DocumentMemory for each document. Tracing covers
+    every thread of the process, so the batch runs a single worker while profiling, and tracing itself slows
+    processing down several times, so profiling is meant for investigating a sample rather than for production
+    runs.
+    """
+
+    def __init__(self, logger, report_file: Path, top_documents: int = DEFAULT_MEMORY_PROFILE_TOP):
+        self.logger = logger
+        self.report_file = report_file
+        self.top_documents = top_documents
+        self.documents: List[DocumentMemory] = []
+        self._heaviest: List[Tuple[int, int, DocumentMemory]] = []
+        self._started = not tracemalloc.is_tracing()
+        if self._started:
+            tracemalloc.start()
+        self.logger.info("Memory profiling enabled, documents are processed one at a time")
+
+    @contextmanager
+    def document(self, path: Path) -> Iterator[DocumentMemory]:
+        """Profile the document processed within the block, which must be the only one being processed."""
+        full = len(self._heaviest) == self.top_documents
+        memory = DocumentMemory(path, sites_threshold=self._heaviest[0][0] if full else 0)
+        memory.begin()
+        try:
+            yield memory
+        finally:
+            memory.finish()
+            self._add(memory)
+
+    def _add(self, memory: DocumentMemory) -> None:
+        self.documents.append(memory)
+        heapq.heappush(self._heaviest, (memory.peak, len(self.documents), memory))
+        if len(self._heaviest) > self.top_documents:
+            # Only the heaviest documents keep their sites
+            heapq.heappop(self._heaviest)[2].sites = []
+
+    def heaviest(self) -> List[DocumentMemory]:
+        return [memory for _, _, memory in sorted(self._heaviest, key=lambda item: item[:2], reverse=True)]
+
+    def close(self) -> None:
+        """Stop tracing, write the per-document report and log the allocation sites of the heaviest documents."""
+        if self._started:
+            tracemalloc.stop()
+        with open(self.report_file, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(["Path", *(f"{stage.capitalize()} Peak Bytes" for stage in STAGES), "Peak RSS Bytes"])
+            writer.writerows(
+                (str(memory.path), *(memory.stages.get(stage, "") for stage in STAGES), memory.peak_rss or "")
+                for memory in self.documents
+            )
+        self.logger.info(f"Memory profile of {len(self.documents)} documents written to {self.report_file}")
+
+        for memory in self.heaviest():
+            stages = ", ".join(f"{stage} {_kb(peak)}" for stage, peak in memory.stages.items())
+            self.logger.info(f"Peak traced memory {_kb(memory.peak)} for {memory.path} ({stages})")
+            for site, size, blocks in memory.sites:
+                self.logger.info(f"    {site}: {_kb(size)} in {blocks} blocks")
@@ -0,0 +1,129 @@
+from io import BytesIO
+from pathlib import Path
+from typing import Callable, List, Optional, Tuple
+
+from docx_processor.logger import create_task_logger
+from .batch import ABANDONED_REASON, BatchProcessor, DocumentEvents
+from .document import DocumentProcessor
+from .docx_indexer import DocxIndexer
+from .package import close_document, copy_document, open_document
+
+
+class SharedDocument:
+    """
+    A document opened and indexed once for several configs. ``load`` returns the document itself, ``copy`` a deep
+    copy of it with a mapped index, which must be taken before anything changes the document.
+    """
+
+    def __init__(self, input_path: Path, source, runtime, logger):
+        self.input_path = input_path
+        self.source = source
+        self.runtime = runtime
+        self.logger = logger
+        self._document = None
+        self._index: Optional[DocxIndexer] = None
+        self._error: Optional[Exception] = None
+        self._loaded = False
+
+    def load(self):
+        if not self._loaded:
+            self._loaded = True
+            try:
+                runtime = self.runtime
+                self._document = open_document(self.input_path, self.source, runtime.mmap_input, runtime.lazy_media)
+                self._index = DocxIndexer(self._document, self.logger)
+            except Exception as e:
+                # Every config reports the document as failed with the same error
+                self._error = e
+        if self._error is not None:
+            raise self._error
+        return self._document, self._index
+
+    def copy(self):
+        document, index = self.load()
+        duplicate = copy_document(document)
+        return duplicate, index.for_copy(duplicate)
+
+    def close(self) -> None:
+        if self._document is not None:
+            close_document(self._document)
+            self._document = None
+
+
+class MultiConfigProcessor(BatchProcessor):
+    """
+    Applies several configs in one pass over the source directory. The first config's runtime options drive the
+    run, and each config keeps its own rules, destination, log, match store and quarantine list.
+
+    Each document is opened and indexed once. Configs that only read it go first and share it; of the configs
+    whose URL or style rules will change it, all but the last work on their own copy.
+    """
+
+    def __init__(self, configs, loggers):
+        super().__init__(configs[0], loggers[0])
+        self.lanes: List[BatchProcessor] = [self]
+        self.lanes += [BatchProcessor(config, logger) for config, logger in zip(configs[1:], loggers[1:])]
+
+    def _process_single_document(
+        self, input_path: Path, output_path: Path, task_logger, copies=(), completed: Optional[DocumentEvents] = None
+    ) -> bool:
+        try:
+            data = self._read_ahead.take(input_path) if self._read_ahead else None
+            source = BytesIO(data) if data is not None else None
+            shared = SharedDocument(input_path, source, self.config.runtime, task_logger)
+            try:
+                results = [
+                    self._run_lane(lane, input_path, task_logger, copies, completed, loader)
+                    for lane, loader in self._schedule(shared, task_logger)
+                ]
+            finally:
+                shared.close()
+            return all(results)
+        finally:
+            if self._read_ahead:
+                self._read_ahead.release(input_path)
+
+    def _schedule(self, shared: SharedDocument, task_logger) -> List[Tuple[BatchProcessor, Callable]]:
+        """Pair each config with the loader for the document it works on, in the order they must run."""
+        try:
+            document, _ = shared.load()
+        except Exception:
+            return [(lane, shared.load) for lane in self.lanes]
+
+        readers, writers = [], []
+        for lane in self.lanes:
+            probe = DocumentProcessor(lane.config, create_task_logger(lane.logger, shared.input_path), lane.rules)
+            (writers if probe.would_modify(document) else readers).append(lane)
+        # URL rules add a header definition to documents without one, so configs without them read first
+        readers.sort(key=lambda lane: bool(lane.config.transform.url_transforms))
+        return (
+            [(lane, shared.load) for lane in readers]
+            + [(lane, shared.copy) for lane in writers[:-1]]
+            + [(lane, shared.load) for lane in writers[-1:]]
+        )
+
+    def _run_lane(self, lane: BatchProcessor, input_path: Path, task_logger, copies, completed, loader) -> bool:
+        output_path = lane._get_output_path(input_path.relative_to(self.config.runtime.source_dir))
+        lane_logger = task_logger if lane is self else create_task_logger(lane.logger, input_path)
+        return lane._run_document(input_path, output_path, lane_logger, copies, completed, loader=loader)
+
+    def _abandon(self, input_path: Path, task_logger, copies) -> None:
+        super()._abandon(input_path, task_logger, copies)
+        for lane in self.lanes[1:]:
+            for path in (input_path, *copies):
+                lane._quarantine(path, ABANDONED_REASON)
+
+    def _open_outputs(self) -> None:
+        super()._open_outputs()
+        for lane in self.lanes[1:]:
+            lane._open_outputs()
+
+    def _close_outputs(self) -> None:
+        super()._close_outputs()
+        for lane in self.lanes[1:]:
+            lane._close_outputs()
+
+    def _log_cache_stats(self) -> None:
+        super()._log_cache_stats()
+        for lane in self.lanes[1:]:
+            lane._log_cache_stats()
@@ -0,0 +1,205 @@
+import copy
+import time
+from pathlib import Path
+from zipfile import ZIP64_LIMIT, ZIP_DEFLATED, ZIP_STORED, ZipFile, ZipInfo
+
+from docx import Document
+from docx.opc.constants import CONTENT_TYPE as CT
+from docx.opc.package import Unmarshaller
+from docx.opc.packuri import CONTENT_TYPES_URI, PACKAGE_URI
+from docx.opc.part import PartFactory, XmlPart
+from docx.opc.pkgreader import PackageReader, _ContentTypeMap
+from docx.opc.pkgwriter import _ContentTypesItem
+from docx.package import Package
+
+from docx_processor.utils.mapped_zip import STORED, MappedZip
+
+
+class LazyMember:
+    """Reference to a package member that is only read when its content is needed."""
+
+    def __init__(self, archive: MappedZip, name: str):
+        self.archive = archive
+        self.name = name
+
+    @property
+    def size(self) -> int:
+        return self.archive.members[self.name].size
+
+    @property
+    def stored(self) -> bool:
+        return self.archive.members[self.name].method == STORED
+
+    def read(self) -> bytes:
+        return self.archive.read(self.name)
+
+    def iter_chunks(self):
+        return self.archive.iter_chunks(self.name)
+
+
+class _LazyBlob:
+    """Mixin for binary parts whose blob is read from the source package on first access."""
+
+    @property
+    def blob(self):
+        if isinstance(self._blob, LazyMember):
+            self._blob = self._blob.read()
+        return super().blob
+
+    @property
+    def lazy_member(self):
+        """The unread source member, or None once the blob has been loaded."""
+        return self._blob if isinstance(self._blob, LazyMember) else None
+
+
+_lazy_classes = {}
+
+
+def _lazy_part_factory(partname, content_type, reltype, blob, package):
+    """PartFactory that builds binary parts around a LazyMember instead of their content."""
+    if not isinstance(blob, LazyMember):
+        return PartFactory(partname, content_type, reltype, blob, package)
+
+    part_class = None
+    if PartFactory.part_class_selector is not None:
+        part_class = PartFactory.part_class_selector(content_type, reltype)
+    if part_class is None:
+        part_class = PartFactory._part_cls_for(content_type)
+    if issubclass(part_class, XmlPart):
+        return part_class.load(partname, content_type, blob.read(), package)
+    if part_class not in _lazy_classes:
+        _lazy_classes[part_class] = type(f"Lazy{part_class.__name__}", (_LazyBlob, part_class), {})
+    return _lazy_classes[part_class].load(partname, content_type, blob, package)
+
+
+def _is_binary(content_type: str) -> bool:
+    return not content_type.endswith("xml")
+
+
+class LazyPackage(Package):
+    """Package whose unread binary parts are streamed from the source package when it is saved."""
+
+    archive = None
+
+    def save(self, pkg_file):
+        parts = self.parts
+        for part in parts:
+            part.before_marshal()
+
+        with ZipFile(pkg_file, "w", compression=ZIP_DEFLATED) as target:
+            target.writestr(CONTENT_TYPES_URI.membername, _ContentTypesItem.from_parts(parts).blob)
+            target.writestr(PACKAGE_URI.rels_uri.membername, self.rels.xml)
+            for part in parts:
+                member = getattr(part, "lazy_member", None)
+                if member is None:
+                    target.writestr(part.partname.membername, part.blob)
+                else:
+                    _copy_member(target, part.partname.membername, member)
+                if len(part.rels):
+                    target.writestr(part.partname.rels_uri.membername, part.rels.xml)
+
+    def close(self) -> None:
+        if self.archive is not None:
+            self.archive.close()
+            self.archive = None
+
+
+def _copy_member(target: ZipFile, name: str, member: LazyMember) -> None:
+    """Stream a member from the source package into the target in bounded chunks."""
+    info = ZipInfo(name, date_time=time.localtime(time.time())[:6])
+    info.compress_type = ZIP_STORED if member.stored else ZIP_DEFLATED
+    info.external_attr = 0o600 << 16
+    with target.open(info, "w", force_zip64=member.size > ZIP64_LIMIT) as f:
+        for chunk in member.iter_chunks():
+            f.write(chunk)
+
+
+class MappedPackageReader:
+    """python-docx physical package reader that reads members from a memory-mapped ZIP."""
+
+    def __init__(self, archive: MappedZip, lazy_media: bool = False):
+        self.archive = archive
+        self.lazy_media = lazy_media
+        self.content_types = None
+
+    def blob_for(self, pack_uri):
+        if self.lazy_media and _is_binary(self.content_types[pack_uri]):
+            return LazyMember(self.archive, pack_uri.membername)
+        return self.archive.read(pack_uri.membername)
+
+    @property
+    def content_types_xml(self) -> bytes:
+        return self.archive.read(CONTENT_TYPES_URI.membername)
+
+    def rels_xml_for(self, source_uri):
+        """Return the rels item XML for ``source_uri``, or None if the source has no rels item."""
+        try:
+            return self.archive.read(source_uri.rels_uri.membername)
+        except KeyError:
+            return None
+
+
+def open_document(input_path: Path, source=None, mmap_input: bool = False, lazy_media: bool = False):
+    """Open a Word document from ``source`` when given, otherwise from ``input_path``.
+
+    With ``mmap_input`` the package is read through a memory map (or straight from the ``source`` buffer),
+    so compressed member data is never copied onto the heap and only the inflated parts are.
+    ``lazy_media`` also leaves binary parts such as images and embeddings unread until they are accessed
+    or saved; the source stays open until ``close_document``.
+    """
+    if not (mmap_input or lazy_media):
+        return Document(source if source is not None else str(input_path))
+
+    archive = MappedZip(source.getbuffer()) if source is not None else MappedZip.open(input_path)
+    phys_reader = MappedPackageReader(archive, lazy_media)
+    try:
+        document = _load_document(phys_reader, input_path)
+    except Exception:
+        archive.close()
+        raise
+    if lazy_media:
+        document.part.package.archive = archive
+    else:
+        archive.close()
+    return document
+
+
+def close_document(document) -> None:
+    """Release the source package a lazily loaded document still reads from."""
+    close = getattr(document.part.package, "close", None)
+    if close is not None:
+        close()
+
+
+def copy_document(document):
+    """Deep copy of an open document that can be changed and saved independently of the original.
+
+    A lazily loaded copy streams its unread parts from the original's source package, so it must be saved
+    before the original is closed, and is not closed itself.
+    """
+    package = document.part.package
+    archive = getattr(package, "archive", None)
+    memo = {id(archive): archive} if archive is not None else {}
+    part = copy.deepcopy(document.part, memo)
+    if archive is not None:
+        part.package.archive = None
+    # A fresh Document over the copied part, the original's cached body would be copied detached from the part
+    return part.document
+
+
+def _load_document(phys_reader: MappedPackageReader, input_path: Path):
+    """Unmarshal a document the way ``docx.Document`` does, from an open physical reader."""
+    content_types = _ContentTypeMap.from_xml(phys_reader.content_types_xml)
+    phys_reader.content_types = content_types
+    pkg_srels = PackageReader._srels_for(phys_reader, PACKAGE_URI)
+    sparts = PackageReader._load_serialized_parts(phys_reader, pkg_srels, content_types)
+
+    if phys_reader.lazy_media:
+        package, part_factory = LazyPackage(), _lazy_part_factory
+    else:
+        package, part_factory = Package(), PartFactory
+    Unmarshaller.unmarshal(PackageReader(content_types, pkg_srels, sparts), package, part_factory)
+    document_part = package.main_document_part
+    if document_part.content_type != CT.WML_DOCUMENT_MAIN:
+        raise ValueError(f"file '{input_path}' is not a Word file, content type is '{document_part.content_type}'")
+    return document_part.document
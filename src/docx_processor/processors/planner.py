@@ -0,0 +1,271 @@
+import gc
+import math
+import random
+import statistics
+import time
+from bisect import bisect_right
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from io import BytesIO
+from pathlib import Path
+from typing import Dict, Hashable, List, Optional, Sequence, Tuple
+
+from docx_processor.config.constants import OUTPUT_DELTA
+from docx_processor.logger import create_task_logger
+from docx_processor.utils.system import (
+    auto_worker_count,
+    available_cpus,
+    current_rss,
+    peak_rss,
+    reset_peak_rss,
+    rss_high_water_mark,
+)
+from .delta import make_delta
+from .discovery import PathFilter, discover_documents
+from .document import DocumentProcessor
+from .rules import RuleSet
+
+# Two-sided 95% normal quantile used for every confidence interval
+Z_95 = 1.96
+# Size strata are cut at these quantiles of the document sizes
+SIZE_QUANTILES = (0.25, 0.5, 0.75)
+# Memory a worker needs even for the smallest documents
+MIN_WORKER_MEMORY = 64 * 1024 * 1024
+
+
+@dataclass
+class Estimate:
+    """Extrapolated total with the half-width of its 95% confidence interval."""
+
+    total: float
+    margin: float
+
+    @property
+    def low(self) -> float:
+        return max(0.0, self.total - self.margin)
+
+    @property
+    def high(self) -> float:
+        return self.total + self.margin
+
+    def to_dict(self) -> dict:
+        return {"estimate": self.total, "low": self.low, "high": self.high}
+
+
+@dataclass
+class DocumentSample:
+    """Measurements from processing one sampled document."""
+
+    path: Path
+    size: int
+    stratum: Hashable
+    seconds: float
+    rule_matches: Counter
+    output_bytes: Optional[int]
+    memory_bytes: Optional[int]
+    failed: bool
+
+    @property
+    def matches(self) -> int:
+        return sum(self.rule_matches.values())
+
+
+@dataclass
+class RunPlan:
+    """Estimates for processing the whole source directory with the current rules."""
+
+    documents: int
+    total_bytes: int
+    samples: List[DocumentSample]
+    strata: int
+    runtime_seconds: Estimate
+    matching_documents: Estimate
+    matches: Estimate
+    rule_matches: Dict[str, Estimate]
+    output_bytes: Optional[Estimate]
+    failures: Estimate
+    worker_memory_bytes: Optional[int]
+    wall_seconds: Dict[int, float] = field(default_factory=dict)
+    recommended_workers: int = 1
+
+    def to_dict(self) -> dict:
+        return {
+            "documents": self.documents,
+            "total_bytes": self.total_bytes,
+            "sampled": len(self.samples),
+            "strata": self.strata,
+            "runtime_seconds": self.runtime_seconds.to_dict(),
+            "matching_documents": self.matching_documents.to_dict(),
+            "matches": self.matches.to_dict(),
+            "rule_matches": {rule: estimate.to_dict() for rule, estimate in self.rule_matches.items()},
+            "output_bytes": self.output_bytes.to_dict() if self.output_bytes else None,
+            "failures": self.failures.to_dict(),
+            "worker_memory_bytes": self.worker_memory_bytes,
+            "wall_seconds": self.wall_seconds,
+            "recommended_workers": self.recommended_workers,
+        }
+
+
+def stratified_estimate(values: Dict[Hashable, List[float]], population: Dict[Hashable, int]) -> Estimate:
+    """Stratified estimate of a population total from per-stratum sample values.
+
+    Strata sampled once borrow the pooled sample variance, fully sampled strata contribute no error.
+    """
+    pooled = [v for sample in values.values() for v in sample]
+    pooled_variance = statistics.variance(pooled) if len(pooled) > 1 else 0.0
+
+    total = variance = 0.0
+    for stratum, sample in values.items():
+        size, n = population[stratum], len(sample)
+        total += size * statistics.fmean(sample)
+        sample_variance = statistics.variance(sample) if n > 1 else pooled_variance
+        variance += size * size * (1 - n / size) * sample_variance / n
+    return Estimate(total, Z_95 * math.sqrt(max(0.0, variance)))
+
+
+class RunPlanner:
+    """
+    Estimates the cost and match volume of a run by processing a stratified random sample of the source
+    directory with the real DocumentProcessor. Documents are stratified by top-level folder and size quartile,
+    and the sample is allocated to strata in proportion to their size, at least one document each.
+    """
+
+    def __init__(self, config, logger, sample_size: int = 50, seed: Optional[int] = None):
+        self.config = config
+        self.logger = logger
+        self.sample_size = sample_size
+        self.random = random.Random(seed)
+        self.rules = RuleSet(config.transform)
+
+    def plan(self) -> RunPlan:
+        runtime = self.config.runtime
+        # Discovery order varies between walks, sorting keeps a seeded sample reproducible
+        paths = sorted(
+            discover_documents(
+                runtime.source_dir, PathFilter.from_runtime(runtime), runtime.discovery_workers, self.logger
+            )
+        )
+        sizes = {path: path.stat().st_size for path in paths}
+        strata = self._stratify(sizes)
+        population = {stratum: len(paths) for stratum, paths in strata.items()}
+
+        sampled = [(stratum, path) for stratum, paths in self._allocate(strata).items() for path in paths]
+        # Where the peak RSS cannot be reset, ascending size keeps a larger predecessor from masking a document's peak
+        sampled.sort(key=lambda item: sizes[item[1]])
+        samples = [self._measure(path, sizes[path], stratum) for stratum, path in sampled]
+        return self._extrapolate(sizes, population, samples)
+
+    def _stratify(self, sizes: Dict[Path, int]) -> Dict[Tuple[str, int], List[Path]]:
+        ordered = sorted(sizes.values())
+        cuts = [ordered[int(q * (len(ordered) - 1))] for q in SIZE_QUANTILES] if ordered else []
+        strata = defaultdict(list)
+        for path in sorted(sizes):
+            relative = path.relative_to(self.config.runtime.source_dir)
+            folder = relative.parts[0] if len(relative.parts) > 1 else "."
+            strata[(folder, bisect_right(cuts, sizes[path]))].append(path)
+        return dict(strata)
+
+    def _allocate(self, strata: Dict[Hashable, List[Path]]) -> Dict[Hashable, List[Path]]:
+        total = sum(len(paths) for paths in strata.values())
+        allocation = {}
+        for stratum, paths in strata.items():
+            count = min(len(paths), max(1, round(self.sample_size * len(paths) / total)))
+            allocation[stratum] = self.random.sample(paths, count)
+        return allocation
+
+    def _measure(self, path: Path, size: int, stratum: Hashable) -> DocumentSample:
+        processor = DocumentProcessor(self.config, create_task_logger(self.logger, path), self.rules)
+        output = None if self.config.runtime.find_only else BytesIO()
+        # Garbage left by earlier samples would otherwise be freed during this one and offset its peak
+        gc.collect()
+        rss_reset = reset_peak_rss()
+        rss_before = current_rss()
+        peak_before = None if rss_reset else peak_rss()
+
+        start = time.perf_counter()
+        matches = processor.process_document(path, output)
+        seconds = time.perf_counter() - start
+
+        if rss_reset:
+            peak = rss_high_water_mark()
+        else:
+            # The process peak is only this document's when the document raised it, otherwise the resident size
+            # it ends with is the best available bound
+            peak = peak_rss()
+            if peak is None or peak == peak_before:
+                peak = current_rss()
+        memory = peak - rss_before if peak is not None and rss_before is not None else None
+        output_bytes = None
+        if output is not None and processor.error is None:
+            data = output.getvalue()
+            # A delta run writes only the changed parts of each document
+            output_bytes = len(make_delta(path, data) if self.config.runtime.output == OUTPUT_DELTA else data)
+        return DocumentSample(
+            path=path,
+            size=size,
+            stratum=stratum,
+            seconds=seconds,
+            rule_matches=Counter(match.rule for match in matches),
+            output_bytes=output_bytes,
+            memory_bytes=max(0, memory) if memory is not None else None,
+            failed=processor.error is not None,
+        )
+
+    def _extrapolate(self, sizes: Dict[Path, int], population, samples: Sequence[DocumentSample]) -> RunPlan:
+        def estimate(metric) -> Estimate:
+            values = defaultdict(list)
+            for sample in samples:
+                values[sample.stratum].append(float(metric(sample)))
+            return stratified_estimate(values, population) if values else Estimate(0.0, 0.0)
+
+        rules = sorted({rule for sample in samples for rule in sample.rule_matches})
+        output_bytes = None
+        if not self.config.runtime.find_only:
+            # Failed documents are not written, so they count as no output
+            output_bytes = estimate(lambda s: s.output_bytes or 0)
+
+        plan = RunPlan(
+            documents=len(sizes),
+            total_bytes=sum(sizes.values()),
+            samples=list(samples),
+            strata=len(population),
+            runtime_seconds=estimate(lambda s: s.seconds),
+            matching_documents=estimate(lambda s: s.matches > 0),
+            matches=estimate(lambda s: s.matches),
+            rule_matches={rule: estimate(lambda s, rule=rule: s.rule_matches[rule]) for rule in rules},
+            output_bytes=output_bytes,
+            failures=estimate(lambda s: s.failed),
+            worker_memory_bytes=self._worker_memory(sizes, samples),
+        )
+        self._recommend_workers(plan, sizes, samples)
+        return plan
+
+    @staticmethod
+    def _scaled_to_largest(sizes: Dict[Path, int], samples: Sequence[DocumentSample], metric) -> float:
+        """The larger of the sampled maximum and the median per-byte rate applied to the largest document."""
+        measured = [(metric(s), s.size) for s in samples if metric(s) is not None]
+        if not measured:
+            return 0.0
+        rates = [value / size for value, size in measured if size]
+        scaled = statistics.median(rates) * max(sizes.values()) if rates else 0.0
+        return max(max(value for value, _ in measured), scaled)
+
+    def _worker_memory(self, sizes, samples) -> Optional[int]:
+        if not any(s.memory_bytes is not None for s in samples):
+            return None
+        return int(max(MIN_WORKER_MEMORY, self._scaled_to_largest(sizes, samples, lambda s: s.memory_bytes)))
+
+    def _recommend_workers(self, plan: RunPlan, sizes, samples) -> None:
+        """Estimate wall time per worker count, assuming throughput scales with workers, and pick the
+        smallest count within 10% of the best the host can run."""
+        if plan.worker_memory_bytes is not None:
+            limit = auto_worker_count(memory_per_worker=plan.worker_memory_bytes)
+        else:
+            limit = available_cpus()
+        # No worker count can finish sooner than the slowest single document
+        longest = self._scaled_to_largest(sizes, samples, lambda s: s.seconds)
+
+        counts = sorted({1, limit} | {2**i for i in range(1, limit.bit_length()) if 2**i <= limit})
+        plan.wall_seconds = {w: max(plan.runtime_seconds.total / w, longest) for w in counts}
+        best = plan.wall_seconds[limit]
+        plan.recommended_workers = min(w for w in counts if plan.wall_seconds[w] <= best * 1.1)
@@ -0,0 +1,80 @@
+import threading
+from pathlib import Path
+from typing import Dict, Optional, Sequence
+
+
+class ReadAhead:
+    """
+    Reads upcoming documents into memory on a background thread so that slow storage overlaps with processing.
+    Documents are read in the order they will be processed. At most ``depth`` documents and ``max_bytes`` bytes
+    are held at once. A document larger than ``max_bytes`` is still read, but only when nothing else is held.
+    Workers ``take`` a document's bytes and ``release`` them once processing has finished.
+    """
+
+    def __init__(self, paths: Sequence[Path], depth: int, max_bytes: int):
+        self.depth = depth
+        self.max_bytes = max_bytes
+        self._order = list(paths)
+        self._scheduled = set(self._order)
+        self._buffers: Dict[Path, Optional[bytes]] = {}
+        self._held: Dict[Path, int] = {}
+        self._held_bytes = 0
+        self._closed = False
+        self._condition = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name="docx-read-ahead", daemon=True)
+        self._thread.start()
+
+    def _has_room(self, size: int) -> bool:
+        if not self._held:
+            return True
+        return len(self._held) < self.depth and self._held_bytes + size <= self.max_bytes
+
+    def _run(self) -> None:
+        for path in self._order:
+            try:
+                size = path.stat().st_size
+            except OSError:
+                size = 0
+
+            with self._condition:
+                self._condition.wait_for(lambda: self._closed or self._has_room(size))
+                if self._closed:
+                    return
+                self._held[path] = size
+                self._held_bytes += size
+
+            try:
+                data = path.read_bytes()
+            except OSError:
+                data = None  # The worker reads it again and reports the error
+
+            with self._condition:
+                self._buffers[path] = data
+                if data is None:
+                    self._release(path)
+                self._condition.notify_all()
+
+    def take(self, path: Path) -> Optional[bytes]:
+        """Wait for a document's bytes; returns None if it is not scheduled or could not be read."""
+        if path not in self._scheduled:
+            return None
+        with self._condition:
+            self._condition.wait_for(lambda: self._closed or path in self._buffers)
+            return self._buffers.pop(path, None)
+
+    def _release(self, path: Path) -> None:
+        size = self._held.pop(path, None)
+        if size is not None:
+            self._held_bytes -= size
+            self._condition.notify_all()
+
+    def release(self, path: Path) -> None:
+        """Return a document's share of the buffer budget; safe to call more than once."""
+        with self._condition:
+            self._release(path)
+
+    def close(self) -> None:
+        with self._condition:
+            self._closed = True
+            self._buffers.clear()
+            self._condition.notify_all()
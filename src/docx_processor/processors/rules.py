@@ -0,0 +1,46 @@
+import hashlib
+from typing import List, Pattern, Tuple
+
+import regex
+
+from docx_processor.config import RegexTransform, TransformConfig
+from docx_processor.config.constants import STYLE_CACHE_SIZE, URL_CACHE_SIZE
+from .cache import LRUCache
+
+# URL rewrites keyed by (url, rule set fingerprint), shared by every rule set in the process
+URL_REWRITE_CACHE = LRUCache(URL_CACHE_SIZE)
+
+
+class RuleSet:
+    """Compiled transform rules, built once and shared by every document processed with them."""
+
+    def __init__(self, transform: TransformConfig):
+        self.transform = transform
+        self.url_patterns: List[Tuple[Pattern, str]] = [
+            (regex.compile(t.from_pattern, regex.IGNORECASE), t.to_pattern) for t in transform.url_transforms
+        ]
+        self.text_patterns = self.compile_text(transform.text_transforms)
+        self.fingerprint = self._fingerprint(transform)
+        # Results that only depend on these rules and a part's content, keyed by the part's hash
+        self.style_cache = LRUCache(STYLE_CACHE_SIZE)
+        self.url_cache = URL_REWRITE_CACHE
+
+    @staticmethod
+    def compile_text(transforms: List[RegexTransform]) -> List[Tuple[Pattern, RegexTransform]]:
+        """Compile text rules; matching is case sensitive, unlike URL rules.
+
+        Rules are compiled with ``regex`` rather than ``re`` so an evaluation can be given a timeout and runs
+        without holding the GIL.
+        """
+        return [(regex.compile(t.from_pattern), t) for t in transforms]
+
+    @staticmethod
+    def _fingerprint(transform: TransformConfig) -> str:
+        """Stable hash of the rules so results can be tied to the rule set that produced them."""
+        digest = hashlib.sha1()
+        for name in ("url_transforms", "text_transforms", "style_transforms"):
+            for rule in getattr(transform, name):
+                digest.update(f"{name}\0{rule.from_pattern}\0{rule.to_pattern}\n".encode("utf-8"))
+        for drop in transform.drop_matches:
+            digest.update(f"drop\0{drop}\n".encode("utf-8"))
+        return digest.hexdigest()
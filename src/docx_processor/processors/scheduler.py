@@ -0,0 +1,43 @@
+import heapq
+import zipfile
+from pathlib import Path
+from typing import Iterable, Iterator, Optional, Tuple, TypeVar
+
+T = TypeVar("T", bound=Tuple)
+
+XML_SUFFIXES = (".xml", ".rels")
+
+
+def estimate_cost(path: Path) -> int:
+    """
+    Estimate the work needed to process a document from its ZIP central directory.
+    XML parts are parsed and transformed so count at their uncompressed size; other parts are only copied
+    through so count at their compressed size. Unreadable packages fall back to the file size.
+    """
+    try:
+        with zipfile.ZipFile(path) as package:
+            return sum(
+                info.file_size if info.filename.endswith(XML_SUFFIXES) else info.compress_size
+                for info in package.infolist()
+            )
+    except (OSError, zipfile.BadZipFile):
+        try:
+            return path.stat().st_size
+        except OSError:
+            return 0
+
+
+def largest_first(groups: Iterable[T], window: Optional[int] = None) -> Iterator[T]:
+    """
+    Order work items, keyed by the path in their first field, by descending estimated cost. With a ``window`` at
+    most that many items are held back, so the first ones are handed out before the input is exhausted and each is
+    the largest of those waiting rather than of the whole input.
+    """
+    waiting = []
+    # The position breaks ties, so items of equal cost keep their input order
+    for position, group in enumerate(groups):
+        heapq.heappush(waiting, (-estimate_cost(group[0]), position, group))
+        if window is not None and len(waiting) >= window:
+            yield heapq.heappop(waiting)[2]
+    while waiting:
+        yield heapq.heappop(waiting)[2]
@@ -0,0 +1,86 @@
+"""
+Table traversal over the ``w:tbl``/``w:tr``/``w:tc`` elements themselves.
+
+python-docx builds the whole cell grid of a table each time a row's cells are read, and repeats a merged cell for
+every grid position it covers, so walking ``table.rows`` and ``row.cells`` is quadratic on large merged tables and
+never reaches nested tables. Walking the elements visits each physical cell once, in time linear in the table XML.
+"""
+
+from typing import Iterator, NamedTuple, Tuple
+
+from docx.oxml.ns import qn
+from docx.table import Table, _Cell
+from docx.text.paragraph import Paragraph
+
+TBL = qn("w:tbl")
+TR = qn("w:tr")
+TC = qn("w:tc")
+P = qn("w:p")
+TR_PR = qn("w:trPr")
+TC_PR = qn("w:tcPr")
+GRID_BEFORE = qn("w:gridBefore")
+GRID_SPAN = qn("w:gridSpan")
+V_MERGE = qn("w:vMerge")
+VAL = qn("w:val")
+
+
+class TableCell(NamedTuple):
+    """
+    A physical table cell. ``table`` numbers the cell's table and the tables it is nested in, outermost first, so
+    (2, 1) is the first table nested in the second table of its container. ``row`` and ``column`` count from 1,
+    ``column`` being the first grid column the cell covers. ``merged`` marks the continuation of a vertically
+    merged cell, whose content Word shows as part of the cell above.
+    """
+
+    cell: _Cell
+    table: Tuple[int, ...]
+    row: int
+    column: int
+    merged: bool
+
+    @property
+    def table_row(self) -> str:
+        """The ``table|row`` label matches are logged with, nested tables numbered like "2.1"."""
+        return f"{'.'.join(map(str, self.table))}|{self.row}"
+
+
+def _int_val(properties, tag: str, default: int) -> int:
+    element = properties.find(tag) if properties is not None else None
+    try:
+        return int(element.get(VAL)) if element is not None else default
+    except (TypeError, ValueError):
+        return default
+
+
+def _continues_merge(tc) -> bool:
+    properties = tc.find(TC_PR)
+    v_merge = properties.find(V_MERGE) if properties is not None else None
+    # A vMerge without a value continues the merge, "restart" begins one
+    return v_merge is not None and v_merge.get(VAL, "continue") == "continue"
+
+
+def iter_cells(table: Table, number: Tuple[int, ...] = (1,)) -> Iterator[TableCell]:
+    """Every physical cell of a table in row order, without descending into nested tables."""
+    for row, tr in enumerate(table._tbl.iterchildren(TR), 1):
+        column = _int_val(tr.find(TR_PR), GRID_BEFORE, 0) + 1
+        for tc in tr.iterchildren(TC):
+            yield TableCell(_Cell(tc, table), number, row, column, _continues_merge(tc))
+            column += max(1, _int_val(tc.find(TC_PR), GRID_SPAN, 1))
+
+
+def iter_table_paragraphs(container) -> Iterator[Tuple[Paragraph, TableCell]]:
+    """Paragraphs in the tables of a document, header or other block container, with their cell, in document
+    order. Nested tables are visited where they appear in their cell."""
+    for number, table in enumerate(container.tables, 1):
+        yield from _table_paragraphs(table, (number,))
+
+
+def _table_paragraphs(table: Table, number: Tuple[int, ...]) -> Iterator[Tuple[Paragraph, TableCell]]:
+    for table_cell in iter_cells(table, number):
+        nested = 0
+        for child in table_cell.cell._tc.iterchildren(P, TBL):
+            if child.tag == P:
+                yield Paragraph(child, table_cell.cell), table_cell
+            else:
+                nested += 1
+                yield from _table_paragraphs(Table(child, table_cell.cell), number + (nested,))
@@ -0,0 +1,123 @@
+"""
+Triage: whether each document needs attention at all. The scan of a document stops at its first match, and the
+run reports one row per document instead of every occurrence.
+"""
+
+import csv
+import threading
+from dataclasses import replace
+from pathlib import Path
+from typing import Optional
+
+from docx import Document
+
+from docx_processor.utils.url import TEXT_PARTS
+
+from .docx_indexer import DocxIndexer
+from .document import DocumentProcessor
+
+REPORT_HEADER = ["Path", "Matched", "Rule", "Section", "Location", "Table Row", "Module", "Original", "Error"]
+
+
+class _FirstMatch(Exception):
+    """Raised once a document has matched, unwinding whichever check found it."""
+
+
+class _LazyIndex:
+    """Builds the document's index on first use. The index only locates matches, so a document without any in
+    paragraph scan mode is never indexed."""
+
+    def __init__(self, doc: Document, logger):
+        self._doc = doc
+        self._logger = logger
+        self._index: Optional[DocxIndexer] = None
+
+    def __getattr__(self, name):
+        if self._index is None:
+            self._index = DocxIndexer(self._doc, self._logger)
+        return getattr(self._index, name)
+
+
+class TriageProcessor(DocumentProcessor):
+    """
+    Finds whether any rule matches a document, stopping at the first match. Checks run cheapest first: hyperlink
+    relationships, then style names, then paragraph and table text, then hyperlink runs and finally field codes,
+    which need every text part walked. Documents are never modified, so media parts are left unread.
+    """
+
+    def __init__(self, config, logger, rules=None):
+        runtime = replace(config.runtime, find_only=True, lazy_media=True)
+        super().__init__(replace(config, runtime=runtime), logger, rules)
+
+    def _log_match(self, message: str, rule: str, original: str, replacement: str = "") -> None:
+        super()._log_match(message, rule, original, replacement)
+        raise _FirstMatch()
+
+    def _index_document(self, doc: Document) -> _LazyIndex:
+        return _LazyIndex(doc, self.logger)
+
+    def _apply_transforms(self, doc: Document, doc_index) -> None:
+        transform = self.config.transform
+        try:
+            if transform.url_transforms:
+                self.logger.extra["task"] = "hyperlinks"
+                for section, container in self._containers(doc, footers=True):
+                    self.logger.extra["section"] = section
+                    self._rel_hyperlinks(container, doc_index)
+
+            if transform.style_transforms:
+                self.logger.extra["task"] = "Styles"
+                self.transform_styles(doc)
+
+            if transform.text_transforms:
+                self.logger.extra["task"] = "Text"
+                self.transform_text(doc, doc_index, transform.text_transforms)
+
+            if transform.url_transforms:
+                self.logger.extra["task"] = "hyperlinks"
+                for section, container in self._containers(doc, footers=False):
+                    self.logger.extra["section"] = section
+                    self._para_hyperlinks(container, doc_index)
+                for part in doc.part.package.iter_parts():
+                    if part.content_type in TEXT_PARTS:
+                        self._field_hyperlinks(part, doc, doc_index)
+        except _FirstMatch:
+            pass
+
+    @staticmethod
+    def _containers(doc: Document, footers: bool):
+        """The body and the headers, and footers when asked, in the order and with the sections transform_urls
+        visits them."""
+        yield "Body", doc
+        for section in doc.sections:
+            yield "Header", section.header
+            if footers:
+                yield "Footer", section.footer
+
+
+class TriageReport:
+    """One CSV row per document, written as documents finish so a run over a large share holds none of them."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.documents = 0
+        self.matched = 0
+        self._lock = threading.Lock()
+        self._file = open(path, "w", newline="", encoding="utf-8")
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(REPORT_HEADER)
+
+    def add(self, document: Path, processor: DocumentProcessor) -> None:
+        """Report a document with the outcome of the processor that triaged it, or of its byte-identical original."""
+        match = processor.matches[0] if processor.matches else None
+        fields = ("rule", "section", "location", "table_row", "module", "original")
+        row = [str(document), str(match is not None)]
+        row += [getattr(match, name) for name in fields] if match else [""] * len(fields)
+        row.append(processor.error or "")
+        with self._lock:
+            self._writer.writerow(row)
+            self.documents += 1
+            self.matched += match is not None
+
+    def close(self) -> None:
+        self._file.close()
@@ -0,0 +1,185 @@
+import asyncio
+import os
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from docx_processor.utils.inotify import IN_CLOSE_WRITE, IN_CREATE, IN_ISDIR, IN_MOVED_TO, IN_Q_OVERFLOW
+from docx_processor.utils.inotify import Inotify, inotify_available
+from .discovery import PathFilter, is_document_path
+
+Signature = Tuple[int, int]  # (mtime_ns, size)
+
+
+class _Pending:
+    __slots__ = ("signature", "changed_at", "generation", "closed")
+
+    def __init__(self, signature: Optional[Signature], closed: bool):
+        self.signature = signature
+        self.changed_at = 0.0
+        self.generation = 0
+        self.closed = closed
+
+
+class DocumentWatcher:
+    """
+    Watch the source directory and queue new or modified documents into a BatchProcessor.
+    Uses inotify where available and falls back to polling the tree for (mtime, size) changes.
+    A document is queued once it has been closed by the writer (inotify) or seen unchanged by a later scan (polling),
+    has seen no events for ``debounce`` seconds and its size and mtime are unchanged since it was last seen.
+    """
+
+    def __init__(self, processor, debounce: float = 2.0, poll_interval: float = 5.0, use_inotify: bool = True):
+        self.processor = processor
+        self.logger = processor.logger
+        self.root: Path = processor.config.runtime.source_dir
+        self.path_filter = PathFilter.from_runtime(processor.config.runtime)
+        self.debounce = debounce
+        self.poll_interval = poll_interval
+        self._pending: Dict[Path, _Pending] = {}
+        self._snapshot: Dict[Path, Signature] = {}
+        self._inotify: Optional[Inotify] = None
+        self._last_read_ns = time.time_ns()
+        self._generation = 0
+
+        if use_inotify and inotify_available():
+            try:
+                self._inotify = Inotify()
+                self._inotify.add_tree(self.root)
+            except OSError as e:
+                self.logger.warning(f"inotify unavailable ({e}), falling back to polling")
+                self.close()
+
+        if self._inotify is None:
+            self._snapshot = self._scan()
+        self.logger.info(f"Watching {self.root} using {'inotify' if self._inotify else 'polling'}")
+
+    @staticmethod
+    def _signature(path: Path) -> Optional[Signature]:
+        try:
+            stat = path.stat()
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _scan(self, directory: Optional[Path] = None) -> Dict[Path, Signature]:
+        """Snapshot (mtime, size) for every accepted document below ``directory``, the source directory by default.
+        Like discovery, directories the path filter would not walk, excluded or too deep, are never listed."""
+        directory = directory or self.root
+        snapshot = {}
+        stack = [(str(directory), directory.relative_to(self.root).parts)]
+        while stack:
+            path, parts = stack.pop()
+            try:
+                with os.scandir(path) as entries:
+                    for entry in entries:
+                        entry_parts = parts + (entry.name,)
+                        if entry.is_dir(follow_symlinks=False):
+                            if self.path_filter.walks(entry_parts):
+                                stack.append((entry.path, entry_parts))
+                        elif is_document_path(Path(entry.name)) and self.path_filter.selects(entry_parts):
+                            stat = entry.stat()
+                            snapshot[Path(entry.path)] = (stat.st_mtime_ns, stat.st_size)
+            except OSError:
+                continue
+        return snapshot
+
+    def _mark(self, path: Path, closed: bool, signature: Optional[Signature] = None) -> None:
+        if not self.path_filter.accepts(path.relative_to(self.root).parts):
+            return
+        if signature is None and closed:
+            signature = self._signature(path)
+        pending = self._pending.setdefault(path, _Pending(signature, closed))
+        pending.changed_at = time.monotonic()
+        pending.generation = self._generation
+        pending.closed = closed
+        if signature is not None:
+            pending.signature = signature
+
+    def _collect_polling(self) -> None:
+        snapshot = self._scan()
+        for path, signature in snapshot.items():
+            if self._snapshot.get(path) != signature:
+                self._mark(path, closed=True, signature=signature)
+        self._snapshot = snapshot
+
+    def _collect_inotify(self, timeout: float) -> None:
+        since, self._last_read_ns = self._last_read_ns, time.time_ns()
+        for path, mask in self._inotify.read(timeout):
+            if mask & IN_Q_OVERFLOW:
+                # Events were lost; queue everything modified since the last read
+                self.logger.warning("inotify queue overflowed, rescanning source directory")
+                for document, (mtime_ns, _) in self._scan().items():
+                    if mtime_ns >= since:
+                        self._mark(document, closed=True)
+            elif mask & IN_ISDIR:
+                if mask & (IN_CREATE | IN_MOVED_TO):
+                    self._watch_new_directory(path)
+            elif is_document_path(path):
+                self._mark(path, closed=bool(mask & (IN_CLOSE_WRITE | IN_MOVED_TO)))
+
+    def _watch_new_directory(self, path: Path) -> None:
+        try:
+            self._inotify.add_tree(path)
+        except OSError as e:
+            self.logger.warning(f"Unable to watch {path}: {e}")
+        # Documents may have landed before the watch was in place
+        parts = path.relative_to(self.root).parts
+        if all(self.path_filter.walks(parts[:depth]) for depth in range(1, len(parts) + 1)):
+            for document in self._scan(path):
+                self._mark(document, closed=True)
+
+    def _take_ready(self) -> List[Path]:
+        """Remove and return pending documents that have finished writing."""
+        now = time.monotonic()
+        ready = []
+        for path, pending in list(self._pending.items()):
+            if not pending.closed or now - pending.changed_at < self.debounce:
+                continue
+            if self._inotify is None and pending.generation == self._generation:
+                continue  # Polling needs a second scan to know the document is not still growing
+            signature = self._signature(path)
+            if signature is None:
+                del self._pending[path]  # Deleted or moved away before it settled
+            elif signature != pending.signature:
+                pending.signature = signature
+                pending.changed_at = now
+            else:
+                del self._pending[path]
+                ready.append(path)
+        return ready
+
+    def check(self, timeout: float = 0.0) -> List[Path]:
+        """Collect file system changes, waiting up to ``timeout`` for inotify events, and return ready documents."""
+        self._generation += 1
+        if self._inotify:
+            self._collect_inotify(timeout)
+        else:
+            time.sleep(timeout)
+            self._collect_polling()
+        return self._take_ready()
+
+    def run(self, max_batches: Optional[int] = None) -> None:
+        """Dispatch ready documents to the batch processor until interrupted."""
+        batches = 0
+        try:
+            while max_batches is None or batches < max_batches:
+                timeout = min(self.poll_interval, self.debounce) if self._pending else self.poll_interval
+                ready = self.check(timeout)
+                if not ready:
+                    continue
+                batches += 1
+                self.logger.info(f"Queueing {len(ready)} changed documents")
+                if self.processor.config.runtime.sync_mode:
+                    self.processor.process_paths(ready)
+                else:
+                    asyncio.run(self.processor.process_paths_async(ready))
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        if self._inotify:
+            self._inotify.close()
+            self._inotify = None
@@ -0,0 +1,137 @@
+import os
+import threading
+import uuid
+from collections import deque
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Deque, List, Tuple
+
+
+class OutputWriter:
+    """
+    Write-behind stage for output documents. Workers hand over serialised documents and move on to the next one.
+    A writer thread writes each buffer to a temporary file beside its destination, fsyncs the batch and renames
+    the files into place, so an interrupted run never leaves a partially written document at a destination path.
+    ``submit`` blocks while more than ``max_bytes`` are waiting to be written, and returns a future that resolves
+    once the document is in place or fails with the error that stopped it.
+    """
+
+    def __init__(self, logger, max_bytes: int, batch_size: int = 32):
+        self.logger = logger
+        self.max_bytes = max_bytes
+        self.batch_size = batch_size
+        self.written = 0
+        self.failed = 0
+        self._queue: Deque[Tuple[Path, bytes, Future]] = deque()
+        self._pending_bytes = 0
+        self._closed = False
+        self._condition = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name="docx-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, path: Path, data) -> Future:
+        """Queue a serialised document for writing, waiting while the buffer is full."""
+        size = len(data)
+        future: Future = Future()
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("Output writer is closed")
+            # A document larger than the whole buffer is accepted once everything before it is written
+            self._condition.wait_for(lambda: not self._pending_bytes or self._pending_bytes + size <= self.max_bytes)
+            self._queue.append((path, data, future))
+            self._pending_bytes += size
+            self._condition.notify_all()
+        return future
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._queue or self._closed)
+                if not self._queue:
+                    return
+                batch = [self._queue.popleft() for _ in range(min(len(self._queue), self.batch_size))]
+
+            try:
+                self._write_batch(batch)
+            except Exception as e:
+                # Whatever stopped the batch fails its unwritten documents, the writer carries on with the next
+                for path, _, future in batch:
+                    if not future.done():
+                        self._fail(path, future, e)
+
+            with self._condition:
+                self._pending_bytes -= sum(len(data) for _, data, _ in batch)
+                self._condition.notify_all()
+
+    def _write_batch(self, batch: List[Tuple[Path, bytes, Future]]) -> None:
+        staged = []
+        for path, data, future in batch:
+            temp_path = path.with_name(f".{path.name}.{uuid.uuid4().hex[:8]}.tmp")
+            try:
+                f = open(temp_path, "xb")
+            except OSError as e:
+                self._fail(path, future, e)
+                continue
+            try:
+                f.write(data)
+                f.flush()
+            except OSError as e:
+                f.close()
+                self._discard(temp_path)
+                self._fail(path, future, e)
+                continue
+            staged.append((path, temp_path, f, future))
+
+        # Data must be durable before the rename publishes it, then the renames themselves
+        directories = set()
+        written = []
+        for path, temp_path, f, future in staged:
+            try:
+                os.fsync(f.fileno())
+                f.close()
+                os.replace(temp_path, path)
+                directories.add(path.parent)
+                written.append(future)
+            except OSError as e:
+                f.close()
+                self._discard(temp_path)
+                self._fail(path, future, e)
+
+        for directory in directories:
+            _fsync_directory(directory)
+        for future in written:
+            self.written += 1
+            future.set_result(None)
+
+    def _fail(self, path: Path, future: Future, error: Exception) -> None:
+        self.failed += 1
+        self.logger.error(f"Failed to write {path}: {error}")
+        future.set_exception(error)
+
+    @staticmethod
+    def _discard(temp_path: Path) -> None:
+        try:
+            temp_path.unlink()
+        except OSError:
+            pass
+
+    def close(self) -> None:
+        """Write everything still queued and stop the writer thread."""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        self._thread.join()
+
+
+def _fsync_directory(directory: Path) -> None:
+    """Persist directory entries on platforms that allow opening directories."""
+    try:
+        fd = os.open(str(directory), os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
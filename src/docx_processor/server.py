@@ -0,0 +1,321 @@
+"""
+Warm document processing service for the ``serve`` command.
+
+Jobs are JSON objects, accepted over a Unix domain socket (one job per line) or localhost HTTP (``POST /jobs``).
+Jobs read and write any path the server user can, so the socket is only accessible to that user. HTTP is only
+served on loopback addresses unless remote access is explicitly allowed, and each job must carry the token the
+server writes to a file only its user can read, as ``Authorization: Bearer <token>``.
+A job names its input by path or as base64 encoded bytes, e.g.::
+
+    {"input_path": "in/report.docx", "output_path": "out/report.docx", "find_only": false}
+    {"input_bytes": "<base64>", "name": "upload.docx", "find_only": false}
+
+Without an ``output_path`` a modified document is returned as base64 ``output_bytes``.
+Every response carries the structured match records found in the document.
+"""
+
+import base64
+import binascii
+import hmac
+import ipaddress
+import json
+import os
+import secrets
+import socket
+import socketserver
+import stat
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import replace
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Optional, Tuple
+from urllib.parse import urlsplit
+
+from .config import AppConfig, TransformConfig
+from .api import process_bytes
+from .processors.rules import RuleSet
+from .version import __version__
+
+
+class JobError(ValueError):
+    """Raised when a job request is malformed."""
+
+
+class DocumentService:
+    """Keeps configuration, compiled rules and worker threads warm between jobs."""
+
+    def __init__(self, config: AppConfig, config_path: Path, logger):
+        self.config_path = config_path
+        self.logger = logger
+        # Replaced as a whole on reload, so a job never sees the configuration of one load with the rules of another
+        self.snapshot: Tuple[AppConfig, RuleSet] = (config, RuleSet(config.transform))
+        self.executor = ThreadPoolExecutor(max_workers=config.runtime.workers)
+        self._config_mtime = self._stat_config()
+        self._reload_lock = threading.Lock()
+
+    def _stat_config(self) -> Optional[int]:
+        try:
+            return self.config_path.stat().st_mtime_ns
+        except OSError:
+            return None
+
+    def reload_if_changed(self) -> bool:
+        """Reload the transform configuration when its file has changed since it was last read."""
+        mtime = self._stat_config()
+        if mtime == self._config_mtime:
+            return False
+
+        with self._reload_lock:
+            if mtime == self._config_mtime:
+                return False
+            self._config_mtime = mtime
+            try:
+                transform = TransformConfig.from_yaml(self.config_path)
+                rules = RuleSet(transform)
+            except Exception as e:
+                self.logger.error(f"Failed to reload {self.config_path}, keeping previous rules: {e}")
+                return False
+
+            config, _ = self.snapshot
+            self.snapshot = (replace(config, transform=transform), rules)
+            self.logger.info(f"Reloaded configuration from {self.config_path}")
+            return True
+
+    def handle(self, job) -> dict:
+        """Run a job on the worker pool and return its JSON serialisable result."""
+        self.reload_if_changed()
+        try:
+            return self.executor.submit(self.run_job, job, *self.snapshot).result()
+        except (JobError, binascii.Error) as e:
+            return {"ok": False, "error": f"Invalid job: {e}"}
+        except Exception as e:
+            self.logger.error(f"Job failed: {e}")
+            return {"ok": False, "error": str(e)}
+
+    def run_job(self, job, config: AppConfig, rules: RuleSet) -> dict:
+        """Process a single job with the given configuration snapshot."""
+        start = time.perf_counter()
+        if not isinstance(job, dict):
+            raise JobError("job must be a JSON object")
+
+        find_only = bool(job.get("find_only", config.runtime.find_only))
+        if "input_bytes" in job:
+            data = base64.b64decode(job["input_bytes"], validate=True)
+            name = job.get("name", "document.docx")
+        elif "input_path" in job:
+            data = Path(job["input_path"]).read_bytes()
+            name = job["input_path"]
+        else:
+            raise JobError("input_path or input_bytes is required")
+
+        output_path = Path(job["output_path"]) if job.get("output_path") else None
+        processed = process_bytes(data, config, name=name, find_only=find_only, logger=self.logger, rules=rules)
+
+        result = {
+            "ok": processed.ok,
+            "document": name,
+            "matches": [match.to_dict() for match in processed.matches],
+        }
+        if processed.error:
+            result["error"] = processed.error
+        elif processed.output is not None:
+            if output_path:
+                _write_output(output_path, processed.output)
+                result["output_path"] = str(output_path)
+            if job.get("return_bytes", output_path is None):
+                result["output_bytes"] = base64.b64encode(processed.output).decode("ascii")
+
+        result["elapsed_ms"] = round((time.perf_counter() - start) * 1000, 3)
+        return result
+
+    def close(self) -> None:
+        self.executor.shutdown(wait=True)
+
+
+def _write_output(output_path: Path, data: bytes) -> None:
+    """Write beside the target and rename, so a failed job never leaves a partial document at ``output_path``."""
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = output_path.with_name(f".{output_path.name}.{uuid.uuid4().hex[:8]}.tmp")
+    try:
+        with open(temp_path, "xb") as f:
+            f.write(data)
+        os.replace(temp_path, output_path)
+    except Exception:
+        if temp_path.exists():
+            temp_path.unlink()
+        raise
+
+
+class _HTTPJobHandler(BaseHTTPRequestHandler):
+    server_version = f"docx-processor/{__version__}"
+
+    def _send(self, status: int, body: dict) -> None:
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _refused(self) -> bool:
+        """Answer and return True when the request may not come from a client of the server user."""
+        if self.server.local_only:
+            # A browser page on another site can reach loopback, but it cannot send a loopback Host and Origin
+            host = urlsplit(f"//{self.headers.get('Host', '')}").hostname
+            if not host or not is_loopback(host):
+                self._send(403, {"ok": False, "error": "Host is not a loopback address"})
+                return True
+            origin = self.headers.get("Origin")
+            if origin is not None and not is_loopback(urlsplit(origin).hostname or ""):
+                self._send(403, {"ok": False, "error": "Origin is not a loopback address"})
+                return True
+        return False
+
+    def do_GET(self):
+        if self._refused():
+            return
+        if self.path == "/health":
+            self._send(200, {"ok": True, "version": __version__})
+        else:
+            self._send(404, {"ok": False, "error": "Not found"})
+
+    def do_POST(self):
+        if self._refused():
+            return
+        if self.path != "/jobs":
+            self._send(404, {"ok": False, "error": "Not found"})
+            return
+        expected = f"Bearer {self.server.token}".encode("utf-8")
+        if not hmac.compare_digest(self.headers.get("Authorization", "").encode("utf-8"), expected):
+            self._send(401, {"ok": False, "error": "Missing or invalid token"})
+            return
+        if self.headers.get_content_type() != "application/json":
+            self._send(415, {"ok": False, "error": "Content-Type must be application/json"})
+            return
+
+        try:
+            job = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+        except ValueError as e:
+            self._send(400, {"ok": False, "error": f"Invalid JSON: {e}"})
+            return
+
+        result = self.server.service.handle(job)
+        self._send(200 if result["ok"] else 422, result)
+
+    def log_message(self, format, *args):
+        self.server.service.logger.debug(format % args)
+
+
+class _SocketJobHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            try:
+                result = self.server.service.handle(json.loads(line))
+            except ValueError as e:
+                result = {"ok": False, "error": f"Invalid JSON: {e}"}
+            self.wfile.write(json.dumps(result).encode("utf-8") + b"\n")
+            self.wfile.flush()
+
+
+def is_loopback(host: str) -> bool:
+    """Whether every address ``host`` resolves to is a loopback address."""
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        pass
+    try:
+        addresses = {info[4][0] for info in socket.getaddrinfo(host, None)}
+    except socket.gaierror:
+        return False
+    return bool(addresses) and all(ipaddress.ip_address(address.split("%")[0]).is_loopback for address in addresses)
+
+
+def _unix_server(socket_path: Path) -> socketserver.BaseServer:
+    if not hasattr(socketserver, "ThreadingUnixStreamServer"):
+        raise RuntimeError("Unix domain sockets are not supported on this platform, use --port instead")
+    if socket_path.exists() or socket_path.is_symlink():
+        if not stat.S_ISSOCK(socket_path.lstat().st_mode):
+            raise RuntimeError(f"{socket_path} exists and is not a socket")
+        # A socket left behind by a server that did not shut down cleanly
+        socket_path.unlink()
+    # Created accessible to the server user only, any other user could read and write files as this one
+    umask = os.umask(0o177)
+    try:
+        server = socketserver.ThreadingUnixStreamServer(str(socket_path), _SocketJobHandler)
+    finally:
+        os.umask(umask)
+    os.chmod(socket_path, 0o600)
+    return server
+
+
+def _write_token(token_path: Path) -> str:
+    """Write a fresh token to a file readable by the server user only and return it."""
+    if token_path.exists() or token_path.is_symlink():
+        token_path.unlink()
+    token = secrets.token_urlsafe(32)
+    fd = os.open(str(token_path), os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    with os.fdopen(fd, "w") as f:
+        f.write(token + "\n")
+    return token
+
+
+def _http_server(host: str, port: int, token_path: Path, allow_remote: bool = False) -> ThreadingHTTPServer:
+    if not allow_remote and not is_loopback(host):
+        raise RuntimeError(
+            f"{host} is not a loopback address, jobs can read and write any file the server can; "
+            f"use --allow-remote to serve it anyway"
+        )
+    token = _write_token(token_path)
+    try:
+        server = ThreadingHTTPServer((host, port), _HTTPJobHandler)
+    except Exception:
+        token_path.unlink()
+        raise
+    server.token = token
+    server.local_only = not allow_remote
+    return server
+
+
+def serve(
+    service: DocumentService,
+    socket_path: Optional[Path] = None,
+    host: str = "127.0.0.1",
+    port: int = 8765,
+    allow_remote: bool = False,
+    token_path: Optional[Path] = None,
+):
+    """Serve jobs until interrupted, on a Unix socket if one is given, otherwise over HTTP. HTTP is refused on
+    addresses other than loopback unless ``allow_remote`` is set, and HTTP jobs must carry the token written to
+    ``token_path``."""
+    try:
+        if socket_path:
+            server = _unix_server(socket_path)
+            address = f"unix:{socket_path}"
+        else:
+            if token_path is None:
+                raise RuntimeError("HTTP jobs need a token file")
+            server = _http_server(host, port, token_path, allow_remote)
+            address = f"http://{host}:{server.server_port}, token in {token_path}"
+    except Exception:
+        service.close()
+        raise
+
+    server.daemon_threads = True
+    server.service = service
+    service.logger.info(f"Serving jobs on {address}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
+        if socket_path and socket_path.exists():
+            socket_path.unlink()
+        if not socket_path and token_path.exists():
+            token_path.unlink()
@@ -0,0 +1,8 @@
+"""
+Structured on-disk storage for processing results.
+"""
+
+from .catalog import Catalog, CatalogFact
+from .match_store import MatchStore
+
+__all__ = ["Catalog", "CatalogFact", "MatchStore"]
@@ -0,0 +1,150 @@
+import os
+import sqlite3
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Iterable, List, Optional
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    scan_mode TEXT NOT NULL,
+    error TEXT,
+    cataloged_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS facts (
+    document_id INTEGER NOT NULL REFERENCES documents (id),
+    seq INTEGER NOT NULL,
+    section TEXT,
+    module TEXT NOT NULL,
+    task TEXT,
+    location TEXT,
+    table_row TEXT,
+    value TEXT,
+    ref TEXT,
+    PRIMARY KEY (document_id, seq)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS ix_facts_module ON facts (module);
+"""
+
+UPSERT_DOCUMENT = """
+INSERT INTO documents (path, mtime_ns, size, scan_mode, error, cataloged_at) VALUES (?, ?, ?, ?, ?, ?)
+ON CONFLICT (path) DO UPDATE SET
+    mtime_ns = excluded.mtime_ns,
+    size = excluded.size,
+    scan_mode = excluded.scan_mode,
+    error = excluded.error,
+    cataloged_at = excluded.cataloged_at
+"""
+
+INSERT_FACT = """
+INSERT INTO facts (document_id, seq, section, module, task, location, table_row, value, ref)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+
+@dataclass(frozen=True)
+class CatalogFact:
+    """
+    A URL, style name or paragraph text of a document, with the context a match on it is logged with. URLs carry
+    a ``ref`` naming the relationship or hyperlink run they come from, which the transforms can visit again.
+    ``task`` and ``table_row`` are None where the context had not set them yet.
+    """
+
+    section: str
+    module: str
+    task: Optional[str]
+    location: str
+    table_row: Optional[str]
+    value: Optional[str]
+    ref: str = ""
+
+
+@dataclass(frozen=True)
+class CatalogEntry:
+    id: int
+    path: Path
+    mtime_ns: int
+    size: int
+    scan_mode: str
+    error: Optional[str]
+
+    def is_current(self, stat: os.stat_result, scan_mode: str) -> bool:
+        """Whether the entry still describes a file with this ``stat``, cataloged in ``scan_mode``."""
+        return (self.mtime_ns, self.size, self.scan_mode) == (stat.st_mtime_ns, stat.st_size, scan_mode)
+
+
+class Catalog:
+    """
+    SQLite catalog of the facts transform rules are evaluated against, so find-only questions can be answered
+    without reopening documents. Facts can also be queried directly, e.g. every document using a style::
+
+        SELECT DISTINCT path FROM documents JOIN facts ON facts.document_id = documents.id
+        WHERE module = 'transform_styles' AND value = 'Heading 2'
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+
+    def entries(self) -> List[CatalogEntry]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, path, mtime_ns, size, scan_mode, error FROM documents ORDER BY path"
+            ).fetchall()
+        return [CatalogEntry(row[0], Path(row[1]), *row[2:]) for row in rows]
+
+    def facts(self, entry: CatalogEntry) -> List[CatalogFact]:
+        """The document's facts in the order the transforms visit them."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT section, module, task, location, table_row, value, ref FROM facts "
+                "WHERE document_id = ? ORDER BY seq",
+                (entry.id,),
+            ).fetchall()
+        return [CatalogFact(*row) for row in rows]
+
+    def put(
+        self,
+        path: Path,
+        stat: os.stat_result,
+        scan_mode: str,
+        facts: Iterable[CatalogFact],
+        error: Optional[str] = None,
+    ) -> None:
+        """Replace the facts of a document, ``stat`` being taken before they were extracted."""
+        cataloged_at = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        with self._lock, self._conn:
+            self._conn.execute(
+                UPSERT_DOCUMENT, (str(path), stat.st_mtime_ns, stat.st_size, scan_mode, error, cataloged_at)
+            )
+            # Looked up rather than taken from RETURNING, which needs SQLite 3.35
+            (document_id,) = self._conn.execute("SELECT id FROM documents WHERE path = ?", (str(path),)).fetchone()
+            self._conn.execute("DELETE FROM facts WHERE document_id = ?", (document_id,))
+            self._conn.executemany(
+                INSERT_FACT,
+                (
+                    (document_id, seq, f.section, f.module, f.task, f.location, f.table_row, f.value, f.ref)
+                    for seq, f in enumerate(facts)
+                ),
+            )
+
+    def remove(self, paths: Iterable[Path]) -> None:
+        with self._lock, self._conn:
+            for path in paths:
+                self._conn.execute(
+                    "DELETE FROM facts WHERE document_id IN (SELECT id FROM documents WHERE path = ?)", (str(path),)
+                )
+                self._conn.execute("DELETE FROM documents WHERE path = ?", (str(path),))
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,132 @@
+import sqlite3
+import threading
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Iterable, List, Optional, Tuple
+
+from docx_processor.processors.match import MatchRecord
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    started_at TEXT NOT NULL,
+    source_dir TEXT,
+    rules_fingerprint TEXT,
+    find_only INTEGER
+);
+CREATE TABLE IF NOT EXISTS matches (
+    id INTEGER PRIMARY KEY,
+    run_id TEXT NOT NULL REFERENCES runs (run_id),
+    document TEXT NOT NULL,
+    document_name TEXT NOT NULL,
+    section TEXT,
+    module TEXT,
+    location TEXT,
+    table_row TEXT,
+    task TEXT,
+    rule TEXT,
+    original TEXT,
+    replacement TEXT,
+    message TEXT
+);
+CREATE INDEX IF NOT EXISTS ix_matches_document ON matches (document);
+CREATE INDEX IF NOT EXISTS ix_matches_rule ON matches (rule);
+CREATE INDEX IF NOT EXISTS ix_matches_section_location ON matches (section, location);
+CREATE INDEX IF NOT EXISTS ix_matches_original ON matches (original);
+CREATE INDEX IF NOT EXISTS ix_matches_run ON matches (run_id);
+"""
+
+INSERT_RUN = "INSERT INTO runs (run_id, started_at, source_dir, rules_fingerprint, find_only) VALUES (?, ?, ?, ?, ?)"
+
+INSERT_MATCH = """
+INSERT INTO matches (
+    run_id, document, document_name, section, module, location, table_row, task, rule, original, replacement, message
+) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+
+class MatchStore:
+    """
+    SQLite store of structured match records for corpus wide queries, e.g. every document that still
+    links to a domain under a Heading 2::
+
+        SELECT DISTINCT document FROM matches WHERE original LIKE '%south32.net%' AND location LIKE 'H2 %'
+
+    Records are buffered and written in batched transactions; ``close`` flushes anything left over.
+    """
+
+    def __init__(self, path: Path, batch_size: int = 1000):
+        self.path = path
+        self.batch_size = batch_size
+        self.run_id: Optional[str] = None
+        self._buffer: List[Tuple] = []
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+
+    def start_run(self, source_dir: Path, rules_fingerprint: str, find_only: bool) -> str:
+        """Register a new run; subsequent records are tagged with its id."""
+        self.run_id = uuid.uuid4().hex
+        with self._lock, self._conn:
+            self._conn.execute(
+                INSERT_RUN,
+                (
+                    self.run_id,
+                    datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                    str(source_dir),
+                    rules_fingerprint,
+                    int(find_only),
+                ),
+            )
+        return self.run_id
+
+    def add(self, records: Iterable[MatchRecord]) -> None:
+        """Buffer records, writing them out once a full batch has accumulated."""
+        rows = [
+            (
+                self.run_id,
+                record.document,
+                Path(record.document).name,
+                record.section,
+                record.module,
+                record.location,
+                record.table_row,
+                record.task,
+                record.rule,
+                record.original,
+                record.replacement,
+                record.message,
+            )
+            for record in records
+        ]
+        with self._lock:
+            self._buffer.extend(rows)
+            if len(self._buffer) >= self.batch_size:
+                self._flush()
+
+    def _flush(self) -> None:
+        if not self._buffer:
+            return
+        with self._conn:
+            self._conn.executemany(INSERT_MATCH, self._buffer)
+        self._buffer = []
+
+    def flush(self) -> None:
+        with self._lock:
+            self._flush()
+
+    def query(self, sql: str, parameters: Tuple = ()) -> List[sqlite3.Row]:
+        """Run a read query against the store."""
+        self.flush()
+        with self._lock:
+            cursor = self._conn.execute(sql, parameters)
+            cursor.row_factory = sqlite3.Row
+            return cursor.fetchall()
+
+    def close(self) -> None:
+        with self._lock:
+            self._flush()
+            self._conn.close()
@@ -2,7 +2,23 @@
 Utility functions and helpers for DOCX processing.
 """
 
-# If you extract DOcument-related utilities to url.py:
-from .url import non_rel_hyperlinks
+from typing import TYPE_CHECKING
 
-__all__ = ["non_rel_hyperlinks"]
+if TYPE_CHECKING:
+    from .url import iter_field_hyperlinks, non_rel_hyperlinks
+
+# url.py pulls in lxml, so it is only imported on first use
+_URL_EXPORTS = ("iter_field_hyperlinks", "non_rel_hyperlinks")
+
+
+def __getattr__(name):
+    if name not in _URL_EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    from . import url
+
+    value = getattr(url, name)
+    globals()[name] = value
+    return value
+
+
+__all__ = ["iter_field_hyperlinks", "non_rel_hyperlinks"]
@@ -0,0 +1,178 @@
+"""
+Read-only ZIP access over a memory map, used to open large packages without copying them onto the heap.
+"""
+
+import mmap
+import struct
+import zlib
+from dataclasses import dataclass
+from typing import Dict, Iterator
+from zipfile import BadZipFile
+
+_EOCD = struct.Struct("<4sHHHHIIH")
+_EOCD_SIGNATURE = b"PK\x05\x06"
+_ZIP64_LOCATOR = struct.Struct("<4sIQI")
+_ZIP64_LOCATOR_SIGNATURE = b"PK\x06\x07"
+_ZIP64_EOCD = struct.Struct("<4sQHHIIQQQQ")
+_ZIP64_EOCD_SIGNATURE = b"PK\x06\x06"
+_CENTRAL_HEADER = struct.Struct("<4sHHHHHHIIIHHHHHII")
+_CENTRAL_HEADER_SIGNATURE = b"PK\x01\x02"
+_LOCAL_HEADER = struct.Struct("<4sHHHHHIIIHH")
+_LOCAL_HEADER_SIGNATURE = b"PK\x03\x04"
+_ZIP64_EXTRA_ID = 0x0001
+_MAX_COMMENT = 0xFFFF
+_FLAG_ENCRYPTED = 0x1
+_FLAG_UTF8 = 0x800
+
+STORED = 0
+DEFLATED = 8
+
+_CHUNK_SIZE = 1024 * 1024
+
+
+@dataclass
+class ZipMember:
+    """Central directory entry for one member of the archive."""
+
+    name: str
+    method: int
+    crc: int
+    compressed_size: int
+    size: int
+    header_offset: int
+
+
+class MappedZip:
+    """
+    ZIP reader over a buffer, normally a read-only memory map of the file. The central directory and member
+    data are sliced from the buffer without copying, only members that are read get inflated.
+    """
+
+    def __init__(self, buffer, mapping=None):
+        self._view = memoryview(buffer)
+        self._mapping = mapping
+        try:
+            self.members: Dict[str, ZipMember] = {member.name: member for member in self._read_central_directory()}
+        except Exception:
+            # The view would keep the mapping from being closed, hiding the error behind a BufferError
+            self._view.release()
+            raise
+
+    @classmethod
+    def open(cls, path) -> "MappedZip":
+        """Map a file read-only; the mapping stays open until ``close``."""
+        with open(path, "rb") as f:
+            try:
+                mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                raise BadZipFile(f"File is empty: {path}")
+        try:
+            return cls(mapping, mapping)
+        except Exception:
+            mapping.close()
+            raise
+
+    def _read_central_directory(self) -> Iterator[ZipMember]:
+        view = self._view
+        search_start = max(0, len(view) - _EOCD.size - _MAX_COMMENT)
+        eocd_offset = bytes(view[search_start:]).rfind(_EOCD_SIGNATURE)
+        if eocd_offset < 0:
+            raise BadZipFile("File is not a zip file")
+        eocd_offset += search_start
+        _, _, _, _, count, _, directory_offset, _ = _EOCD.unpack_from(view, eocd_offset)
+
+        locator_offset = eocd_offset - _ZIP64_LOCATOR.size
+        if locator_offset >= 0 and view[locator_offset : locator_offset + 4] == _ZIP64_LOCATOR_SIGNATURE:
+            _, _, zip64_offset, _ = _ZIP64_LOCATOR.unpack_from(view, locator_offset)
+            record = _ZIP64_EOCD.unpack_from(view, zip64_offset)
+            if record[0] != _ZIP64_EOCD_SIGNATURE:
+                raise BadZipFile("Corrupt zip64 end of central directory record")
+            count, directory_offset = record[7], record[9]
+
+        offset = directory_offset
+        for _ in range(count):
+            header = _CENTRAL_HEADER.unpack_from(view, offset)
+            if header[0] != _CENTRAL_HEADER_SIGNATURE:
+                raise BadZipFile("Bad magic number for central directory")
+            flags, method, crc, compressed_size, size = header[3], header[4], header[7], header[8], header[9]
+            name_length, extra_length, comment_length, header_offset = header[10], header[11], header[12], header[16]
+            name_start = offset + _CENTRAL_HEADER.size
+            raw_name = bytes(view[name_start : name_start + name_length])
+            name = raw_name.decode("utf-8" if flags & _FLAG_UTF8 else "cp437")
+            if flags & _FLAG_ENCRYPTED:
+                raise BadZipFile(f"Encrypted member is not supported: {name}")
+
+            extra = view[name_start + name_length : name_start + name_length + extra_length]
+            size, compressed_size, header_offset = _apply_zip64_extra(extra, size, compressed_size, header_offset)
+            yield ZipMember(name, method, crc, compressed_size, size, header_offset)
+            offset = name_start + name_length + extra_length + comment_length
+
+    def raw(self, name: str) -> memoryview:
+        """Return the member's stored (possibly compressed) bytes as a zero-copy view."""
+        member = self.members[name]
+        header = _LOCAL_HEADER.unpack_from(self._view, member.header_offset)
+        if header[0] != _LOCAL_HEADER_SIGNATURE:
+            raise BadZipFile(f"Bad magic number for file header: {name}")
+        start = member.header_offset + _LOCAL_HEADER.size + header[9] + header[10]
+        return self._view[start : start + member.compressed_size]
+
+    def iter_chunks(self, name: str) -> Iterator[bytes]:
+        """Yield the member's uncompressed content in bounded chunks, checking its CRC at the end."""
+        member = self.members[name]
+        raw = self.raw(name)
+        if member.method == STORED:
+            inflate = None
+        elif member.method == DEFLATED:
+            inflate = zlib.decompressobj(-zlib.MAX_WBITS)
+        else:
+            raise BadZipFile(f"Unsupported compression method {member.method}: {name}")
+
+        crc = 0
+        with raw:
+            for start in range(0, len(raw), _CHUNK_SIZE):
+                with raw[start : start + _CHUNK_SIZE] as chunk:
+                    data = inflate.decompress(chunk) if inflate else bytes(chunk)
+                crc = zlib.crc32(data, crc)
+                yield data
+        if inflate:
+            data = inflate.flush()
+            crc = zlib.crc32(data, crc)
+            yield data
+        if crc != member.crc:
+            raise BadZipFile(f"Bad CRC-32 for file {name!r}")
+
+    def read(self, name: str) -> bytes:
+        """Return the member's uncompressed content."""
+        member = self.members[name]
+        if member.method == DEFLATED:
+            with self.raw(name) as raw:
+                data = zlib.decompress(raw, -zlib.MAX_WBITS, member.size or zlib.DEF_BUF_SIZE)
+            if zlib.crc32(data) != member.crc:
+                raise BadZipFile(f"Bad CRC-32 for file {name!r}")
+            return data
+        return b"".join(self.iter_chunks(name))
+
+    def close(self) -> None:
+        self._view.release()
+        if self._mapping is not None:
+            self._mapping.close()
+            self._mapping = None
+
+
+def _apply_zip64_extra(extra: memoryview, size: int, compressed_size: int, header_offset: int):
+    """Replace 32-bit placeholder values with the ones stored in a zip64 extra field."""
+    offset = 0
+    while offset + 4 <= len(extra):
+        field_id, field_length = struct.unpack_from("<HH", extra, offset)
+        if field_id == _ZIP64_EXTRA_ID:
+            values = struct.unpack_from(f"<{field_length // 8}Q", extra, offset + 4)
+            index = 0
+            if size == 0xFFFFFFFF:
+                size, index = values[index], index + 1
+            if compressed_size == 0xFFFFFFFF:
+                compressed_size, index = values[index], index + 1
+            if header_offset == 0xFFFFFFFF:
+                header_offset = values[index]
+            break
+        offset += 4 + field_length
+    return size, compressed_size, header_offset
@@ -0,0 +1,85 @@
+"""
+Host resource detection used to size the worker pool.
+"""
+
+import os
+import sys
+from typing import Optional
+
+from docx_processor.config.constants import WORKER_MEMORY_BYTES
+
+
+def available_cpus() -> int:
+    """CPUs this process may run on, honouring affinity masks where the platform exposes them."""
+    if hasattr(os, "sched_getaffinity"):
+        return max(1, len(os.sched_getaffinity(0)))
+    return os.cpu_count() or 1
+
+
+def available_memory() -> Optional[int]:
+    """Bytes of memory available for new work, or None when it cannot be determined."""
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        return os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
+def auto_worker_count(memory_per_worker: int = WORKER_MEMORY_BYTES) -> int:
+    """One worker per available CPU, capped so the pool fits in available memory."""
+    workers = available_cpus()
+    memory = available_memory()
+    if memory is not None:
+        workers = min(workers, memory // memory_per_worker)
+    return max(1, workers)
+
+
+def current_rss() -> Optional[int]:
+    """Resident set size of this process in bytes, or None when the platform does not expose it."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def peak_rss() -> Optional[int]:
+    """Highest resident set size this process has reached, in bytes."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def reset_peak_rss() -> bool:
+    """Restart the peak resident set size read by rss_high_water_mark from the current size.
+
+    Returns False where the platform cannot reset it (only Linux can).
+    """
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def rss_high_water_mark() -> Optional[int]:
+    """Highest resident set size since the last reset_peak_rss, in bytes, or None when it cannot be read."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
@@ -1,48 +1,171 @@
+"""
+Hyperlinks held in field codes rather than relationships: ``HYPERLINK`` complex fields, whose instruction can be
+split over several runs, and ``w:fldSimple`` fields.
+"""
+
+import re
 import zipfile
+from dataclasses import dataclass, field
 from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Tuple
 
 from lxml import etree
 
+W_NS = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+CT_NS = "http://schemas.openxmlformats.org/package/2006/content-types"
+
+FLD_CHAR = f"{{{W_NS}}}fldChar"
+FLD_CHAR_TYPE = f"{{{W_NS}}}fldCharType"
+FLD_SIMPLE = f"{{{W_NS}}}fldSimple"
+INSTR = f"{{{W_NS}}}instr"
+INSTR_TEXT = f"{{{W_NS}}}instrText"
+PARAGRAPH = f"{{{W_NS}}}p"
+TABLE = f"{{{W_NS}}}tbl"
+XML_SPACE = "{http://www.w3.org/XML/1998/namespace}space"
+
+# Content types of the parts holding document text, and so possibly fields, with the section they are logged under
+TEXT_PARTS = {
+    f"application/vnd.openxmlformats-officedocument.wordprocessingml.{name}+xml": section
+    for name, section in (
+        ("document.main", "Body"),
+        ("template.main", "Body"),
+        ("header", "Header"),
+        ("footer", "Footer"),
+        ("footnotes", "Footnotes"),
+        ("endnotes", "Endnotes"),
+        ("comments", "Comments"),
+    )
+}
+
+# The target is the first argument, quoted or not; "HYPERLINK \l bookmark" links within the document
+HYPERLINK_FIELD = re.compile(r'^\s*HYPERLINK\s+(?:"([^"]+)"|([^\s"\\]\S*))', re.IGNORECASE)
+
+
+@dataclass
+class FieldHyperlink:
+    """A hyperlink field found in a part. ``elements`` are the ``w:instrText`` elements holding its instruction,
+    or its ``w:fldSimple`` element, and can only be rewritten while the tree they belong to is intact."""
+
+    part: str
+    url: str
+    instruction: str
+    elements: List = field(default_factory=list, repr=False)
+
+    def rewrite(self, new_url: str) -> None:
+        """Point the field at ``new_url``, leaving its switches as they are."""
+        match = HYPERLINK_FIELD.match(self.instruction)
+        group = 1 if match.group(1) is not None else 2
+        instruction = self.instruction[: match.start(group)] + new_url + self.instruction[match.end(group) :]
+        first, *rest = self.elements
+        if first.tag == FLD_SIMPLE:
+            first.set(INSTR, instruction)
+        else:
+            # The whole instruction goes in the first run, so the URL no longer straddles runs. Instructions start
+            # and end with spaces that Word drops from instrText unless told to preserve them
+            first.text = instruction
+            first.set(XML_SPACE, "preserve")
+            for element in rest:
+                element.text = ""
+        self.instruction, self.url = instruction, new_url
+
+
+class _OpenField:
+    __slots__ = ("elements", "in_instruction")
+
+    def __init__(self):
+        self.elements: List = []
+        self.in_instruction = True
+
+
+def _hyperlink(part: str, instruction: str, elements: List) -> Optional[FieldHyperlink]:
+    match = HYPERLINK_FIELD.match(instruction)
+    if not match:
+        return None
+    return FieldHyperlink(part, match.group(1) or match.group(2), instruction, elements)
+
+
+def field_hyperlinks(events: Iterable[Tuple[str, etree._Element]], part: str = "") -> Iterator[FieldHyperlink]:
+    """Hyperlink fields in a stream of ``(event, element)`` pairs with start and end events, as produced by
+    ``etree.iterparse`` over a part or ``etree.iterwalk`` over a parsed one.
+
+    Complex fields nest, so open fields are kept on a stack and instruction text belongs to the innermost one
+    until its ``separate`` mark.
+    """
+    fields: List[_OpenField] = []
+    for event, element in events:
+        tag = element.tag
+        if event == "start":
+            if tag == FLD_CHAR:
+                kind = element.get(FLD_CHAR_TYPE)
+                if kind == "begin":
+                    fields.append(_OpenField())
+                elif kind == "separate" and fields:
+                    fields[-1].in_instruction = False
+                elif kind == "end" and fields:
+                    elements = fields.pop().elements
+                    link = _hyperlink(part, "".join(e.text or "" for e in elements), elements)
+                    if link:
+                        yield link
+            elif tag == FLD_SIMPLE:
+                link = _hyperlink(part, element.get(INSTR) or "", [element])
+                if link:
+                    yield link
+        elif tag == INSTR_TEXT and fields and fields[-1].in_instruction:
+            fields[-1].elements.append(element)
+
+
+def _cleared(events: Iterable[Tuple[str, etree._Element]]) -> Iterator[Tuple[str, etree._Element]]:
+    """Pass events through, discarding each paragraph and table once it has been read."""
+    for event, element in events:
+        yield event, element
+        if event == "end" and element.tag in (PARAGRAPH, TABLE):
+            element.clear(keep_tail=True)
+            parent = element.getparent()
+            while element.getprevious() is not None:
+                del parent[0]
+
+
+def text_part_names(package: zipfile.ZipFile) -> List[str]:
+    """Names of the parts of a package that hold document text, from its content types."""
+    content_types = etree.fromstring(package.read("[Content_Types].xml"))
+    return [
+        override.get("PartName").lstrip("/")
+        for override in content_types.iter(f"{{{CT_NS}}}Override")
+        if override.get("ContentType") in TEXT_PARTS
+    ]
+
+
+def iter_field_hyperlinks(source) -> Iterator[FieldHyperlink]:
+    """Stream the hyperlink fields of every text part of a document, a path or binary stream.
+
+    Parts are parsed incrementally and each paragraph is discarded once read, so memory use does not grow with the
+    size of the document. The ``elements`` of the links found are detached and cannot be rewritten; rewriting
+    happens while a document is processed, on its parsed parts.
+    """
+    with zipfile.ZipFile(source) as package:
+        for name in text_part_names(package):
+            with package.open(name) as stream:
+                events = etree.iterparse(stream, events=("start", "end"), resolve_entities=False)
+                for link in field_hyperlinks(_cleared(events), f"/{name}"):
+                    link.elements = []
+                    yield link
+
+
+def non_rel_hyperlinks(logger, file_path: Path) -> List[FieldHyperlink]:
+    """Log the hyperlinks of a document that are held in field codes rather than relationships."""
+    logger.extra.update({"module": "non_rel_hyperlinks", "task": "non_rel_hyperlinks", "section": "XML"})
 
-def non_rel_hyperlinks(logger, file_path: Path) -> None:  # noqa: C901
-
-    logger.extra.update({"module": "non_rel_hyperlinks", "task": "non_rel_hyperlinks"})
-
-    with zipfile.ZipFile(file_path) as docx:
-        try:
-            with zipfile.ZipFile(file_path) as docx:
-                try:
-                    xml_content = docx.read("word/document.xml")
-                    tree = etree.fromstring(xml_content)
-                    return tree, {"w": "http://schemas.openxmlformats.org/wordprocessingml/2006/main"}
-                except zipfile.BadZipFile:
-                    logger.error("Corrupt ZIP structure in document")
-                    return None
-                except KeyError:
-                    logger.error("Missing word/document.xml")
-                    return None
-                except etree.XMLSyntaxError:
-                    logger.error("Invalid XML content")
-                    return None
-
-        except zipfile.BadZipFile as e:
-            logger.error(f"Unable to open document {file_path}: {str(e)}")
-            return None
-        except Exception as e:
-            logger.error(f"Unexpected error processing {file_path}: {str(e)}")
-            return None
-
-    # Namespaces
-    ns = {"w": "http://schemas.openxmlformats.org/wordprocessingml/2006/main"}
-    # Find all field code runs
-    instr_texts = tree.xpath("//w:instrText", namespaces=ns)
-
-    for instr in instr_texts:
-        if instr.text and "HYPERLINK" in instr.text:
-            # Extract the URL inside the HYPERLINK field code
-            parts = instr.text.split('"')
-            if len(parts) >= 2:
-                logger.extra["match"] = "True"
-                logger.extra["section"] = "XML"
-                logger.info(f"Non-Rel URL: {parts[1]} (Non-standard URL embedding)")
-                logger.extra["match"] = "False"
+    links = []
+    try:
+        for link in iter_field_hyperlinks(file_path):
+            logger.extra["match"] = "True"
+            logger.info(f"Non-Rel URL: {link.url} (Non-standard URL embedding)")
+            logger.extra["match"] = "False"
+            links.append(link)
+    except zipfile.BadZipFile as e:
+        logger.error(f"Unable to open document {file_path}: {str(e)}")
+    except KeyError as e:
+        logger.error(f"Missing part in document {file_path}: {str(e)}")
+    except etree.XMLSyntaxError as e:
+        logger.error(f"Invalid XML content in {file_path}: {str(e)}")
+    return links
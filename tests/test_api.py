@@ -0,0 +1,79 @@
+import logging
+from io import BytesIO
+from pathlib import Path
+
+import pytest
+from docx import Document
+
+from docx_processor import ProcessResult, process_bytes
+from docx_processor.config import AppConfig, RegexTransform, RuntimeConfig, TransformConfig
+from docx_processor.logger import DocxLogger
+
+
+@pytest.fixture
+def document_bytes():
+    return Path("data/MocWordDoc.docx").read_bytes()
+
+
+@pytest.fixture
+def config():
+    runtime_config = RuntimeConfig(
+        source_dir=Path("input"),
+        destination_dir=Path("output"),
+        log_file=Path("test.log"),
+        log_level="ERROR",
+        workers=1,
+        sync_mode=True,
+        find_only=False,
+        verbose=0,
+    )
+    transform_config = TransformConfig(
+        url_transforms=[
+            RegexTransform(
+                from_pattern=r"https://testcompany\.com/Test-(\d+)", to_pattern="https://newcompany.com/page-\\1"
+            )
+        ],
+        text_transforms=[RegexTransform(from_pattern=r"FindMe\d", to_pattern="Found")],
+        style_transforms=[],
+        drop_matches=[],
+    )
+    return AppConfig(transform=transform_config, runtime=runtime_config)
+
+
+def test_process_bytes_returns_transformed_document(document_bytes, config, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+    result = process_bytes(memoryview(document_bytes), config, name="upload.docx")
+
+    assert isinstance(result, ProcessResult) and result.ok
+    assert result.matches and all(match.document == "upload.docx" for match in result.matches)
+    targets = [rel.target_ref for rel in Document(BytesIO(result.output)).part.rels.values()]
+    assert any(target.startswith("https://newcompany.com/page-") for target in targets)
+    assert not any(target.startswith("https://testcompany.com/Test-") for target in targets)
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_process_bytes_find_only_from_stream(document_bytes, config):
+    stream = BytesIO(document_bytes)
+    stream.seek(0, 2)
+
+    result = process_bytes(stream, config, find_only=True)
+
+    assert result.ok and result.output is None
+    assert len(result.matches) == len(process_bytes(document_bytes, config).matches)
+
+
+def test_process_bytes_reports_invalid_documents(config):
+    result = process_bytes(b"not a document", config)
+
+    assert not result.ok and result.output is None and result.matches == []
+
+
+def test_logger_without_log_file_writes_no_file(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+    logger = DocxLogger(log_file=None, level=logging.INFO)
+    logger.info("message")
+
+    assert not any(isinstance(handler, logging.FileHandler) for handler in logger.logger.handlers)
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,580 @@
+import asyncio
+import csv
+import os
+import shutil
+import threading
+import time
+import zipfile
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+from docx import Document
+
+from docx_processor.config import AppConfig, RegexTransform, RuntimeConfig, TransformConfig
+from docx_processor.logger import setup_logger
+from docx_processor.processors import BatchProcessor
+from docx_processor.processors import MultiConfigProcessor, batch, multi
+from docx_processor.processors.delta import apply_deltas
+from docx_processor.processors.match import DocumentCompleted, MatchRecord
+from docx_processor.processors.prefetch import ReadAhead
+from docx_processor.processors.scheduler import largest_first
+from docx_processor.processors.writer import OutputWriter
+from docx_processor.utils import system
+
+
+@pytest.fixture
+def test_doc_path():
+    return Path("data/MocWordDoc.docx")
+
+
+@pytest.fixture
+def make_config(tmp_path):
+    def _make_config(**runtime):
+        runtime_config = RuntimeConfig(
+            source_dir=tmp_path / "input",
+            destination_dir=tmp_path / "output",
+            log_file=tmp_path / "test.log",
+            log_level="ERROR",
+            workers=2,
+            sync_mode=True,
+            find_only=False,
+            verbose=0,
+        )
+        for name, value in runtime.items():
+            setattr(runtime_config, name, value)
+        transform_config = TransformConfig(
+            url_transforms=[
+                RegexTransform(
+                    from_pattern=r"https://testcompany\.com/Test-(\d+)", to_pattern="https://newcompany.com/page-\\1"
+                )
+            ],
+            text_transforms=[RegexTransform(from_pattern=r"FindMe\d", to_pattern="Found")],
+            style_transforms=[],
+            drop_matches=[],
+        )
+        return AppConfig(transform=transform_config, runtime=runtime_config)
+
+    return _make_config
+
+
+@pytest.fixture
+def source_dir(tmp_path, test_doc_path):
+    source_dir = tmp_path / "input"
+    for folder in ("a", "b", "c"):
+        (source_dir / folder).mkdir(parents=True)
+        shutil.copy(test_doc_path, source_dir / folder / "policy.docx")
+    (source_dir / "c" / "other.docx").write_bytes(b"not a real document")
+    return source_dir
+
+
+def test_dedup_processes_identical_documents_once(make_config, source_dir, tmp_path):
+    config = make_config(dedup=True, log_level="INFO")
+    processor = BatchProcessor(config, setup_logger(config))
+
+    process_document = batch.DocumentProcessor.process_document
+    with patch.object(
+        batch.DocumentProcessor, "process_document", autospec=True, side_effect=process_document
+    ) as mock_process:
+        processor.process_all_docx()
+
+    documents = [c.args[1] for c in mock_process.call_args_list]
+    assert len(documents) == 2
+    assert processor.processed_count == 4
+    for folder in ("a", "b", "c"):
+        assert (tmp_path / "output" / folder / "policy.docx").exists()
+
+    log = (tmp_path / "test.csv").read_text().splitlines()
+    match_rows = [row for row in log if ",True," in row]
+    for folder in ("a", "b", "c"):
+        rows = [row for row in match_rows if f"{source_dir / folder},policy.docx," in row]
+        assert len(rows) == len(match_rows) // 3
+
+
+def test_dedup_off_processes_every_document(make_config, source_dir):
+    config = make_config()
+    processor = BatchProcessor(config, setup_logger(config))
+
+    assert [copies for _, copies in processor._group_paths(processor._get_document_paths())] == [[], [], [], []]
+
+
+def test_largest_first_orders_by_estimated_cost(source_dir, test_doc_path):
+    large = source_dir / "large.docx"
+    shutil.copy(test_doc_path, large)
+    with zipfile.ZipFile(large, "a") as package:
+        package.writestr("word/extra.xml", "<x/>" * 10000)
+    groups = [(source_dir / "c" / "other.docx", []), (source_dir / "a" / "policy.docx", []), (large, [])]
+
+    ordered = [path for path, _ in largest_first(groups)]
+
+    assert ordered == [large, source_dir / "a" / "policy.docx", source_dir / "c" / "other.docx"]
+
+
+@pytest.mark.parametrize("sync_mode", [True, False])
+def test_largest_first_starts_before_discovery_finishes(make_config, source_dir, sync_mode):
+    config = make_config(sync_mode=sync_mode, find_only=True)
+    processor = BatchProcessor(config, setup_logger(config))
+    discovered = []
+
+    def discover():
+        for path in sorted(source_dir.rglob("*.docx")):
+            discovered.append(path)
+            yield path
+
+    process_document = batch.DocumentProcessor.process_document
+    started = []
+
+    def record(self, input_path, *args, **kwargs):
+        started.append(len(discovered))
+        return process_document(self, input_path, *args, **kwargs)
+
+    with patch.object(batch, "ORDER_WINDOW", 2), patch.object(batch.DocumentProcessor, "process_document", record):
+        if sync_mode:
+            processor.process_paths(discover())
+        else:
+            asyncio.run(processor.process_paths_async(discover()))
+
+    assert len(started) == len(discovered) == 4
+    assert started[0] < len(discovered)
+
+
+def test_auto_worker_count_is_capped_by_memory():
+    with patch.object(system, "available_cpus", return_value=16), patch.object(
+        system, "available_memory", return_value=3 * 1024**3
+    ):
+        assert system.auto_worker_count(memory_per_worker=1024**3) == 3
+
+    with patch.object(system, "available_cpus", return_value=2), patch.object(
+        system, "available_memory", return_value=None
+    ):
+        assert system.auto_worker_count() == 2
+
+
+def test_rule_budget_quarantines_document(make_config, source_dir, tmp_path):
+    config = make_config(rule_timeout=1e-9, find_only=True)
+    processor = BatchProcessor(config, setup_logger(config))
+
+    processor.process_paths([source_dir / "a" / "policy.docx"])
+
+    assert processor.quarantined
+    assert "rule budget" in processor.quarantined[0][1]
+    assert "policy.docx" in (tmp_path / "test_quarantine.csv").read_text()
+
+
+@pytest.mark.parametrize(
+    "budget, reason", [({"rule_timeout": 0.2}, "rule budget"), ({"document_timeout": 0.2}, "document budget")]
+)
+def test_budget_stops_catastrophic_backtracking(make_config, tmp_path, budget, reason):
+    source = tmp_path / "input"
+    source.mkdir()
+    document = Document()
+    document.add_paragraph("a" * 60 + "b")
+    document.save(source / "backtracking.docx")
+    config = make_config(find_only=True, **budget)
+    config.transform.text_transforms = [RegexTransform(from_pattern=r"(a|aa)+$", to_pattern="")]
+    processor = BatchProcessor(config, setup_logger(config))
+
+    start = time.monotonic()
+    processor.process_all_docx()
+
+    # Run to completion the rule would backtrack for far longer
+    assert time.monotonic() - start < 5
+    assert processor.abandoned == 0
+    assert [path.name for path, _ in processor.quarantined] == ["backtracking.docx"]
+    assert reason in processor.quarantined[0][1]
+
+
+@pytest.mark.parametrize("sync_mode", [False, True])
+def test_watchdog_abandons_stuck_document(make_config, source_dir, tmp_path, sync_mode):
+    config = make_config(document_timeout=0.05, sync_mode=sync_mode)
+    processor = BatchProcessor(config, setup_logger(config))
+
+    def stuck(self, input_path, output_path, source=None, loader=None):
+        time.sleep(0.5)
+        return []
+
+    with patch.object(batch, "TIMEOUT_GRACE_SECONDS", 0), patch.object(
+        batch.DocumentProcessor, "process_document", stuck
+    ):
+        if sync_mode:
+            processor.process_paths([source_dir / "a" / "policy.docx"])
+        else:
+            asyncio.run(processor.process_paths_async([source_dir / "a" / "policy.docx"]))
+
+    assert processor.abandoned == 1
+    assert processor.processed_count == 0
+    assert [path.name for path, _ in processor.quarantined] == ["policy.docx"]
+
+
+def wait_for(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not predicate() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return predicate()
+
+
+@pytest.mark.parametrize("depth, max_bytes", [(2, 1000), (10, 25)])
+def test_read_ahead_is_bounded(tmp_path, depth, max_bytes):
+    paths = []
+    for i in range(5):
+        paths.append(tmp_path / f"{i}.docx")
+        paths[-1].write_bytes(bytes([i]) * 10)
+    read_ahead = ReadAhead(paths, depth=depth, max_bytes=max_bytes)
+
+    assert wait_for(lambda: len(read_ahead._buffers) == 2)
+    time.sleep(0.05)
+    assert len(read_ahead._buffers) == 2
+
+    assert read_ahead.take(paths[0]) == bytes([0]) * 10
+    read_ahead.release(paths[0])
+    assert wait_for(lambda: paths[2] in read_ahead._buffers)
+    assert read_ahead.take(tmp_path / "unscheduled.docx") is None
+    read_ahead.close()
+
+
+@pytest.mark.parametrize("sync_mode", [True, False])
+def test_batch_reads_documents_ahead(make_config, source_dir, sync_mode):
+    config = make_config(read_ahead=2, sync_mode=sync_mode, find_only=True)
+    processor = BatchProcessor(config, setup_logger(config))
+
+    with patch.object(batch.ReadAhead, "take", autospec=True, side_effect=batch.ReadAhead.take) as take:
+        if sync_mode:
+            processor.process_all_docx()
+        else:
+            asyncio.run(processor.process_all_docx_async())
+
+    assert processor.processed_count == 4
+    assert len(take.call_args_list) == 4
+
+
+def test_output_writer_applies_backpressure(make_config, tmp_path):
+    config = make_config()
+    writer = OutputWriter(setup_logger(config), max_bytes=25)
+    release = threading.Event()
+    write_batch = writer._write_batch
+
+    def slow_write_batch(batch):
+        release.wait()
+        write_batch(batch)
+
+    writer._write_batch = slow_write_batch
+    output_dir = tmp_path / "output"
+    output_dir.mkdir()
+    writer.submit(output_dir / "0.docx", b"0" * 10)
+    writer.submit(output_dir / "1.docx", b"1" * 10)
+    blocked = threading.Thread(target=writer.submit, args=(output_dir / "2.docx", b"2" * 10))
+    blocked.start()
+    time.sleep(0.05)
+    assert blocked.is_alive()
+
+    release.set()
+    blocked.join(timeout=2)
+    writer.close()
+
+    assert writer.written == 3
+    assert sorted(path.name for path in output_dir.iterdir()) == ["0.docx", "1.docx", "2.docx"]
+    assert (output_dir / "2.docx").read_bytes() == b"2" * 10
+
+
+def test_output_writer_survives_unexpected_errors(make_config, tmp_path):
+    config = make_config()
+    writer = OutputWriter(setup_logger(config), max_bytes=25)
+    write_batch = writer._write_batch
+    calls = []
+
+    def failing_write_batch(batch):
+        calls.append(batch)
+        if len(calls) == 1:
+            raise RuntimeError("unexpected")
+        write_batch(batch)
+
+    writer._write_batch = failing_write_batch
+    failed = writer.submit(tmp_path / "0.docx", b"0" * 20)
+    assert isinstance(failed.exception(timeout=2), RuntimeError)
+    # The thread is still writing, and the failed batch released its share of the buffer
+    written = writer.submit(tmp_path / "1.docx", b"1" * 20)
+    assert written.result(timeout=2) is None
+    writer.close()
+
+    assert (writer.written, writer.failed) == (1, 1)
+    assert sorted(path.name for path in tmp_path.iterdir() if path.suffix == ".docx") == ["1.docx"]
+
+
+@pytest.mark.parametrize("sync_mode", [True, False])
+def test_failed_write_fails_the_document(make_config, source_dir, tmp_path, sync_mode):
+    config = make_config(sync_mode=sync_mode)
+    processor = BatchProcessor(config, setup_logger(config))
+    replace = os.replace
+
+    def failing_replace(source, destination):
+        if Path(destination).parent.name == "a":
+            raise OSError("disk full")
+        replace(source, destination)
+
+    with patch("docx_processor.processors.writer.os.replace", failing_replace):
+        events = [item for item in _stream(processor, sync_mode) if isinstance(item, DocumentCompleted)]
+
+    errors = {Path(event.document).relative_to(source_dir).as_posix(): event.error for event in events}
+    assert "disk full" in errors["a/policy.docx"]
+    assert errors["b/policy.docx"] is None
+    assert processor.processed_count == 3
+    assert not (tmp_path / "output" / "a" / "policy.docx").exists()
+
+
+@pytest.mark.parametrize("sync_mode", [True, False])
+def test_workers_do_not_wait_for_the_writer(make_config, source_dir, tmp_path, sync_mode):
+    config = make_config(sync_mode=sync_mode, workers=1)
+    processor = BatchProcessor(config, setup_logger(config))
+    held = threading.Event()
+    write_batch = OutputWriter._write_batch
+
+    def held_write_batch(self, batch):
+        held.wait(30)
+        write_batch(self, batch)
+
+    process_document = batch.DocumentProcessor.process_document
+    with patch.object(OutputWriter, "_write_batch", held_write_batch), patch.object(
+        batch.DocumentProcessor, "process_document", autospec=True, side_effect=process_document
+    ) as mock_process:
+        runner = threading.Thread(target=_stream, args=(processor, sync_mode))
+        runner.start()
+        # The next document is processed while the first output is still waiting to be written
+        assert wait_for(lambda: mock_process.call_count >= 2, timeout=5)
+        assert not (tmp_path / "output" / "a" / "policy.docx").exists()
+        held.set()
+        runner.join(30)
+
+    assert processor.processed_count == 4
+    assert (tmp_path / "output" / "a" / "policy.docx").exists()
+
+
+@pytest.mark.parametrize("sync_mode", [True, False])
+def test_write_behind_saves_documents_atomically(make_config, source_dir, tmp_path, sync_mode):
+    config = make_config(sync_mode=sync_mode, dedup=True)
+    processor = BatchProcessor(config, setup_logger(config))
+
+    with patch.object(batch.OutputWriter, "submit", autospec=True, side_effect=batch.OutputWriter.submit) as submit:
+        if sync_mode:
+            processor.process_all_docx()
+        else:
+            asyncio.run(processor.process_all_docx_async())
+
+    assert len(submit.call_args_list) == 3
+    outputs = sorted(
+        path.relative_to(tmp_path / "output") for path in (tmp_path / "output").rglob("*") if path.is_file()
+    )
+    assert outputs == [Path(folder) / "policy.docx" for folder in ("a", "b", "c")]
+    for output in outputs:
+        assert zipfile.is_zipfile(tmp_path / "output" / output)
+
+
+def _stream(processor, sync_mode):
+    if sync_mode:
+        return list(processor.iter_matches_sync())
+
+    async def consume():
+        return [item async for item in processor.iter_matches(queue_size=2)]
+
+    return asyncio.run(consume())
+
+
+@pytest.mark.parametrize("sync_mode", [True, False])
+def test_iter_matches_streams_matches_then_completion(make_config, source_dir, sync_mode):
+    config = make_config(sync_mode=sync_mode, dedup=True, find_only=True)
+    processor = BatchProcessor(config, setup_logger(config))
+
+    items = _stream(processor, sync_mode)
+
+    events = [item for item in items if isinstance(item, DocumentCompleted)]
+    assert sorted(Path(event.document).relative_to(source_dir).as_posix() for event in events) == [
+        "a/policy.docx",
+        "b/policy.docx",
+        "c/other.docx",
+        "c/policy.docx",
+    ]
+    pending = []
+    for item in items:
+        if isinstance(item, MatchRecord):
+            pending.append(item)
+        else:
+            # Every match is yielded before its document's completion event
+            assert pending == item.matches
+            assert all(match.document == item.document for match in pending)
+            pending = []
+    assert not pending
+    failed = [event for event in events if not event.ok]
+    assert [Path(event.document).name for event in failed] == ["other.docx"]
+    assert all(event.matches for event in events if event.ok)
+
+
+def test_iter_matches_stops_processing_when_consumer_stops(make_config, source_dir):
+    config = make_config(sync_mode=False, workers=1, find_only=True)
+    processor = BatchProcessor(config, setup_logger(config))
+
+    async def first_item():
+        stream = processor.iter_matches(queue_size=1)
+        item = await stream.__anext__()
+        # The worker is blocked on the full queue, so no further document has started
+        await asyncio.sleep(0.1)
+        await stream.aclose()
+        return item
+
+    process_document = batch.DocumentProcessor.process_document
+    with patch.object(
+        batch.DocumentProcessor, "process_document", autospec=True, side_effect=process_document
+    ) as mock_process:
+        item = asyncio.run(first_item())
+
+    assert isinstance(item, (MatchRecord, DocumentCompleted))
+    assert mock_process.call_count == 1
+
+
+def test_multiple_configs_share_one_parse(make_config, source_dir, tmp_path):
+    def lane_config(name, url_to=None, style_to=None, root=tmp_path):
+        config = make_config(destination_dir=root / name, log_file=root / f"test_{name}.log", log_level="INFO")
+        transform = config.transform
+        transform.url_transforms = [] if url_to is None else transform.url_transforms
+        for rule in transform.url_transforms:
+            rule.to_pattern = url_to
+        if style_to:
+            transform.style_transforms = [RegexTransform(from_pattern="Title", to_pattern=style_to)]
+        return config
+
+    def lane_configs(root):
+        root.mkdir(exist_ok=True)
+        return [
+            lane_config("audit", root=root),
+            lane_config("brand", url_to="https://brand.com/\\1", root=root),
+            lane_config("rebrand", url_to="https://rebrand.com/\\1", style_to="Rebrand Title", root=root),
+        ]
+
+    configs = lane_configs(tmp_path)
+    loggers = [setup_logger(config, namespace=config.runtime.log_file.stem) for config in configs]
+    processor = MultiConfigProcessor(configs, loggers)
+    path = source_dir / "a" / "policy.docx"
+    with patch.object(multi, "open_document", side_effect=multi.open_document) as opened, patch.object(
+        multi, "copy_document", side_effect=multi.copy_document
+    ) as copied:
+        processor.process_paths([path, source_dir / "c" / "other.docx"])
+
+    assert opened.call_count == 2
+    # Only the first of the two configs changing the document needs a copy
+    assert copied.call_count == 1
+    targets = {}
+    for config in configs:
+        document = Document(config.runtime.destination_dir / "a" / "policy.docx")
+        targets[config.runtime.destination_dir.name] = {rel.target_ref for rel in document.part.rels.values()}
+    assert any("testcompany.com" in target for target in targets["audit"])
+    assert any(target.startswith("https://brand.com/") for target in targets["brand"])
+    assert any(target.startswith("https://rebrand.com/") for target in targets["rebrand"])
+    assert not any("brand.com" in target for target in targets["audit"])
+    rebranded = Document(tmp_path / "rebrand" / "a" / "policy.docx")
+    assert "Rebrand Title" in {style.name for style in rebranded.styles}
+
+    # Each config logs the same matches as when it runs on its own
+    for config, solo in zip(configs, lane_configs(tmp_path / "solo")):
+        BatchProcessor(solo, setup_logger(solo)).process_paths([path])
+        rows = [
+            [row for row in log.read_text().splitlines() if ",True," in row and "policy.docx" in row]
+            for log in (config.runtime.log_file.with_suffix(".csv"), solo.runtime.log_file.with_suffix(".csv"))
+        ]
+        assert len(rows[0]) == len(rows[1]) > 0
+        assert "other.docx" in config.runtime.log_file.with_suffix(".csv").read_text()
+
+
+def test_copied_config_saves_the_same_document_as_alone(make_config, tmp_path):
+    path = tmp_path / "input" / "Test-Doc_ver3.docx"
+    path.parent.mkdir()
+    shutil.copy("data/Test-Doc_ver3.docx", path)
+
+    def lane_config(name, root):
+        root.mkdir(exist_ok=True)
+        config = make_config(destination_dir=root / name, log_file=root / f"test_{name}.log")
+        config.transform.url_transforms = [RegexTransform(r"https://south32\.net/", f"https://{name}.example/")]
+        return config
+
+    configs = [lane_config(name, tmp_path / "multi") for name in ("a", "b", "c")]
+    loggers = [setup_logger(config, namespace=config.runtime.log_file.stem) for config in configs]
+    with patch.object(multi, "copy_document", side_effect=multi.copy_document) as copied:
+        MultiConfigProcessor(configs, loggers).process_paths([path])
+    assert copied.call_count == 2
+
+    for config in configs:
+        name = config.runtime.destination_dir.name
+        solo = lane_config(name, tmp_path / "solo")
+        BatchProcessor(solo, setup_logger(solo, namespace=f"solo_{name}")).process_paths([path])
+        parts = []
+        for root in (config.runtime.destination_dir, solo.runtime.destination_dir):
+            with zipfile.ZipFile(root / path.name) as saved:
+                parts.append(saved.read("word/document.xml"))
+        # Hyperlink runs showing the URL are rewritten in the copies too
+        assert f"https://{name}.example/Training/2.0".encode() in parts[0]
+        assert parts[0] == parts[1]
+
+
+def test_memory_profile_reports_each_document_and_stage(make_config, source_dir, tmp_path):
+    config = make_config(sync_mode=False, workers=4, document_timeout=30, memory_profile=True, memory_profile_top=1)
+    processor = BatchProcessor(config, setup_logger(config))
+    asyncio.run(processor.process_all_docx_async())
+
+    # Documents wait for their turn outside the watchdog, which only times the profiled document
+    assert processor.workers == 1
+    assert processor.abandoned == 0 and not processor.quarantined
+
+    with open(tmp_path / "test_memory.csv", newline="", encoding="utf-8") as f:
+        rows = {Path(row["Path"]).relative_to(source_dir).as_posix(): row for row in csv.DictReader(f)}
+    assert sorted(rows) == ["a/policy.docx", "b/policy.docx", "c/other.docx", "c/policy.docx"]
+    for name in ("a/policy.docx", "b/policy.docx", "c/policy.docx"):
+        stages = [int(rows[name][f"{stage} Peak Bytes"]) for stage in ("Load", "Index", "Transforms", "Save")]
+        assert all(peak > 0 for peak in stages)
+        assert int(rows[name]["Peak RSS Bytes"]) > 0
+    # The broken document never gets past loading
+    assert rows["c/other.docx"]["Index Peak Bytes"] == ""
+
+
+def test_triage_reports_one_row_per_document(make_config, source_dir, tmp_path):
+    config = make_config(triage=True, dedup=True)
+    processor = BatchProcessor(config, setup_logger(config))
+    processor.process_all_docx()
+
+    with open(tmp_path / "test_triage.csv", newline="", encoding="utf-8") as f:
+        rows = {Path(row["Path"]).relative_to(source_dir).as_posix(): row for row in csv.DictReader(f)}
+    assert sorted(rows) == ["a/policy.docx", "b/policy.docx", "c/other.docx", "c/policy.docx"]
+    for name in ("a/policy.docx", "b/policy.docx", "c/policy.docx"):
+        assert rows[name]["Matched"] == "True"
+        assert rows[name]["Module"] == "rel_hyperlinks"
+        assert rows[name]["Rule"] == r"https://testcompany\.com/Test-(\d+)"
+    assert rows["c/other.docx"]["Matched"] == "False"
+    assert rows["c/other.docx"]["Error"]
+    assert not (tmp_path / "output" / "a" / "policy.docx").exists()
+
+
+@pytest.mark.parametrize("write_behind", [True, False])
+def test_delta_output_rebuilds_the_full_output(make_config, source_dir, tmp_path, write_behind):
+    full = make_config(destination_dir=tmp_path / "full", write_behind=write_behind)
+    BatchProcessor(full, setup_logger(full)).process_all_docx()
+    config = make_config(output="delta", dedup=True, write_behind=write_behind)
+    logger = setup_logger(config)
+    BatchProcessor(config, logger).process_all_docx()
+
+    output_dir = tmp_path / "output"
+    deltas = sorted(path.relative_to(output_dir).as_posix() for path in output_dir.rglob("*") if path.is_file())
+    assert deltas == ["a/policy.docx.delta", "b/policy.docx.delta", "c/policy.docx.delta"]
+    with zipfile.ZipFile(output_dir / "a" / "policy.docx.delta") as delta:
+        # Parts python-docx only serialised again are not shipped
+        assert "parts/word/document.xml" in delta.namelist()
+        assert not any(name.startswith("parts/word/media/") for name in delta.namelist())
+    assert (output_dir / "a" / "policy.docx.delta").stat().st_size < (
+        tmp_path / "full" / "a" / "policy.docx"
+    ).stat().st_size
+
+    (source_dir / "c" / "policy.docx").write_bytes((source_dir / "c" / "policy.docx").read_bytes() + b"\0")
+    assert apply_deltas(source_dir, output_dir, tmp_path / "rebuilt", logger) == (2, 1)
+    assert not (tmp_path / "rebuilt" / "c" / "policy.docx").exists()
+    for name in ("a", "b"):
+        rebuilt = Document(tmp_path / "rebuilt" / name / "policy.docx")
+        expected = Document(tmp_path / "full" / name / "policy.docx")
+        assert [p.text for p in rebuilt.paragraphs] == [p.text for p in expected.paragraphs]
+        assert sorted(rel.target_ref for rel in rebuilt.part.rels.values() if rel.is_external) == sorted(
+            rel.target_ref for rel in expected.part.rels.values() if rel.is_external
+        )
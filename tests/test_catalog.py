@@ -0,0 +1,116 @@
+import asyncio
+import os
+import shutil
+from dataclasses import replace
+
+import pytest
+from docx import Document
+
+from docx_processor.config import AppConfig, RegexTransform, RuntimeConfig, TransformConfig
+from docx_processor.logger import setup_logger
+from docx_processor.processors import BatchProcessor, CatalogBatchProcessor
+from docx_processor.storage import Catalog
+
+
+@pytest.fixture
+def config(tmp_path):
+    runtime_config = RuntimeConfig(
+        source_dir=tmp_path / "input",
+        destination_dir=tmp_path / "output",
+        log_file=tmp_path / "test.log",
+        log_level="ERROR",
+        workers=1,
+        sync_mode=True,
+        find_only=True,
+        verbose=0,
+    )
+    transform_config = TransformConfig(
+        url_transforms=[
+            RegexTransform(from_pattern=r"https?://", to_pattern="ftp://"),
+            RegexTransform(from_pattern=r"testcompany", to_pattern="newcompany"),
+        ],
+        text_transforms=[RegexTransform(from_pattern=r"FindMe\d|the", to_pattern="Found")],
+        style_transforms=[
+            RegexTransform(from_pattern="Heading 1", to_pattern="Heading 2"),
+            RegexTransform(from_pattern="Heading 2", to_pattern="Title"),
+        ],
+        drop_matches=["FindMe2"],
+    )
+    return AppConfig(transform=transform_config, runtime=runtime_config)
+
+
+def collect_matches(processor, run):
+    matches = []
+    processor._record_matches = matches.extend
+    run()
+    return sorted(matches, key=lambda match: (match.document, match.message, match.location))
+
+
+def test_catalog_answers_rules_as_a_find_only_run(config, tmp_path):
+    config.runtime.source_dir.mkdir()
+    shutil.copy("data/MocWordDoc.docx", config.runtime.source_dir)
+    logger = setup_logger(config)
+    catalog = Catalog(tmp_path / "corpus.db")
+
+    CatalogBatchProcessor(config, logger).update_catalog(catalog)
+    live = BatchProcessor(config, logger)
+    expected = collect_matches(live, live.process_all_docx)
+    cataloged = CatalogBatchProcessor(config, logger)
+    matches = collect_matches(cataloged, lambda: cataloged.process_catalog(catalog))
+    catalog.close()
+
+    assert {match.module for match in expected} == {"rel_hyperlinks", "transform_styles", "transform_text"}
+    assert matches == expected
+
+
+def test_catalog_run_logs_the_rows_of_a_direct_run(config, tmp_path):
+    source_dir = config.runtime.source_dir
+    source_dir.mkdir()
+    for name in ("MocWordDoc.docx", "Test-Doc_ver3.docx"):
+        shutil.copy(f"data/{name}", source_dir)
+    config.transform.text_transforms.append(RegexTransform(from_pattern=r"South\s?32", to_pattern="GM3"))
+    catalog = Catalog(tmp_path / "corpus.db")
+    CatalogBatchProcessor(config, setup_logger(config)).update_catalog(catalog)
+
+    def log_rows(name, run):
+        runtime = replace(config.runtime, log_file=tmp_path / f"{name}.log", log_level="INFO")
+        run_config = replace(config, runtime=runtime)
+        run(run_config, setup_logger(run_config, namespace=name))
+        # Without the timestamp, and sorted as an async run finishes documents in any order
+        return sorted(row.split(",", 1)[1] for row in (tmp_path / f"{name}.csv").read_text().splitlines())
+
+    direct = log_rows("direct", lambda c, logger: asyncio.run(BatchProcessor(c, logger).process_all_docx_async()))
+    cataloged = log_rows("cataloged", lambda c, logger: CatalogBatchProcessor(c, logger).process_catalog(catalog))
+    catalog.close()
+
+    def matches(rows):
+        return [row for row in rows if ",True," in row]
+
+    assert any("|" in row for row in matches(direct))
+    assert matches(cataloged) == matches(direct)
+
+
+def test_catalog_only_extracts_changed_documents(config, tmp_path):
+    source_dir = config.runtime.source_dir
+    source_dir.mkdir()
+    for name in ("one", "two", "three"):
+        document = Document()
+        document.add_paragraph(f"Policy {name} FindMe1")
+        document.save(str(source_dir / f"{name}.docx"))
+    logger = setup_logger(config)
+    catalog = Catalog(tmp_path / "corpus.db")
+    processor = CatalogBatchProcessor(config, logger)
+
+    assert processor.update_catalog(catalog) == (3, 0, 0)
+    assert processor.update_catalog(catalog) == (0, 3, 0)
+
+    stat = (source_dir / "one.docx").stat()
+    os.utime(source_dir / "one.docx", ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    (source_dir / "three.docx").unlink()
+    assert processor.update_catalog(catalog) == (1, 1, 1)
+
+    entries = catalog.entries()
+    assert [entry.path.name for entry in entries] == ["one.docx", "two.docx"]
+    texts = [fact.value for fact in catalog.facts(entries[0]) if fact.module == "transform_text"]
+    catalog.close()
+    assert texts == ["Policy one FindMe1"]
@@ -0,0 +1,106 @@
+import json
+import subprocess
+import sys
+
+import pytest
+
+# Seconds allowed for importing the CLI and running a short command, well above the few tens of
+# milliseconds it takes without python-docx and lxml but far below the cost of loading them.
+STARTUP_BUDGET = 0.5
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+from docx_processor.cli import cli
+try:
+    cli(sys.argv[1:], standalone_mode=False, obj={})
+except SystemExit:
+    pass
+elapsed = time.perf_counter() - start
+heavy = sorted(name for name in ("docx", "lxml") if name in sys.modules)
+print(json.dumps({"elapsed": elapsed, "heavy": heavy}))
+"""
+
+
+def run_probe(*args):
+    result = subprocess.run([sys.executable, "-c", PROBE, *args], capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+@pytest.fixture
+def cli_args(tmp_path):
+    config = tmp_path / "config.yml"
+    config.write_text('text_transforms:\n  - from: "FindMe\\\\d"\n    to: "Found"\n')
+    return [
+        "-c",
+        str(config),
+        "--source-dir",
+        str(tmp_path),
+        "--dest-dir",
+        str(tmp_path / "output"),
+        "--log-file",
+        str(tmp_path / "test.log"),
+    ]
+
+
+def test_version_does_not_import_docx():
+    probe = run_probe("--version")
+
+    assert probe["heavy"] == []
+    assert probe["elapsed"] < STARTUP_BUDGET
+
+
+def test_validate_does_not_import_docx(cli_args):
+    probe = run_probe(*cli_args, "validate")
+
+    assert probe["heavy"] == []
+    assert probe["elapsed"] < STARTUP_BUDGET
+
+
+def test_package_exports_load_lazily():
+    code = "import sys, docx_processor; assert 'docx' not in sys.modules; docx_processor.DocumentProcessor; "
+    code += "assert 'docx' in sys.modules"
+    subprocess.run([sys.executable, "-c", code], check=True)
+
+
+def test_several_configs_get_their_own_outputs(cli_args, tmp_path):
+    from click.testing import CliRunner
+
+    from docx_processor.cli import cli
+
+    brand = tmp_path / "brand.yml"
+    brand.write_text('url_transforms:\n  - from: "old\\\\.com"\n    to: "new.com"\n')
+    args = [*cli_args, "-c", str(brand)]
+
+    result = CliRunner().invoke(cli, [*args, "validate"], obj={})
+
+    assert result.exit_code == 0, result.output
+    assert f"Destination directory: {tmp_path / 'output' / 'config'}" in result.output
+    assert f"Log file: {tmp_path / 'test_brand.log'}" in result.output
+    assert "from: old\\.com → to: new.com" in result.output
+
+    result = CliRunner().invoke(cli, [*args, "plan"], obj={})
+    assert result.exit_code != 0 and "accepts a single --config" in result.output
+
+
+def test_abandoned_workers_fail_the_run(cli_args, tmp_path):
+    import shutil
+
+    shutil.copy("data/MocWordDoc.docx", tmp_path / "stuck.docx")
+    code = """
+import sys, time
+from unittest.mock import patch
+from docx_processor.cli import cli
+from docx_processor.processors import batch
+with patch.object(batch, "TIMEOUT_GRACE_SECONDS", 0), patch.object(
+    batch.DocumentProcessor, "process_document", lambda *args, **kwargs: time.sleep(5) or []
+):
+    cli(sys.argv[1:], obj={})
+"""
+    args = [*cli_args, "--document-timeout", "0.05", "--sync", "run"]
+    result = subprocess.run([sys.executable, "-c", code, *args], capture_output=True, text=True, timeout=30)
+
+    assert result.returncode == 1
+    log = (tmp_path / "test.csv").read_text()
+    assert "1 documents abandoned" in log
+    assert "completed successfully" not in log
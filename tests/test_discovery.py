@@ -0,0 +1,84 @@
+import asyncio
+import shutil
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from docx_processor.config import AppConfig, RegexTransform, RuntimeConfig, TransformConfig
+from docx_processor.logger import setup_logger
+from docx_processor.processors import BatchProcessor
+from docx_processor.processors import discovery
+from docx_processor.processors.discovery import PathFilter, discover_documents
+
+
+@pytest.fixture
+def tree(tmp_path):
+    for name in ("a.docx", "~$a.docx", "notes.txt", "x/b.docx", "x/archive/c.docx", "x/y/d.docx", "archive/e.docx"):
+        path = tmp_path / "input" / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copy("data/MocWordDoc.docx", path)
+    return tmp_path / "input"
+
+
+def found(source_dir, **filters):
+    return sorted(
+        path.relative_to(source_dir).as_posix() for path in discover_documents(source_dir, PathFilter(**filters))
+    )
+
+
+def test_discovery_applies_globs_and_depth(tree):
+    assert found(tree) == ["a.docx", "archive/e.docx", "x/archive/c.docx", "x/b.docx", "x/y/d.docx"]
+    assert found(tree, exclude=["archive"]) == ["a.docx", "x/b.docx", "x/y/d.docx"]
+    assert found(tree, exclude=["x/*/*.docx"]) == ["a.docx", "archive/e.docx", "x/b.docx"]
+    assert found(tree, include=["x/**/*.docx"]) == ["x/archive/c.docx", "x/b.docx", "x/y/d.docx"]
+    assert found(tree, include=["[cd].docx"]) == ["x/archive/c.docx", "x/y/d.docx"]
+    assert found(tree, max_depth=0) == ["a.docx"]
+    assert found(tree, max_depth=1, exclude=["archive"]) == ["a.docx", "x/b.docx"]
+
+    assert PathFilter(exclude=["archive"]).accepts(("x", "y", "d.docx"))
+    assert not PathFilter(exclude=["archive"]).accepts(("x", "archive", "c.docx"))
+
+
+def test_discovery_does_not_list_pruned_directories(tree):
+    listed = []
+    scan = discovery._scan
+
+    def record(directory, parts):
+        listed.append(parts)
+        return scan(directory, parts)
+
+    with patch.object(discovery, "_scan", record):
+        assert found(tree, include=["x/y/*.docx"]) == ["x/y/d.docx"]
+    assert sorted(listed) == [(), ("x",), ("x", "y")]
+
+
+def test_discovery_streams_documents_into_processing(tree, tmp_path):
+    runtime_config = RuntimeConfig(
+        source_dir=tree,
+        destination_dir=tmp_path / "output",
+        log_file=tmp_path / "test.log",
+        log_level="ERROR",
+        workers=2,
+        sync_mode=False,
+        find_only=True,
+        verbose=0,
+        exclude=("archive",),
+    )
+    transform_config = TransformConfig(
+        url_transforms=[],
+        text_transforms=[RegexTransform(from_pattern=r"FindMe\d", to_pattern="Found")],
+        style_transforms=[],
+        drop_matches=[],
+    )
+    config = AppConfig(transform=transform_config, runtime=runtime_config)
+    processor = BatchProcessor(config, setup_logger(config))
+    documents = []
+    processor._record_matches = lambda matches: documents.extend({Path(match.document).name for match in matches})
+
+    paths = processor._get_document_paths()
+    assert iter(paths) is paths  # A generator, processing does not wait for the walk to end
+    asyncio.run(processor.process_all_docx_async())
+
+    assert processor.processed_count == 3
+    assert sorted(set(documents)) == ["a.docx", "b.docx", "d.docx"]
@@ -72,6 +72,16 @@ def test_get_paragraph_id_last_resort(mock_logger, mock_document, mock_paragraph
     assert "Test paragraph|Heading 1|" in result
 
 
+def test_get_paragraph_id_last_resort_survives_changes(mock_logger, mock_document, mock_paragraph):
+    mock_document.paragraphs = [mock_paragraph]
+
+    indexer = DocxIndexer(mock_document, mock_logger)
+    mock_paragraph.text = "Rewritten paragraph"
+    mock_paragraph.style.name = "Title"
+
+    assert indexer.paragraph_index[indexer._get_paragraph_id(mock_paragraph)] == 0
+
+
 def test_get_paragraph_id_none_paragraph(mock_logger, mock_document):
     mock_document.paragraphs = []
     indexer = DocxIndexer(mock_document, mock_logger)
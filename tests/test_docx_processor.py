@@ -1,12 +1,18 @@
 from pathlib import Path
-from unittest.mock import Mock
+from unittest.mock import Mock, PropertyMock, patch
 
 import pytest
 from docx import Document
+from docx.oxml.ns import qn
 
 from docx_processor.config import AppConfig, RuntimeConfig, TransformConfig, RegexTransform
-from docx_processor.processors import DocumentProcessor
+from docx_processor.processors import DocumentProcessor, RuleSet
+from docx_processor.processors.cache import LRUCache
 from docx_processor.processors.docx_indexer import DocxIndexer
+from docx_processor.processors.tables import iter_cells
+from docx_processor.processors.triage import TriageProcessor
+from docx_processor.utils.url import iter_field_hyperlinks
+from test_url import add_simple_field, add_split_hyperlink_field
 
 
 @pytest.fixture
@@ -90,3 +96,178 @@ class TestDocumentProcessor:
         for rel in doc.part.rels.values():
             if rel.target_ref.startswith("mailto:"):
                 assert rel.target_ref in original_mailtos
+
+
+def test_style_transforms_are_cached_by_template(mock_config, mock_logger, test_doc_path):
+    mock_config.transform.style_transforms = [
+        RegexTransform(from_pattern="Title", to_pattern="Corporate Title"),
+        RegexTransform(from_pattern="Corporate Title", to_pattern="Brand Title"),
+        RegexTransform(from_pattern="Subtitle", to_pattern="Brand Subtitle"),
+    ]
+    rules = RuleSet(mock_config.transform)
+
+    results = []
+    for _ in range(2):
+        processor = DocumentProcessor(mock_config, mock_logger, rules)
+        doc = Document(test_doc_path)
+        processor.transform_styles(doc)
+        results.append((doc, [(m.original, m.replacement) for m in processor.matches]))
+
+    assert (rules.style_cache.hits, rules.style_cache.misses) == (1, 1)
+    for doc, renames in results:
+        names = {style.name for style in doc.styles}
+        assert {"Brand Title", "Brand Subtitle"} <= names
+        assert not {"Title", "Corporate Title", "Subtitle"} & names
+        assert renames == [
+            ("Title", "Corporate Title"),
+            ("Corporate Title", "Brand Title"),
+            ("Subtitle", "Brand Subtitle"),
+        ]
+
+
+def test_lru_cache_evicts_least_recently_used():
+    cache = LRUCache(maxsize=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == (1, 3)
+    assert (cache.hits, cache.misses) == (3, 1)
+
+
+def test_url_rewrites_are_shared_across_documents(mock_config, mock_logger, test_doc_path):
+    rules = RuleSet(mock_config.transform)
+    rules.url_cache = LRUCache(maxsize=1000)
+
+    transformed = []
+    for _ in range(2):
+        processor = DocumentProcessor(mock_config, mock_logger, rules)
+        doc = Document(test_doc_path)
+        processor.transform_urls(doc, DocxIndexer(doc, mock_logger))
+        transformed.append([(m.rule, m.original, m.replacement) for m in processor.matches])
+
+    assert transformed[0] == transformed[1]
+    assert len(transformed[0]) >= 25
+    # The second document finds every URL, including those no rule matches, already in the cache
+    assert rules.url_cache.misses == len(rules.url_cache)
+    assert rules.url_cache.hits >= rules.url_cache.misses
+    assert () in [rewrites for rewrites in rules.url_cache._entries.values()]
+
+
+def _text_matches(config, logger, doc):
+    processor = DocumentProcessor(config, logger)
+    processor.transform_text(doc, DocxIndexer(doc, logger), config.transform.text_transforms)
+    return [(m.rule, m.location, m.table_row, m.original, m.message) for m in processor.matches]
+
+
+def test_document_scan_matches_paragraph_scan(mock_config, mock_logger, test_doc_path, tmp_path):
+    mock_config.transform.text_transforms += [
+        RegexTransform(from_pattern=r"the end\s+Start", to_pattern=""),
+        RegexTransform(from_pattern=r"^Start", to_pattern=""),
+        RegexTransform(from_pattern=r"cell \d$", to_pattern=""),
+    ]
+    mock_config.transform.drop_matches = ["ignore me"]
+    doc = Document()
+    doc.add_paragraph("FindMe1 before any heading")
+    doc.add_heading("Scope", level=1)
+    doc.add_paragraph("Policy text until the end")
+    doc.add_paragraph("Start of the next paragraph with FindMe2 and FindMe3")
+    doc.add_paragraph("FindMe4 but ignore me")
+    doc.add_heading("Details", level=2)
+    table = doc.add_table(rows=2, cols=2)
+    for i, cell in enumerate(table._cells):
+        cell.text = f"FindMe{i} in cell {i}"
+        cell.add_paragraph(f"Start of cell {i}")
+    doc.save(str(tmp_path / "sample.docx"))
+
+    for path in (test_doc_path, tmp_path / "sample.docx"):
+        mock_config.runtime.scan_mode = "paragraph"
+        expected = _text_matches(mock_config, mock_logger, Document(path))
+        mock_config.runtime.scan_mode = "document"
+        found = _text_matches(mock_config, mock_logger, Document(path))
+        assert expected
+        assert [m[:1] + m[2:] for m in found] == [m[:1] + m[2:] for m in expected]
+        # Paragraph mode finds no heading for paragraphs without a w14:paraId, document mode goes by position
+        assert all(e[1] in ("", f[1]) for f, e in zip(found, expected))
+
+    # The boundary-crossing rule never matches and the dropped paragraph is skipped, the first matching rule is logged
+    assert [(rule, location, table_row) for rule, location, table_row, _, _ in found] == [
+        ("FindMe\\d", "", ""),
+        ("FindMe\\d", "H1 Scope", ""),
+        *[(rule, "Table", row) for row in ("1|1", "1|1", "1|2", "1|2") for rule in ("FindMe\\d", "^Start")],
+    ]
+
+
+def test_tables_are_walked_once_per_cell_including_nested(mock_config, mock_logger):
+    mock_config.transform.text_transforms = [RegexTransform(from_pattern=r"FindMe\d", to_pattern="")]
+    doc = Document()
+    table = doc.add_table(rows=3, cols=3)
+    table.cell(0, 0).merge(table.cell(0, 2)).text = "FindMe1 spans the first row"
+    table.cell(1, 0).merge(table.cell(2, 0)).text = "FindMe2 spans two rows"
+    table.cell(1, 2).text = "FindMe3 in row 2"
+    nested = table.cell(2, 1).add_table(rows=2, cols=1)
+    nested.cell(1, 0).text = "FindMe4 in a nested table"
+
+    cells = [(cell.table, cell.row, cell.column, cell.merged) for cell in iter_cells(table)]
+    assert cells == [((1,), 1, 1, False), ((1,), 2, 1, False), ((1,), 2, 2, False), ((1,), 2, 3, False)] + [
+        ((1,), 3, 1, True),
+        ((1,), 3, 2, False),
+        ((1,), 3, 3, False),
+    ]
+
+    # python-docx would rebuild the cell grid for every row
+    with patch("docx.table._Row.cells", new_callable=PropertyMock, side_effect=AssertionError):
+        found = _text_matches(mock_config, mock_logger, doc)
+    assert [(table_row, original) for _, _, table_row, original, _ in found] == [
+        ("1|1", "FindMe1 spans the first row"),
+        ("1|2", "FindMe2 spans two rows"),
+        ("1|2", "FindMe3 in row 2"),
+        ("1.1|2", "FindMe4 in a nested table"),
+    ]
+
+
+def test_triage_stops_at_the_cheapest_first_match(mock_config, mock_logger, test_doc_path, tmp_path):
+    matches = TriageProcessor(mock_config, mock_logger).process_document(test_doc_path, None)
+    assert [(m.module, m.original) for m in matches] == [("rel_hyperlinks", matches[0].original)]
+    assert "testcompany.com" in matches[0].original
+
+    mock_config.transform.url_transforms = []
+    with patch.object(DocumentProcessor, "_field_hyperlinks", side_effect=AssertionError):
+        matches = TriageProcessor(mock_config, mock_logger).process_document(test_doc_path, None)
+    assert [m.module for m in matches] == ["transform_text"]
+
+    doc = Document()
+    doc.add_paragraph("Nothing to see here")
+    doc.save(str(tmp_path / "clean.docx"))
+    # Without a match nothing needs locating, so the document is never indexed
+    with patch("docx_processor.processors.triage.DocxIndexer", side_effect=AssertionError):
+        processor = TriageProcessor(mock_config, mock_logger)
+        assert processor.process_document(tmp_path / "clean.docx", None) == []
+    assert processor.error is None
+    assert mock_config.runtime.find_only is False
+
+
+def test_field_code_hyperlinks_are_rewritten(mock_config, mock_logger, tmp_path):
+    document = Document()
+    document.add_heading("Links", level=1)
+    add_split_hyperlink_field(document.add_paragraph(), ' HYPERLINK "https://testcompany', '.com/Test-7" \\o "tip"')
+    add_simple_field(document.sections[0].header.paragraphs[0], "HYPERLINK https://testcompany.com/Test-8")
+    source = tmp_path / "fields.docx"
+    document.save(str(source))
+
+    processor = DocumentProcessor(mock_config, mock_logger)
+    processor.process_document(source, tmp_path / "out.docx")
+
+    assert [(m.section, m.module, m.location, m.original) for m in processor.matches] == [
+        ("Body", "field_hyperlinks", "H1 Links", "https://testcompany.com/Test-7"),
+        ("Header", "field_hyperlinks", "", "https://testcompany.com/Test-8"),
+    ]
+    links = list(iter_field_hyperlinks(tmp_path / "out.docx"))
+    assert [link.instruction for link in links] == [
+        ' HYPERLINK "https://newcompany.com/page-7" \\o "tip"',
+        "HYPERLINK https://newcompany.com/page-8",
+    ]
+    instruction = Document(str(tmp_path / "out.docx")).paragraphs[1]._p.xpath(".//w:instrText")[0]
+    assert instruction.get(qn("xml:space")) == "preserve"
@@ -0,0 +1,87 @@
+import asyncio
+import shutil
+from pathlib import Path
+
+import pytest
+
+from docx_processor.config import AppConfig, RegexTransform, RuntimeConfig, TransformConfig
+from docx_processor.logger import setup_logger
+from docx_processor.processors import BatchProcessor, MatchRecord
+from docx_processor.storage import MatchStore
+
+
+@pytest.fixture
+def test_doc_path():
+    return Path("data/MocWordDoc.docx")
+
+
+def make_record(document, location, original):
+    return MatchRecord(
+        document=document,
+        section="Body",
+        module="rel_hyperlinks",
+        location=location,
+        table_row="",
+        task="rel_URLs",
+        rule="south32",
+        original=original,
+        replacement="",
+        message=f"{original} -> ",
+    )
+
+
+def test_records_are_written_in_batches(tmp_path):
+    store = MatchStore(tmp_path / "matches.db", batch_size=2)
+    store.start_run(tmp_path, "fingerprint", True)
+
+    store.add([make_record("a/one.docx", "H2 Links", "https://south32.net/a")])
+    assert store._buffer
+    store.add([make_record("b/two.docx", "H1 Intro", "https://south32.net/b")])
+    assert not store._buffer
+
+    rows = store.query(
+        "SELECT document_name FROM matches WHERE original LIKE ? AND location LIKE 'H2 %'", ("%south32.net%",)
+    )
+    store.close()
+
+    assert [row["document_name"] for row in rows] == ["one.docx"]
+
+
+@pytest.mark.parametrize("sync_mode", [True, False])
+def test_batch_run_populates_store(tmp_path, test_doc_path, sync_mode):
+    source_dir = tmp_path / "input"
+    source_dir.mkdir()
+    shutil.copy(test_doc_path, source_dir / "doc.docx")
+    runtime_config = RuntimeConfig(
+        source_dir=source_dir,
+        destination_dir=tmp_path / "output",
+        log_file=tmp_path / "test.log",
+        log_level="ERROR",
+        workers=1,
+        sync_mode=sync_mode,
+        find_only=True,
+        verbose=0,
+        match_store=tmp_path / "matches.db",
+    )
+    transform_config = TransformConfig(
+        url_transforms=[],
+        text_transforms=[RegexTransform(from_pattern=r"FindMe\d", to_pattern="Found")],
+        style_transforms=[],
+        drop_matches=[],
+    )
+    config = AppConfig(transform=transform_config, runtime=runtime_config)
+    processor = BatchProcessor(config, setup_logger(config))
+
+    if sync_mode:
+        processor.process_all_docx()
+    else:
+        asyncio.run(processor.process_all_docx_async())
+
+    store = MatchStore(tmp_path / "matches.db")
+    rows = store.query("SELECT document, rule, task FROM matches")
+    store.close()
+
+    assert rows
+    assert {(row["document"], row["rule"], row["task"]) for row in rows} == {
+        (str(source_dir / "doc.docx"), r"FindMe\d", "Text")
+    }
@@ -0,0 +1,134 @@
+import struct
+import zipfile
+import zlib
+from io import BytesIO
+from pathlib import Path
+from unittest.mock import Mock
+
+import pytest
+from docx import Document
+from docx.parts.image import ImagePart
+
+from docx_processor.config import AppConfig, RegexTransform, RuntimeConfig, TransformConfig
+from docx_processor.processors import DocumentProcessor
+from docx_processor.processors.package import close_document, open_document
+from docx_processor.utils.mapped_zip import MappedZip
+
+
+@pytest.fixture
+def test_doc_path():
+    return Path("data/MocWordDoc.docx")
+
+
+@pytest.fixture
+def mock_logger():
+    logger = Mock()
+    logger.extra = {}
+    return logger
+
+
+def make_config(**runtime):
+    runtime_config = RuntimeConfig(
+        source_dir=Path("data"),
+        destination_dir=Path("output"),
+        log_file=Path("test.log"),
+        log_level="INFO",
+        workers=1,
+        sync_mode=True,
+        find_only=True,
+        verbose=0,
+        **runtime,
+    )
+    transform_config = TransformConfig(
+        url_transforms=[RegexTransform(r"https://testcompany\.com/Test-(\d+)", "https://newcompany.com/page-\\1")],
+        text_transforms=[RegexTransform(r"FindMe\d", "Found")],
+        style_transforms=[],
+        drop_matches=[],
+    )
+    return AppConfig(transform=transform_config, runtime=runtime_config)
+
+
+def test_mapped_zip_matches_zipfile(tmp_path):
+    path = tmp_path / "archive.zip"
+    with zipfile.ZipFile(path, "w") as archive:
+        archive.writestr("stored.bin", b"\x00\x01" * 1000, compress_type=zipfile.ZIP_STORED)
+        archive.writestr("word/document.xml", "<w:document/>" * 1000, compress_type=zipfile.ZIP_DEFLATED)
+        with archive.open("large.xml", "w", force_zip64=True) as member:
+            member.write(b"<x/>" * 1000)
+
+    mapped = MappedZip.open(path)
+    with zipfile.ZipFile(path) as archive:
+        for name in archive.namelist():
+            assert mapped.read(name) == archive.read(name)
+            assert b"".join(mapped.iter_chunks(name)) == archive.read(name)
+    with pytest.raises(KeyError):
+        mapped.read("missing.xml")
+    mapped.close()
+
+
+def test_mapped_zip_rejects_corrupt_member(tmp_path):
+    path = tmp_path / "archive.zip"
+    with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_STORED) as archive:
+        archive.writestr("part.xml", b"<original/>")
+    path.write_bytes(path.read_bytes().replace(b"<original/>", b"<modified/>"))
+
+    mapped = MappedZip(path.read_bytes())
+    with pytest.raises(zipfile.BadZipFile):
+        mapped.read("part.xml")
+
+
+@pytest.mark.parametrize("from_buffer", [False, True])
+def test_mmap_input_finds_the_same_matches(test_doc_path, mock_logger, from_buffer):
+    source = BytesIO(test_doc_path.read_bytes()) if from_buffer else None
+    expected = DocumentProcessor(make_config(), mock_logger).process_document(test_doc_path, None)
+
+    matches = DocumentProcessor(make_config(mmap_input=True), mock_logger).process_document(test_doc_path, None, source)
+
+    assert matches and matches == expected
+    assert open_document(test_doc_path, mmap_input=True).paragraphs
+
+
+def make_png(width=4, height=4):
+    rows = b"".join(b"\x00" + b"\xff\x00\x00" * width for _ in range(height))
+
+    def chunk(kind, data):
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+    header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    return b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", header) + chunk(b"IDAT", zlib.compress(rows)) + chunk(b"IEND", b"")
+
+
+@pytest.fixture
+def picture_doc_path(tmp_path, test_doc_path):
+    document = Document(str(test_doc_path))
+    document.add_picture(BytesIO(make_png()))
+    path = tmp_path / "picture.docx"
+    document.save(str(path))
+    return path
+
+
+def test_lazy_media_leaves_binary_parts_unread(picture_doc_path, tmp_path):
+    document = open_document(picture_doc_path, lazy_media=True)
+    lazy_parts = [part for part in document.part.package.iter_parts() if getattr(part, "lazy_member", None)]
+    assert sorted(part.content_type for part in lazy_parts) == ["image/jpeg", "image/png"]
+    assert all(isinstance(part, ImagePart) for part in lazy_parts if part.content_type == "image/png")
+
+    document.paragraphs[0].text = "Changed"
+    output = tmp_path / "output.docx"
+    document.save(str(output))
+    close_document(document)
+
+    with zipfile.ZipFile(picture_doc_path) as source, zipfile.ZipFile(output) as saved:
+        for part in lazy_parts:
+            assert saved.read(part.partname.membername) == source.read(part.partname.membername)
+    assert Document(str(output)).paragraphs[0].text == "Changed"
+
+
+def test_lazy_media_reads_parts_on_access(picture_doc_path):
+    document = open_document(picture_doc_path, source=BytesIO(picture_doc_path.read_bytes()), lazy_media=True)
+
+    image_part = next(iter(document.part.package.image_parts))
+    assert image_part.lazy_member is not None
+    assert image_part.image.px_width == 4
+    assert image_part.lazy_member is None
+    close_document(document)
@@ -0,0 +1,87 @@
+import json
+import math
+from unittest.mock import patch
+
+import pytest
+from click.testing import CliRunner
+from docx import Document
+
+from docx_processor.cli import cli
+from docx_processor.config import AppConfig, RuntimeConfig, TransformConfig
+from docx_processor.logger import setup_logger
+from docx_processor.processors import planner
+from docx_processor.processors.planner import RunPlanner, stratified_estimate
+from docx_processor.utils.system import reset_peak_rss
+
+
+@pytest.fixture
+def source_dir(tmp_path):
+    source_dir = tmp_path / "input"
+    for folder, count in (("a", 6), ("b", 2)):
+        (source_dir / folder).mkdir(parents=True)
+        for i in range(count):
+            document = Document()
+            for _ in range(i + 1):
+                document.add_paragraph("Policy FindMe1 and FindMe2")
+            document.save(str(source_dir / folder / f"policy{i}.docx"))
+    return source_dir
+
+
+def test_stratified_estimate_extrapolates_each_stratum():
+    estimate = stratified_estimate({"a": [1.0, 3.0], "b": [10.0]}, {"a": 4, "b": 1})
+
+    assert estimate.total == 18.0
+    # Stratum b was fully sampled so only stratum a contributes error: 4^2 * (1 - 2/4) * 2 / 2
+    assert estimate.margin == pytest.approx(1.96 * math.sqrt(8))
+
+
+def test_plan_extrapolates_from_sample(source_dir, tmp_path):
+    config = tmp_path / "config.yml"
+    config.write_text('text_transforms:\n  - from: "FindMe\\\\d"\n    to: "Found"\n')
+    args = ["-c", str(config), "--source-dir", str(source_dir), "--dest-dir", str(tmp_path / "output")]
+    args += ["--log-file", str(tmp_path / "test.log"), "--log-level", "ERROR", "--modify"]
+
+    result = CliRunner().invoke(cli, [*args, "plan", "--sample", "4", "--seed", "7", "--json"], obj={})
+
+    assert result.exit_code == 0, result.output
+    plan = json.loads(result.output[result.output.index("{") :])
+    assert plan["documents"] == 8
+    assert 4 <= plan["sampled"] < 8
+    assert plan["matching_documents"]["estimate"] == 8
+    # One match is logged per matching paragraph, 21 paragraphs in folder a and 3 in folder b
+    rule_matches = plan["rule_matches"]["FindMe\\d"]
+    assert rule_matches["low"] <= 24 <= rule_matches["high"]
+    assert plan["output_bytes"]["estimate"] > 0
+    assert plan["recommended_workers"] >= 1
+    assert not (tmp_path / "output").exists()
+
+
+@pytest.mark.skipif(not reset_peak_rss(), reason="peak RSS cannot be reset on this platform")
+def test_memory_is_measured_per_document(source_dir, tmp_path):
+    runtime = RuntimeConfig(
+        source_dir=source_dir,
+        destination_dir=tmp_path / "output",
+        log_file=tmp_path / "test.log",
+        log_level="ERROR",
+        workers=1,
+        sync_mode=True,
+        find_only=True,
+        verbose=0,
+    )
+    config = AppConfig(transform=TransformConfig([], [], [], []), runtime=runtime)
+    run_planner = RunPlanner(config, setup_logger(config))
+    path = source_dir / "a" / "policy0.docx"
+    process_document = planner.DocumentProcessor.process_document
+
+    def heavy(self, *args, **kwargs):
+        ballast = b"x" * (256 * 1024 * 1024)
+        del ballast
+        return process_document(self, *args, **kwargs)
+
+    with patch.object(planner.DocumentProcessor, "process_document", heavy):
+        first = run_planner._measure(path, path.stat().st_size, "a")
+    second = run_planner._measure(path, path.stat().st_size, "a")
+
+    assert first.memory_bytes > 192 * 1024 * 1024
+    # The peak of the document before is not charged to this one
+    assert second.memory_bytes < 64 * 1024 * 1024
@@ -0,0 +1,154 @@
+import base64
+import json
+import os
+import threading
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+import pytest
+from docx import Document
+
+from docx_processor.config import AppConfig, RuntimeConfig, TransformConfig
+from docx_processor.logger import setup_logger
+from docx_processor.server import DocumentService, _http_server, _unix_server, is_loopback, serve
+
+CONFIG_YAML = """
+url_transforms:
+  - from: "https://testcompany\\\\.com/Test-(\\\\d+)"
+    to: "https://newcompany.com/page-\\\\1"
+text_transforms:
+  - from: "FindMe\\\\d"
+    to: "Found"
+"""
+
+
+@pytest.fixture
+def test_doc_path():
+    return Path("data/MocWordDoc.docx")
+
+
+@pytest.fixture
+def service(tmp_path):
+    config_path = tmp_path / "config.yml"
+    config_path.write_text(CONFIG_YAML)
+    runtime_config = RuntimeConfig(
+        source_dir=tmp_path,
+        destination_dir=tmp_path / "output",
+        log_file=tmp_path / "test.log",
+        log_level="ERROR",
+        workers=2,
+        sync_mode=False,
+        find_only=True,
+        verbose=0,
+    )
+    config = AppConfig(transform=TransformConfig.from_yaml(config_path), runtime=runtime_config)
+    service = DocumentService(config, config_path, setup_logger(config))
+    yield service
+    service.close()
+
+
+def test_find_only_job_returns_matches(service, test_doc_path):
+    result = service.handle({"input_path": str(test_doc_path)})
+
+    assert result["ok"]
+    assert "output_bytes" not in result
+    tasks = {match["task"] for match in result["matches"]}
+    assert {"rel_URLs", "Text"} <= tasks
+
+
+def test_bytes_job_returns_modified_document(service, test_doc_path, tmp_path):
+    job = {"input_bytes": base64.b64encode(test_doc_path.read_bytes()).decode(), "find_only": False}
+
+    result = service.handle(job)
+
+    output = tmp_path / "result.docx"
+    output.write_bytes(base64.b64decode(result["output_bytes"]))
+    rels = Document(str(output)).part.rels.values()
+    assert sum(1 for rel in rels if "newcompany.com" in rel.target_ref) == 25
+
+
+def test_path_job_writes_output_in_place(service, test_doc_path, tmp_path):
+    output = tmp_path / "out" / "report.docx"
+
+    result = service.handle({"input_path": str(test_doc_path), "output_path": str(output), "find_only": False})
+
+    assert result["ok"] and result["output_path"] == str(output)
+    assert "output_bytes" not in result
+    assert [path.name for path in output.parent.iterdir()] == ["report.docx"]
+    rels = Document(str(output)).part.rels.values()
+    assert sum(1 for rel in rels if "newcompany.com" in rel.target_ref) == 25
+
+
+def test_invalid_job_is_rejected(service):
+    result = service.handle({"name": "nothing.docx"})
+
+    assert not result["ok"]
+    assert "input_path or input_bytes" in result["error"]
+
+
+def test_config_reloaded_when_file_changes(service, test_doc_path):
+    service.config_path.write_text('text_transforms:\n  - from: "NoSuchText"\n    to: "x"\n')
+    stat = service.config_path.stat()
+    os.utime(service.config_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    result = service.handle({"input_path": str(test_doc_path)})
+
+    assert result["ok"]
+    assert result["matches"] == []
+
+
+def test_serve_refuses_unsafe_endpoints(service, tmp_path):
+    assert is_loopback("127.0.0.1") and is_loopback("::1") and is_loopback("localhost")
+    assert not is_loopback("0.0.0.0") and not is_loopback("192.0.2.1")
+    with pytest.raises(RuntimeError, match="not a loopback address"):
+        serve(service, host="0.0.0.0", port=0, token_path=tmp_path / "serve.token")
+    assert not (tmp_path / "serve.token").exists()
+
+    mistyped = tmp_path / "report.docx"
+    mistyped.write_text("not a socket")
+    with pytest.raises(RuntimeError, match="is not a socket"):
+        serve(service, socket_path=mistyped)
+    assert mistyped.read_text() == "not a socket"
+
+
+def test_socket_is_private_to_the_server_user(tmp_path):
+    socket_path = tmp_path / "jobs.sock"
+    server = _unix_server(socket_path)
+    try:
+        assert socket_path.stat().st_mode & 0o777 == 0o600
+    finally:
+        server.server_close()
+    # A socket left behind is replaced
+    _unix_server(socket_path).server_close()
+
+
+def test_http_jobs_need_the_token_and_a_loopback_client(service, test_doc_path, tmp_path):
+    token_path = tmp_path / "serve.token"
+    server = _http_server("127.0.0.1", 0, token_path)
+    server.service = service
+    thread = threading.Thread(target=server.serve_forever)
+    thread.start()
+    token = token_path.read_text().strip()
+    body = json.dumps({"input_path": str(test_doc_path)}).encode()
+
+    def post(**headers):
+        headers = {"Authorization": f"Bearer {token}", "Content-Type": "application/json", **headers}
+        request = urllib.request.Request(f"http://127.0.0.1:{server.server_port}/jobs", body, headers)
+        try:
+            with urllib.request.urlopen(request) as response:
+                return response.status
+        except urllib.error.HTTPError as e:
+            return e.code
+
+    try:
+        assert token_path.stat().st_mode & 0o777 == 0o600
+        assert post() == 200
+        assert post(Authorization="Bearer wrong") == 401
+        assert post(**{"Content-Type": "text/plain"}) == 415
+        assert post(Origin="https://example.com") == 403
+        assert post(Host="attacker.example:8765") == 403
+    finally:
+        server.shutdown()
+        server.server_close()
+        thread.join()
@@ -0,0 +1,51 @@
+from docx import Document
+from docx.oxml import OxmlElement
+from docx.oxml.ns import qn
+
+from docx_processor.utils.url import iter_field_hyperlinks
+
+
+def add_field_run(paragraph, fld_char=None, instruction=None):
+    run = paragraph.add_run()._r
+    if fld_char:
+        element = OxmlElement("w:fldChar")
+        element.set(qn("w:fldCharType"), fld_char)
+    else:
+        element = OxmlElement("w:instrText")
+        element.text = instruction
+    run.append(element)
+
+
+def add_split_hyperlink_field(paragraph, *pieces):
+    """A HYPERLINK complex field whose instruction is spread over one run per piece."""
+    add_field_run(paragraph, "begin")
+    for piece in pieces:
+        add_field_run(paragraph, instruction=piece)
+    add_field_run(paragraph, "separate")
+    paragraph.add_run("link text")
+    add_field_run(paragraph, "end")
+
+
+def add_simple_field(paragraph, instruction):
+    field = OxmlElement("w:fldSimple")
+    field.set(qn("w:instr"), instruction)
+    paragraph._p.append(field)
+
+
+def test_iter_field_hyperlinks_streams_every_text_part(tmp_path):
+    document = Document()
+    add_split_hyperlink_field(document.add_paragraph(), ' HYPERLINK "https://south', '32.net/a" \\o "tip"')
+    add_split_hyperlink_field(document.add_paragraph(), ' HYPERLINK \\l "_Toc1"')
+    for i in range(200):
+        document.add_paragraph(f"Filler paragraph {i}")
+    add_simple_field(document.sections[0].header.paragraphs[0], " HYPERLINK https://south32.net/b ")
+    path = tmp_path / "fields.docx"
+    document.save(str(path))
+
+    links = list(iter_field_hyperlinks(path))
+
+    assert [(link.part, link.url) for link in links] == [
+        ("/word/document.xml", "https://south32.net/a"),
+        ("/word/header1.xml", "https://south32.net/b"),
+    ]
+    assert links[0].instruction == ' HYPERLINK "https://south32.net/a" \\o "tip"'
@@ -0,0 +1,91 @@
+import os
+import shutil
+from pathlib import Path
+from unittest.mock import Mock, patch
+
+import pytest
+
+from docx_processor.processors.watch import DocumentWatcher
+from docx_processor.utils.inotify import inotify_available
+
+
+@pytest.fixture
+def test_doc_path():
+    return Path("data/MocWordDoc.docx")
+
+
+@pytest.fixture
+def mock_processor(tmp_path):
+    processor = Mock()
+    processor.config.runtime.source_dir = tmp_path
+    processor.config.runtime.include = ()
+    processor.config.runtime.exclude = ()
+    processor.config.runtime.max_depth = None
+    return processor
+
+
+def test_polling_queues_new_documents_once(mock_processor, tmp_path, test_doc_path):
+    (tmp_path / "existing.docx").write_bytes(b"old")
+    watcher = DocumentWatcher(mock_processor, debounce=0, use_inotify=False)
+
+    (tmp_path / "sub").mkdir()
+    shutil.copy(test_doc_path, tmp_path / "sub" / "new.docx")
+    (tmp_path / "~$new.docx").write_bytes(b"lock")
+
+    assert watcher.check() == []  # First sighting, not yet known to be stable
+    assert watcher.check() == [tmp_path / "sub" / "new.docx"]
+    assert watcher.check() == []
+
+
+def test_polling_waits_for_writes_to_finish(mock_processor, tmp_path):
+    watcher = DocumentWatcher(mock_processor, debounce=0, use_inotify=False)
+    document = tmp_path / "growing.docx"
+
+    document.write_bytes(b"part")
+    assert watcher.check() == []
+    document.write_bytes(b"part and more")
+    assert watcher.check() == []
+    assert watcher.check() == [document]
+
+
+@pytest.mark.skipif(not inotify_available(), reason="inotify not available")
+def test_inotify_queues_closed_documents(mock_processor, tmp_path, test_doc_path):
+    watcher = DocumentWatcher(mock_processor, debounce=0)
+    (tmp_path / "sub").mkdir()
+    watcher.check(timeout=0.1)
+    shutil.copy(test_doc_path, tmp_path / "sub" / "new.docx")
+
+    assert watcher.check(timeout=0.1) == [tmp_path / "sub" / "new.docx"]
+    watcher.close()
+
+
+def test_polling_ignores_excluded_documents(mock_processor, tmp_path, test_doc_path):
+    mock_processor.config.runtime.exclude = ("archive",)
+    watcher = DocumentWatcher(mock_processor, debounce=0, use_inotify=False)
+
+    (tmp_path / "archive").mkdir()
+    shutil.copy(test_doc_path, tmp_path / "archive" / "old.docx")
+    shutil.copy(test_doc_path, tmp_path / "new.docx")
+
+    watcher.check()
+    assert watcher.check() == [tmp_path / "new.docx"]
+
+
+def test_polling_never_lists_pruned_directories(mock_processor, tmp_path, test_doc_path):
+    mock_processor.config.runtime.exclude = ("archive",)
+    mock_processor.config.runtime.max_depth = 1
+    for folder in ("archive/2019", "a/b", "c"):
+        (tmp_path / folder).mkdir(parents=True)
+        shutil.copy(test_doc_path, tmp_path / folder / "policy.docx")
+    listed = []
+    scandir = os.scandir
+
+    def recording_scandir(path):
+        listed.append(Path(path).relative_to(tmp_path).as_posix())
+        return scandir(path)
+
+    with patch("docx_processor.processors.watch.os.scandir", recording_scandir):
+        watcher = DocumentWatcher(mock_processor, debounce=0, use_inotify=False)
+
+    assert sorted(listed) == [".", "a", "c"]
+    assert list(watcher._snapshot) == [tmp_path / "c" / "policy.docx"]